@@ -0,0 +1,595 @@
+"""
+End-to-end load test: boots the API with local stand-ins for everything it calls
+out to, then drives a mix of /pets, /filters, /pets/gemini, image and voice
+search traffic and reports throughput and p50/p95/p99 latency per endpoint.
+Run from the backend directory:
+
+    python benchmarks/load_test.py [--duration 30] [--concurrency 32] [--mix pets=50,filters=15,gemini=20,image=10,voice=5]
+
+Stand-ins, all on 127.0.0.1:
+  - Gemini: a fake generateContent endpoint the client is pointed at through
+    GEMINI_BASE_URL, with --gemini-latency-ms and --gemini-error-rate.
+  - The listings site: the pages of benchmarks/fixtures served for --scrape-pages
+    pages, answering --site-throttle of the requests with 429 and Retry-After.
+    A concurrent scrape of it runs next to the read traffic (--scrape-pages 0
+    to measure reads alone).
+  - Mongo: mongomock in this process, or a throwaway mongod given by --mongo-uri.
+    The --mongo-database there is overwritten with --documents synthetic listings.
+
+The app, the stand-ins and the load driver share one process, so compare runs
+with each other rather than reading the numbers as the capacity of a server.
+With mongomock every query is a Python scan and $text is unavailable; use
+--mongo-uri for query latencies that mean something. Results are written as
+JSON to benchmarks/results next to the microbenchmark runs.
+"""
+import os
+import re
+import io
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import datetime
+import platform
+import threading
+from types import SimpleNamespace
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+ENDPOINTS = ("pets", "filters", "gemini", "image", "voice")
+DEFAULT_MIX = "pets=50,filters=15,gemini=20,image=10,voice=5"
+
+PET_QUERIES = [
+    {},
+    {"county": "Cluj"},
+    {"county": "Cluj", "category": "Caini", "min_price": 100, "max_price": 1000},
+    {"breed": "Labrador Retriever"},
+    {"species": "dog", "size": "mic"},
+    {"category": "Pisici", "sort": "price_asc", "limit": 24},
+    {"min_price": 200, "max_price": 600, "limit": 24},
+    {"description_regex": "vaccinat", "county": "Bucuresti"},
+]
+
+PROMPTS = [
+    "caut un caine mic pentru apartament in Cluj",
+    "pisica british shorthair",
+    "labrador pentru copii in Bucuresti, pana in 1500 lei",
+    "vreau sa adopt o pisica",
+    "catel jucaus care sa nu fie scump",
+    "ceva linistit pentru o bunica din Iasi",
+]
+
+# Answers of the fake Gemini, picked at random per call
+FAKE_FILTERS = [
+    {"county": "Cluj", "city": None, "category": "Caini", "breed": None,
+     "min_price": None, "max_price": 1000, "description_regex": "(mic|mica)"},
+    {"county": None, "city": None, "category": "Pisici", "breed": "British Shorthair",
+     "min_price": None, "max_price": None, "description_regex": None},
+    {"county": "Bucuresti", "city": None, "category": None, "breed": "Labrador Retriever",
+     "min_price": 200, "max_price": None, "description_regex": None},
+]
+FAKE_TRAITS = [
+    "câine, labrador retriever, mare, blană aurie, expresie prietenoasă",
+    "pisică, british shorthair, medie, gri, ochi portocalii",
+    "câine, bichon, mic, alb",
+]
+FAKE_TRANSCRIPTS = [
+    "caut un catel mic in Cluj",
+    "pisica british shorthair",
+    "labrador in Bucuresti de la 200 de lei",
+]
+
+_DETAIL_LINK = re.compile(r"https://www\.example-anunturi\.ro/animale/anunt-(\d+)\.html")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}, expected one of {', '.join(ENDPOINTS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight of {name} must be a number")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one positive weight")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def fake_gemini_app(latency_ms, error_rate, error_status, rng):
+    """
+    generateContent stand-in. The answer follows the request the way the real
+    calls are told to: traits for an image, transcript and filters as JSON for a
+    recording, PetFilter JSON for a prompt, a transcript for plain transcription.
+    """
+    app = FastAPI()
+    app.state.stats = {"calls": 0, "errors": 0}
+
+    @app.post("/{version}/models/{target}")
+    async def generate_content(version: str, target: str, request: Request):
+        app.state.stats["calls"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000 * rng.uniform(0.5, 1.5))
+        if rng.random() < error_rate:
+            app.state.stats["errors"] += 1
+            return JSONResponse(status_code=error_status, content={
+                "error": {"code": error_status, "message": "Injected by the load test", "status": "UNAVAILABLE"},
+            })
+
+        body = await request.json()
+        parts = [part for content in body.get("contents", []) for part in content.get("parts", [])]
+        mime_types = [(part.get("inlineData") or part.get("inline_data") or {}).get("mimeType", "") for part in parts]
+        wants_json = (body.get("generationConfig") or {}).get("responseMimeType") == "application/json"
+
+        if any(mime.startswith("image/") for mime in mime_types):
+            text = rng.choice(FAKE_TRAITS)
+        elif any(mime.startswith("audio/") for mime in mime_types):
+            index = rng.randrange(len(FAKE_TRANSCRIPTS))
+            text = json.dumps({"transcript": FAKE_TRANSCRIPTS[index], **FAKE_FILTERS[index]}) if wants_json \
+                else FAKE_TRANSCRIPTS[index]
+        elif wants_json:
+            text = json.dumps(rng.choice(FAKE_FILTERS))
+        else:
+            text = ""
+
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": 400, "candidatesTokenCount": 40, "totalTokenCount": 440},
+            "modelVersion": target.split(":")[0],
+        }
+
+    return app
+
+
+def fake_site_app(base_url, pages, throttle, retry_after, latency_ms, rng):
+    """
+    Listings site stand-in: /animale?pag=N serves the recorded listing page with
+    its detail links rewritten to this server, past the last page it redirects
+    to /animale like the real site, and throttle of all requests get a 429.
+    """
+    from run_benchmarks import _fixture
+
+    listing_page = _fixture("listing_page.html")
+    detail_page = _fixture("detail_page.html")
+    app = FastAPI()
+    app.state.stats = {"requests": 0, "throttled": 0, "listing_pages": 0, "detail_pages": 0}
+
+    async def answer(request):
+        app.state.stats["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000 * rng.uniform(0.5, 1.5))
+        if rng.random() < throttle:
+            app.state.stats["throttled"] += 1
+            return Response(status_code=429, headers={"Retry-After": str(retry_after)})
+        return None
+
+    @app.get("/animale")
+    async def listing(request: Request, pag: int = 1):
+        throttled = await answer(request)
+        if throttled is not None:
+            return throttled
+        if "pag" in request.query_params and pag > pages:
+            return RedirectResponse("/animale", status_code=302)
+        app.state.stats["listing_pages"] += 1
+        html = _DETAIL_LINK.sub(lambda m: f"{base_url}/animale/anunt-p{pag}-{m.group(1)}.html", listing_page)
+        return HTMLResponse(html)
+
+    @app.get("/animale/{name}")
+    async def detail(name: str, request: Request):
+        throttled = await answer(request)
+        if throttled is not None:
+            return throttled
+        app.state.stats["detail_pages"] += 1
+        return HTMLResponse(detail_page)
+
+    return app
+
+
+class _AsyncCursor:
+    """
+    Cursor of the async driver over a mongomock cursor: the chained modifiers
+    pass through, to_list and async iteration read it in place.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        attribute = getattr(self._cursor, name)
+        if not callable(attribute):
+            return attribute
+
+        def chained(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            return self if result is self._cursor else result
+        return chained
+
+    async def to_list(self, length=None):
+        return list(self._cursor)
+
+    async def _iterate(self):
+        for document in self._cursor:
+            yield document
+
+    def __aiter__(self):
+        return self._iterate()
+
+
+class _AsyncCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.aggregate(*args, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class _AsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return _AsyncCollection(self._database[name])
+
+
+class _AsyncClient:
+    def __init__(self, client):
+        self._client = client
+
+    def __getitem__(self, name):
+        return _AsyncDatabase(self._client[name])
+
+    def close(self):
+        pass
+
+
+def _bulk_write_one_by_one(collection, requests):
+    """
+    mongomock 4.x cannot read the write models of PyMongo >= 4.9, so the
+    operations of a bulk write are applied one at a time.
+    """
+    from pymongo import InsertOne, UpdateOne
+
+    result = SimpleNamespace(upserted_ids={}, modified_count=0, matched_count=0, inserted_count=0)
+    for index, request in enumerate(requests):
+        if isinstance(request, UpdateOne):
+            written = collection.update_one(request._filter, request._doc, upsert=request._upsert)
+            result.modified_count += written.modified_count
+            result.matched_count += written.matched_count
+            if written.upserted_id is not None:
+                result.upserted_ids[index] = written.upserted_id
+        elif isinstance(request, InsertOne):
+            collection.insert_one(request._doc)
+            result.inserted_count += 1
+        else:
+            raise NotImplementedError(type(request).__name__)
+    result.upserted_count = len(result.upserted_ids)
+    return result
+
+
+def install_mongo_stand_in(db):
+    """
+    Give dataAccess.db a mongomock client for both the sync and the async side,
+    before the app lifespan creates its own.
+    """
+    import mongomock
+    from mongomock.collection import Collection
+
+    native_bulk_write = Collection.bulk_write
+
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        try:
+            return native_bulk_write(self, requests, ordered=ordered, **kwargs)
+        except TypeError:
+            return _bulk_write_one_by_one(self, requests)
+
+    Collection.bulk_write = bulk_write
+    db._client = mongomock.MongoClient()
+    db._async_client = _AsyncClient(db._client)
+
+
+class _ServerThread:
+    """
+    uvicorn serving one app from a background thread with its own event loop.
+    """
+
+    def __init__(self, app, port):
+        self.url = f"http://127.0.0.1:{port}"
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=port, log_level="warning", access_log=False,
+        ))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self, timeout=120):
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Server on {self.url} did not start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+class Traffic:
+    """
+    Requests for each endpoint of the mix. unique_ratio of them are made distinct
+    so they miss the response, filter, image trait and voice caches.
+    """
+
+    def __init__(self, rng, unique_ratio):
+        self.rng = rng
+        self.unique_ratio = unique_ratio
+        self.counter = 0
+        self.images = [self._noise_png() for _ in range(3)]
+        self.recordings = [self.rng.randbytes(4096) for _ in range(3)]
+
+    def _unique(self):
+        return self.rng.random() < self.unique_ratio
+
+    def _word(self):
+        self.counter += 1
+        n, letters = self.counter, ""
+        while n:
+            n, rest = divmod(n, 26)
+            letters += chr(ord("a") + rest)
+        return f"ref{letters}"
+
+    def _noise_png(self):
+        from PIL import Image
+
+        image = Image.frombytes("L", (32, 32), self.rng.randbytes(32 * 32)).resize((128, 128))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def pets(self):
+        params = dict(self.rng.choice(PET_QUERIES))
+        if self._unique():
+            params["max_price"] = self.rng.randint(500, 5000)
+        return "GET", "/pets", {"params": params}
+
+    def filters(self):
+        return "GET", "/filters", {}
+
+    def gemini(self):
+        prompt = self.rng.choice(PROMPTS)
+        if self._unique():
+            prompt = f"{prompt} {self._word()}"
+        return "GET", "/pets/gemini", {"params": {"prompt": prompt}}
+
+    def image(self):
+        data = self._noise_png() if self._unique() else self.rng.choice(self.images)
+        return "POST", "/pets/gemini/image", {"files": {"file": ("pet.png", data, "image/png")}}
+
+    def voice(self):
+        body = self.rng.randbytes(4096) if self._unique() else self.rng.choice(self.recordings)
+        return "POST", "/pets/gemini/voice", {"content": body, "headers": {"Content-Type": "audio/webm"}}
+
+
+async def _worker(client, traffic, mix, deadline, samples):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = traffic.rng.choices(names, weights)[0]
+        method, path, kwargs = getattr(traffic, name)()
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            await response.aread()
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        if samples is not None:
+            samples[name].append((time.perf_counter() - started, status))
+
+
+async def _finish_scrape(client, job_id, wait):
+    """
+    Final state of the scrape job. It gets wait seconds to finish after the
+    traffic stops, then is cancelled so it does not outlive the stand-ins.
+    """
+    from services.jobs import ACTIVE_STATUSES
+
+    deadline = time.perf_counter() + wait
+    cancelled = False
+    while True:
+        job = (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] not in ACTIVE_STATUSES:
+            return job
+        if time.perf_counter() > deadline:
+            if cancelled:
+                return job
+            await client.delete(f"/jobs/{job_id}")
+            cancelled = True
+            deadline = time.perf_counter() + wait
+        await asyncio.sleep(0.5)
+
+
+async def drive(args, app_url, site_url, traffic):
+    """
+    Start the scrape of the fake site, warm up, run the measured phase, then let
+    the scrape finish. Returns (samples per endpoint, measured seconds, scrape job, server stats).
+    """
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=app_url, timeout=args.timeout, limits=limits) as client:
+        job_id = None
+        if args.scrape_pages:
+            response = await client.post("/update-data", json={
+                "url": f"{site_url}/animale", "concurrent": True, "rate": args.scrape_rate, "resume": False,
+            })
+            response.raise_for_status()
+            job_id = response.json()["job_id"]
+
+        if args.warmup:
+            deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(_worker(client, traffic, args.mix, deadline, None) for _ in range(args.concurrency)))
+
+        samples = {name: [] for name in args.mix}
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(_worker(client, traffic, args.mix, deadline, samples) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        scrape = await _finish_scrape(client, job_id, args.scrape_wait) if job_id else None
+        server = {}
+        for name in ("gemini", "caches", "catalog", "enrichment"):
+            response = await client.get(f"/admin/{name}")
+            server[name] = response.json() if response.status_code == 200 else {"status": response.status_code}
+    return samples, elapsed, scrape, server
+
+
+def summarize(samples, elapsed):
+    from run_benchmarks import _latency
+
+    results = {}
+    for name, entries in samples.items():
+        ok = [seconds for seconds, status in entries if isinstance(status, int) and status < 400]
+        errors = {}
+        for _, status in entries:
+            if not (isinstance(status, int) and status < 400):
+                errors[str(status)] = errors.get(str(status), 0) + 1
+        results[name] = {
+            "requests": len(entries),
+            "throughput_rps": round(len(entries) / elapsed, 2),
+            "error_rate": round(sum(errors.values()) / len(entries), 4) if entries else 0,
+            "errors": errors,
+            "latency": {**_latency(ok), "max_ms": round(max(ok) * 1000, 4)} if ok else None,
+        }
+    total = sum(len(entries) for entries in samples.values())
+    results["total"] = {"requests": total, "throughput_rps": round(total / elapsed, 2)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of measured traffic")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of unmeasured traffic first")
+    parser.add_argument("--concurrency", type=int, default=32, help="Clients sending requests back to back")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help=f"Endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--unique-ratio", type=float, default=0.3, help="Share of requests made distinct to miss the caches")
+    parser.add_argument("--timeout", type=float, default=60, help="Client timeout per request in seconds")
+    parser.add_argument("--documents", type=int, default=5000, help="Synthetic listings seeded before the run")
+    parser.add_argument("--catalog", action="store_true", help="Answer /pets from the in-process catalog snapshot")
+    parser.add_argument("--gemini-latency-ms", type=float, default=400, help="Mean latency of the fake Gemini")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0, help="Share of fake Gemini calls that fail")
+    parser.add_argument("--gemini-error-status", type=int, default=503, help="Status of the injected Gemini failures")
+    parser.add_argument("--scrape-pages", type=int, default=3, help="Listing pages of the fake site, 0 for no scrape")
+    parser.add_argument("--scrape-wait", type=float, default=60, help="Seconds the scrape may run on after the traffic")
+    parser.add_argument("--scrape-rate", type=float, default=8, help="Initial requests per second of the crawler")
+    parser.add_argument("--site-throttle", type=float, default=0.05, help="Share of fake site requests answered with 429")
+    parser.add_argument("--site-retry-after", type=int, default=1, help="Retry-After seconds sent with the 429s")
+    parser.add_argument("--site-latency-ms", type=float, default=50, help="Mean latency of the fake site")
+    parser.add_argument("--mongo-uri", help="A throwaway mongod to use instead of mongomock")
+    parser.add_argument("--mongo-database", default="pets_load_test", help="Database overwritten on --mongo-uri")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the traffic and the stand-ins")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's INFO logs")
+    parser.add_argument("--output", help="Directory for the JSON results (default benchmarks/results)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+    if isinstance(args.mix, str):
+        args.mix = _parse_mix(args.mix)
+    if args.mongo_uri and not args.mongo_database.endswith("load_test"):
+        parser.error("--mongo-database is overwritten, so its name must end with load_test")
+
+    gemini_port, site_port, app_port = _free_port(), _free_port(), _free_port()
+    # read by the app modules at import
+    os.environ["GEMINI_API_KEY"] = "load-test"
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{gemini_port}"
+    os.environ["CATALOG_SNAPSHOT"] = "1" if args.catalog else "0"
+    os.environ["MONGODB_TEXT_SEARCH"] = "1" if args.mongo_uri else "0"
+    os.environ["GEMINI_FILTER_CACHE_PATH"] = ""
+    os.environ["IMAGE_TRAIT_CACHE_PATH"] = ""
+    if args.mongo_uri:
+        os.environ["MONGODB_CONNECTION_STRING"] = args.mongo_uri
+        os.environ["MONGODB_DATABASE"] = args.mongo_database
+
+    import logging
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    from run_benchmarks import _synthetic_listings, _git_commit, compare, RESULTS_DIR
+    from dataAccess import db
+    import main as app_module
+
+    if not args.mongo_uri:
+        install_mongo_stand_in(db)
+    db.insert_pet_cards(_synthetic_listings(args.documents), overwrite=True)
+
+    rng = random.Random(args.seed)
+    site_url = f"http://127.0.0.1:{site_port}"
+    gemini = _ServerThread(fake_gemini_app(
+        args.gemini_latency_ms, args.gemini_error_rate, args.gemini_error_status, random.Random(args.seed + 1),
+    ), gemini_port).start()
+    site = _ServerThread(fake_site_app(
+        site_url, args.scrape_pages, args.site_throttle, args.site_retry_after, args.site_latency_ms,
+        random.Random(args.seed + 2),
+    ), site_port).start()
+    app = _ServerThread(app_module.app, app_port).start()
+    try:
+        samples, elapsed, scrape, server = asyncio.run(drive(args, app.url, site_url, Traffic(rng, args.unique_ratio)))
+    finally:
+        app.stop()
+        site.stop()
+        gemini.stop()
+
+    results = {
+        "endpoints": summarize(samples, elapsed),
+        "scrape": scrape,
+        "stand_ins": {"gemini": gemini.server.config.app.state.stats, "site": site.server.config.app.state.stats},
+        "server": server,
+    }
+    run = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mongo": "mongod" if args.mongo_uri else "mongomock",
+            "options": {key: value for key, value in vars(args).items()
+                        if key not in ("mongo_uri", "output", "compare", "verbose")},
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR
+    os.makedirs(output, exist_ok=True)
+    path = os.path.join(output, f"load-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2, default=str)
+
+    print(json.dumps(results["endpoints"], indent=2))
+    if args.compare:
+        compare(args.compare, results)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
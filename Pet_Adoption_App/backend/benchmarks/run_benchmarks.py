@@ -0,0 +1,321 @@
+"""
+Offline microbenchmarks for the scraper parsers, the filter builders and the
+query layer, driven by the recorded pages in benchmarks/fixtures. Run from the
+backend directory:
+
+    python benchmarks/run_benchmarks.py [--quick] [--compare benchmarks/results/<run>.json]
+
+Query benchmarks use mongomock as the Mongo stand-in (pip install mongomock) and
+are skipped when it is not installed. Results are written as JSON to
+benchmarks/results so runs can be compared.
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import contextlib
+import datetime
+import platform
+import subprocess
+import statistics
+import tracemalloc
+from types import SimpleNamespace
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# mongomock has no $text support, so description filters are built as $regex
+os.environ.setdefault("MONGODB_TEXT_SEARCH", "0")
+
+from services import scraper  # noqa: E402
+from services.parsers import HTML_PARSER, parse_price, parse_listing_page, parse_detail_fields  # noqa: E402
+from services.catalog import CatalogSnapshot  # noqa: E402
+from dataAccess import db  # noqa: E402
+from dataAccess.queries import build_pet_filter  # noqa: E402
+from services.enrichment import enrich_card  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BACKEND_DIR, "benchmarks", "fixtures")
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+PRICE_SAMPLES = ["1.200 lei", "350 lei", "2500", "Negociabil", "", "1 500,00 RON", "€ 400"]
+
+SAMPLE_FILTERS = {
+    "empty": {},
+    "county": {"county": "Cluj"},
+    "county_category_price": {"county": "Cluj", "category": "Caini", "min_price": 100, "max_price": 1000},
+    "breed": {"breed": "Labrador Retriever"},
+    "description": {"description_regex": "(vaccina|pedigree)", "category": "Caini"},
+    "price_range": {"min_price": 200, "max_price": 600},
+    # the same question asked of the description and of the ingest-time tags
+    "size_regex": {"description_regex": r"\b(mic|mica)\b", "category": "Caini"},
+    "size_tags": {"any_tags": ["size:mic"], "category": "Caini"},
+}
+# Filter pairs timed against each other, checked to return the same rows first
+EQUIVALENT_FILTERS = [("size_regex", "size_tags")]
+# Appended to the fixture description; the small sizes only use the words the size_regex filter names
+SIZE_PHRASES = ["", " Talie mica.", " Un caine mic si jucaus.", " Talie medie.", " Talie mare."]
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _latency(samples):
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 4),
+        "p50_ms": round(_percentile(samples, 0.50) * 1000, 4),
+        "p95_ms": round(_percentile(samples, 0.95) * 1000, 4),
+        "p99_ms": round(_percentile(samples, 0.99) * 1000, 4),
+    }
+
+
+def _timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _peak_memory_kb(func):
+    """
+    Peak traced allocation of one call, measured apart from the timed runs.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_listing_parse(iterations):
+    html = _fixture("listing_page.html")
+    cards = len(parse_listing_page(html))
+    samples = _timed(lambda: parse_listing_page(html), iterations)
+    return {
+        "pages_per_sec": round(len(samples) / sum(samples), 2),
+        "cards_per_page": cards,
+        "per_card_us": round(statistics.mean(samples) / cards * 1e6, 2),
+        "peak_memory_kb": _peak_memory_kb(lambda: parse_listing_page(html)),
+        **_latency(samples),
+    }
+
+
+def bench_detail_parse(iterations):
+    html = _fixture("detail_page.html")
+    samples = _timed(lambda: parse_detail_fields(html), iterations)
+    return {
+        "pages_per_sec": round(len(samples) / sum(samples), 2),
+        "peak_memory_kb": _peak_memory_kb(lambda: parse_detail_fields(html)),
+        **_latency(samples),
+    }
+
+
+def bench_parse_price(iterations):
+    samples = _timed(lambda: [parse_price(value) for value in PRICE_SAMPLES], iterations)
+    return {"prices_per_sec": round(len(PRICE_SAMPLES) * len(samples) / sum(samples), 1), **_latency(samples)}
+
+
+class FixtureSession:
+    """
+    Stands in for the scraper's requests session: listing pages 1..pages from the
+    fixture, then the redirect to the base URL that ends the crawl, and the
+    detail fixture for every card link.
+    """
+
+    def __init__(self, base_url, pages):
+        self.base_url = base_url
+        self.pages = pages
+        self.listing = _fixture("listing_page.html")
+        self.detail = _fixture("detail_page.html")
+
+    def get(self, url, headers=None):
+        if url.startswith(f"{self.base_url}?pag="):
+            page = int(url.rsplit("=", 1)[1])
+            if page > self.pages:
+                return SimpleNamespace(status_code=200, url=self.base_url, text="", headers={})
+            # distinct links per page so promoted-card de-duplication behaves as in a real crawl
+            text = self.listing.replace("anunt-", f"p{page}-anunt-")
+            return SimpleNamespace(status_code=200, url=url, text=text, headers={})
+        return SimpleNamespace(status_code=200, url=url, text=self.detail, headers={"ETag": '"fixture"'})
+
+
+def bench_scrape(pages):
+    """
+    scrape_pet_cards end to end against FixtureSession, with the politeness
+    sleeps disabled so only parsing and bookkeeping are measured.
+    """
+    base_url = "https://www.example-anunturi.ro/animale"
+    original_session, original_time = scraper.session, scraper.time
+    scraper.session = FixtureSession(base_url, pages)
+    scraper.time = SimpleNamespace(sleep=lambda seconds: None)
+    try:
+        # the scraper prints a progress line per card
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            cards = scraper.scrape_pet_cards(base_url)
+            elapsed = time.perf_counter() - started
+            peak = _peak_memory_kb(lambda: scraper.scrape_pet_cards(base_url))
+    finally:
+        scraper.session, scraper.time = original_session, original_time
+    return {
+        "pages": pages,
+        "cards": len(cards),
+        "pages_per_sec": round(pages / elapsed, 2),
+        "cards_per_sec": round(len(cards) / elapsed, 2),
+        "per_card_ms": round(elapsed / len(cards) * 1000, 4),
+        "peak_memory_kb": peak,
+    }
+
+
+def bench_filter_build(iterations):
+    results = {}
+    for name, filters in SAMPLE_FILTERS.items():
+        samples = _timed(lambda: build_pet_filter(filters), iterations)
+        results[name] = {"per_build_us": round(statistics.mean(samples) * 1e6, 3)}
+    return results
+
+
+def _synthetic_listings(count):
+    """
+    Cards shaped like the parsed fixtures with varied county, category, breed, size and price.
+    """
+    card = parse_listing_page(_fixture("listing_page.html"))[0]
+    detail = parse_detail_fields(_fixture("detail_page.html"))
+    rng = random.Random(42)
+    counties = ["Cluj", "Bucuresti", "Iasi", "Timis", "Brasov", "Constanta", "Bihor", "Dolj"]
+    breeds = ["Labrador Retriever", "Ciobanesc German", "Husky Siberian", "Bichon", "British Shorthair", None]
+    listings = []
+    for i in range(count):
+        listings.append(enrich_card({
+            **card, **detail,
+            "link": f"https://www.example-anunturi.ro/animale/anunt-{i}.html",
+            "description": f"{detail.get('description') or ''}{rng.choice(SIZE_PHRASES)}",
+            "county": rng.choice(counties),
+            "category": rng.choice(["Caini", "Pisici", "Adoptii"]),
+            "breed": rng.choice(breeds),
+            "price": rng.choice([None, 0, 150, 300, 450, 800, 1200, 2500]),
+            "promoted": rng.random() < 0.1,
+        }))
+    return listings
+
+
+def bench_queries(documents, iterations):
+    try:
+        import mongomock
+    except ImportError:
+        return {"skipped": "mongomock is not installed"}
+
+    stand_in = mongomock.MongoClient()["pets"]
+    stand_in["animalutul"].insert_many([dict(doc) for doc in _synthetic_listings(documents)])
+    original_get_db = db.get_db
+    db.get_db = lambda: stand_in
+    # the per-query info logs would dominate the timings
+    db.logger.disabled = True
+    try:
+        for names in EQUIVALENT_FILTERS:
+            counts = [len(db.get_all_pet_cards(build_pet_filter(SAMPLE_FILTERS[name]), max_results=None,
+                                               max_time_ms=None)) for name in names]
+            if len(set(counts)) != 1:
+                raise RuntimeError(f"{' and '.join(names)} should return the same rows, got {counts}")
+        snapshot = CatalogSnapshot(db.get_all_pet_cards({}, max_results=None, max_time_ms=None))
+        results = {"documents": documents, "catalog_build_ms": round(snapshot.build_seconds * 1000, 2)}
+        for name, filters in SAMPLE_FILTERS.items():
+            mongo_filter = build_pet_filter(filters)
+            # uncapped like snapshot.query, so both sides return the same rows
+            returned = len(db.get_all_pet_cards(mongo_filter, max_results=None, max_time_ms=None))
+            mongo = _timed(lambda: db.get_all_pet_cards(mongo_filter, max_results=None, max_time_ms=None), iterations)
+            catalog = _timed(lambda: snapshot.query({**mongo_filter, "stale": {"$ne": True}}), iterations)
+            results[name] = {
+                "documents_returned": returned,
+                "mongo_stand_in": _latency(mongo),
+                "catalog_snapshot": _latency(catalog),
+            }
+        return results
+    finally:
+        db.get_db = original_get_db
+        db.logger.disabled = False
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(previous_path, results):
+    """
+    Print every numeric metric next to the value of an earlier run.
+    """
+    with open(previous_path, encoding="utf-8") as f:
+        previous = _flatten(json.load(f)["results"])
+    for key, value in _flatten(results).items():
+        before = previous.get(key)
+        if before:
+            print(f"{key:70} {before:>12} -> {value:>12} ({(value - before) / before * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for a smoke run")
+    parser.add_argument("--documents", type=int, default=5000, help="Listings seeded into the Mongo stand-in")
+    parser.add_argument("--output", default=RESULTS_DIR, help="Directory for the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    iterations = 20 if args.quick else 200
+    results = {
+        "listing_parse": bench_listing_parse(iterations),
+        "detail_parse": bench_detail_parse(iterations),
+        "parse_price": bench_parse_price(iterations * 50),
+        "scrape_pet_cards": bench_scrape(2 if args.quick else 10),
+        "filter_build": bench_filter_build(iterations * 50),
+        "queries": bench_queries(1000 if args.quick else args.documents, iterations // 4),
+    }
+    run = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "html_parser": HTML_PARSER,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"bench-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    if args.compare:
+        compare(args.compare, results)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
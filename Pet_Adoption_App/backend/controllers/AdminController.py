@@ -0,0 +1,175 @@
+from fastapi import APIRouter, HTTPException, Query
+from dataAccess.db import get_db, QUERY_MAX_TIME_MS, QUERY_MAX_RESULTS, SLOW_QUERY_MS
+from dataAccess.indexes import ensure_indexes, explain_report, SAMPLE_FILTERS
+from dataAccess.queries import recorded_filters, query_reports, MAX_PATTERN_LENGTH, MAX_ALTERNATIVES
+from services.cache import cache_stats
+from services.query_parser import fast_path_stats
+from services.normalization import normalization_stats
+from services.gemini import gemini_stats
+from services.images import image_cache_stats
+from services.catalog import catalog_stats, rebuild_catalog
+from services.enrichment import enrichment_stats, backfill_enrichment
+from services.similarity import similarity_stats
+from services.thumbnails import thumbnail_stats
+from services.metrics import metrics_snapshot, recent_traces
+from services.jobs import list_jobs
+from services.live_feed import live_feed_stats
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin")
+
+
+@router.post("/indexes")
+def create_indexes():
+    try:
+        return {"status": "success", "indexes": ensure_indexes(get_db())}
+    except Exception as e:
+        logger.error(f"Error creating indexes: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating indexes: {str(e)}")
+
+
+@router.get("/query-report")
+def query_report():
+    """
+    Explain the sample filters plus one filter per query shape served since startup,
+    collection scans first.
+    """
+    try:
+        report = explain_report(get_db(), SAMPLE_FILTERS + recorded_filters())
+    except Exception as e:
+        logger.error(f"Error building query report: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error building query report: {str(e)}")
+
+    return {
+        "collection_scans": sum(1 for entry in report if entry.get("collection_scan")),
+        "queries": [{**entry, "filter": str(entry["filter"])} for entry in report],
+    }
+
+
+@router.get("/query-guard")
+def get_query_guard_report(limit: int = Query(50, ge=1, le=200)):
+    """
+    Limits applied to client queries and the latest rejected, slow, timed out
+    and truncated ones.
+    """
+    return {
+        "limits": {
+            "max_time_ms": QUERY_MAX_TIME_MS,
+            "max_results": QUERY_MAX_RESULTS,
+            "slow_query_ms": SLOW_QUERY_MS,
+            "max_pattern_length": MAX_PATTERN_LENGTH,
+            "max_alternatives": MAX_ALTERNATIVES,
+        },
+        **query_reports(limit=limit),
+    }
+
+
+@router.get("/caches")
+def get_cache_stats():
+    return cache_stats()
+
+
+@router.get("/nl-fast-path")
+def get_fast_path_stats():
+    return fast_path_stats()
+
+
+@router.get("/normalization")
+def get_normalization_stats():
+    """
+    Size of the county/city/breed indexes and how model output matched them.
+    """
+    return normalization_stats()
+
+
+@router.get("/gemini")
+def get_gemini_stats():
+    return gemini_stats()
+
+
+@router.get("/image-cache")
+def get_image_cache_stats():
+    return image_cache_stats()
+
+
+@router.get("/catalog")
+def get_catalog_stats():
+    return catalog_stats()
+
+
+@router.post("/catalog")
+def build_catalog():
+    try:
+        rebuild_catalog()
+    except Exception as e:
+        logger.error(f"Error rebuilding catalog snapshot: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error rebuilding catalog snapshot: {str(e)}")
+    return catalog_stats()
+
+
+@router.get("/enrichment")
+def get_enrichment_stats():
+    try:
+        return enrichment_stats()
+    except Exception as e:
+        logger.error(f"Error reading enrichment stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error reading enrichment stats: {str(e)}")
+
+
+@router.post("/enrichment")
+def run_enrichment():
+    """
+    Re-tag the listings enriched by an older version of the rules, then rebuild
+    the catalog snapshot so its tag bitmaps match.
+    """
+    try:
+        updated = backfill_enrichment()
+        if updated:
+            rebuild_catalog()
+    except Exception as e:
+        logger.error(f"Error enriching listings: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error enriching listings: {str(e)}")
+    return {"updated": updated, **enrichment_stats()}
+
+
+@router.get("/similarity")
+def get_similarity_stats():
+    return similarity_stats()
+
+
+@router.get("/thumbnails")
+def get_thumbnail_stats():
+    return thumbnail_stats()
+
+
+@router.get("/live-feed")
+def get_live_feed_stats():
+    return live_feed_stats()
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Route, Mongo and Gemini latency histograms and counters, cache hit ratios and
+    the throughput of running scrapes.
+    """
+    return {
+        **metrics_snapshot(),
+        "caches": {**cache_stats(), "image_traits": image_cache_stats(), "thumbnails": thumbnail_stats()},
+        "gemini_limits": gemini_stats(),
+        "scrapes": [
+            {"job_id": job["job_id"], "url": job["url"], "status": job["status"], **job["progress"]}
+            for job in list_jobs() if job["status"] in ("running", "cancelling")
+        ],
+    }
+
+
+@router.get("/traces")
+def get_traces(
+    limit: int = Query(50, ge=1, le=500),
+    min_ms: float = Query(0, ge=0, description="Only requests slower than this"),
+):
+    return recent_traces(limit=limit, min_ms=min_ms)
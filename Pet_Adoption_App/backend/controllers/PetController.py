@@ -1,7 +1,24 @@
-from fastapi import APIRouter, HTTPException, Body, Query
+from fastapi import APIRouter, HTTPException, Body, Query, Request, Response
+from fastapi.responses import StreamingResponse, RedirectResponse
 from typing import Optional, List
-from services.scraper import scrape_pet_cards
-from dataAccess.db import insert_pet_cards, get_all_pet_cards
+from services.crawler import DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_PARSE_WORKERS
+from services.jobs import submit_scrape, get_job, list_jobs, cancel_job, JobConflict
+from services.facets import get_facets, refresh_facets, invalidate_facets
+from services.catalog import query_catalog, rebuild_catalog
+from services.similarity import similar_links
+from services.enrichment import with_tags
+from services.http_cache import cached_json_response, dumps
+from services.live_feed import subscribe, event_stream
+from services.thumbnails import THUMBNAIL_SIZES, THUMBNAIL_MAX_AGE, image_urls, get_thumbnail, etag_for
+from bson.objectid import ObjectId
+from dataAccess.db import (
+    find_pet_cards_page_async, stream_pet_cards_async, get_all_pet_cards_async, get_dataset_version_async,
+    QUERY_MAX_RESULTS,
+)
+from dataAccess.pagination import SORTS, MAX_PAGE_SIZE, projection_for, encode_cursor, decode_cursor
+from dataAccess.queries import build_pet_filter, RejectedPattern
+from pymongo.errors import ExecutionTimeout
+import asyncio
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -11,103 +28,262 @@ router = APIRouter()
 
 @router.post("/update-data")
 def update_data(
+    response: Response,
     url: str = Body(..., embed=True, description="The URL used in scraper"),
     overwrite: bool = Body(False, embed=True, description="Clear database(true) or not(false) before inserting"),
+    concurrent: bool = Body(False, embed=True, description="Use the async crawler instead of the sequential scraper"),
+    concurrency: int = Body(DEFAULT_CONCURRENCY, embed=True, ge=1, description="Max in-flight requests per host (async crawler)"),
+    rate: float = Body(DEFAULT_RATE, embed=True, gt=0, description="Initial requests per second (async crawler)"),
+    incremental: bool = Body(False, embed=True, description="Skip detail pages of stored links and mark vanished listings stale"),
+    revalidate: bool = Body(False, embed=True, description="With incremental, re-check stored links using ETag/Last-Modified"),
+    parse_workers: int = Body(DEFAULT_PARSE_WORKERS, embed=True, ge=0, description="Processes parsing HTML off the fetch loop (async crawler, 0 = inline)"),
+    batch_size: int = Body(500, embed=True, ge=1, description="Cards per bulk write"),
+    resume: bool = Body(True, embed=True, description="Continue from the checkpoint of an interrupted crawl of this URL"),
 ):
-    pet_cards = scrape_pet_cards(url)
-    if not pet_cards:
-        raise HTTPException(status_code=500, detail="No data scraped")
     try:
-        inserted_ids = insert_pet_cards(pet_cards, overwrite=overwrite)
-        return {"status": "success", "inserted_ids": [str(_id) for _id in inserted_ids]}
+        job = submit_scrape(
+            url, on_success=_refresh_derived_data, overwrite=overwrite, incremental=incremental,
+            revalidate=revalidate, concurrent=concurrent, batch_size=batch_size, resume=resume,
+            concurrency=concurrency, rate=rate, parse_workers=parse_workers,
+        )
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "job_id": e.job.id})
+    response.status_code = 202
+    return {"status": "accepted", "job_id": job.id, "job_url": f"/jobs/{job.id}"}
+
+
+def _refresh_derived_data():
+    try:
+        refresh_facets()
+    except Exception as e:
+        logger.error(f"Error refreshing filter facets: {str(e)}")
+        invalidate_facets()
+    try:
+        rebuild_catalog()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error rebuilding catalog snapshot: {str(e)}")
+
+
+@router.get("/jobs")
+def get_jobs():
+    return list_jobs()
+
+
+@router.get("/jobs/{job_id}")
+def get_scrape_job(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.delete("/jobs/{job_id}")
+def cancel_scrape_job(job_id: str):
+    job = cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 @router.get("/filters")
-def get_filters():
+async def get_filters(request: Request):
+    async def produce():
+        return await get_facets(version), {}
+
     try:
-        pets = get_all_pet_cards({})
-        
-        if not pets:
-            logger.warning("No pets found in database for filters")
-            return {
-                "counties": [],
-                "categories": [],
-                "breeds": [],
-            }
-            
-        logger.info(f"Fetched {len(pets)} pets for filters")
-        
-        counties = list(set(p.get("county", "") for p in pets if p.get("county")))
-        categories = list(set(p.get("category", "") for p in pets if p.get("category")))
-        breeds = list(set(p.get("breed", "") for p in pets if p.get("breed")))
-        
-        logger.info(f"Filter counts: counties={len(counties)}, categories={len(categories)}")
-        
-        return {
-            "counties": counties,
-            "categories": categories,
-            "breeds": breeds,
-        }
+        version = await get_dataset_version_async()
+        return await cached_json_response(request, version, produce)
     except Exception as e:
         logger.error(f"Error fetching filters: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching filters: {str(e)}")
 
 
+def _ndjson(pets):
+    async def lines():
+        async for pet in pets:
+            yield dumps(pet) + b"\n"
+    return lines()
+
 
 @router.get("/pets")
-def get_pets(
+async def get_pets(
+    request: Request,
     description_regex: Optional[str] = Query(None, description="Filtru pentru descriere"),
     county: Optional[str] = Query(None, description="Filtru pentru judet"),
     city: Optional[str] = Query(None, description="Filtru pentru oras"),
     category: Optional[str] = Query(None, description="Filtru pentru categoria principala (caini, pisici, adoptii)"),
     breed: Optional[str] = Query(None, description="Filtru pentru rasa"),
     min_price: Optional[float] = Query(None, description="Pret minim"),
-    max_price: Optional[float] = Query(None, description="Pret maxim")
+    max_price: Optional[float] = Query(None, description="Pret maxim"),
+    species: Optional[str] = Query(None, description="dog sau cat"),
+    size: Optional[str] = Query(None, description="Talia: mic, mediu sau mare"),
+    color: Optional[str] = Query(None, description="Culori separate prin virgula, toate trebuie sa apara (ex. alb,negru)"),
+    age: Optional[str] = Query(None, description="Varsta: pui, junior, adult sau senior"),
+    listing: Optional[str] = Query(None, pattern="^(adoptie|vanzare)$", description="adoptie sau vanzare"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Marimea paginii; cursorul urmator vine in headerul X-Next-Cursor. Fara limit raspunsul se opreste la MONGODB_MAX_RESULTS, cu X-Truncated: true"),
+    cursor: Optional[str] = Query(None, description="Cursorul primit de la pagina anterioara"),
+    sort: str = Query("default", pattern=f"^({'|'.join(SORTS)})$", description="Ordonare: " + ", ".join(SORTS)),
+    fields: Optional[str] = Query(None, description="'list' pentru campurile din grila sau lista de campuri separate prin virgula"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json sau ndjson (streaming, ultima linie poate fi {next_cursor})"),
 ):
     try:
-        filter_query = {}
-        
-        logger.info(f"Filter params: county={county}, category={category}, breed={breed}")
-
-        if description_regex:
-            filter_query["description"] = {"$regex": description_regex, "$options": "i"}
-        if county:
-            filter_query["county"] = county
-        if city:
-            filter_query["city"] = city
-        if category:
-            filter_query["category"] = category
-        if breed:
-            filter_query["breed"] = breed
-        if min_price is not None or max_price is not None:
-            price_filter = {}
-            if min_price is not None:
-                price_filter["$gte"] = min_price
-            if max_price is not None:
-                price_filter["$lte"] = max_price
-            filter_query["price"] = price_filter
-        
-        logger.info(f"MongoDB query: {filter_query}")
-        
         try:
-            pets = get_all_pet_cards(filter_query)
-            
+            filter_query = build_pet_filter(with_tags({
+                "description_regex": description_regex, "county": county, "city": city, "category": category,
+                "breed": breed, "min_price": min_price, "max_price": max_price,
+                "species": species, "size": size, "colors": color, "age": age, "listing": listing,
+            }))
+        except RejectedPattern as e:
+            raise HTTPException(status_code=400, detail=f"description_regex rejected: {str(e)}")
+        
+        logger.debug("Filter params: county=%s, category=%s, breed=%s", county, category, breed)
+
+        logger.debug("MongoDB query: %s", filter_query)
+
+        projection = projection_for(fields)
+        if cursor:
+            try:
+                decode_cursor(sort, cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        if format == "ndjson":
+            pets = stream_pet_cards_async(filter_query, sort=sort, limit=limit, cursor=cursor, projection=projection)
+            return StreamingResponse(_ndjson(pets), media_type="application/x-ndjson")
+
+        version = await get_dataset_version_async()
+
+        async def produce():
+            pets = None
+            next_cursor = None
+            if limit is None and cursor is None and sort == "default":
+                # one past the cap tells whether the result was cut
+                pets = query_catalog(filter_query, projection, version, max_results=QUERY_MAX_RESULTS + 1)
+                if pets is not None and len(pets) > QUERY_MAX_RESULTS:
+                    pets = pets[:QUERY_MAX_RESULTS]
+                    next_cursor = encode_cursor(sort, {"_id": ObjectId(pets[-1]["_id"])})
             if pets is None:
-                logger.warning("get_all_pet_cards returned None, using empty list instead")
-                pets = []
-                
-            logger.info(f"Found {len(pets)} pets matching criteria")
+                pets, next_cursor = await find_pet_cards_page_async(
+                    filter_query, sort=sort, limit=limit, cursor=cursor, projection=projection
+                )
+
+            logger.debug("Found %d pets matching criteria", len(pets))
             
             for pet in pets:
                 if "_id" not in pet:
                     pet["_id"] = str(hash(pet.get("link", "") or ""))
             
-            return pets
+            headers = {}
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+                if limit is None:
+                    headers["X-Truncated"] = "true"
+            return pets, headers
+
+        try:
+            return await cached_json_response(request, version, produce)
+        except ExecutionTimeout:
+            raise HTTPException(status_code=503, detail="Query took too long, narrow the filters")
         except Exception as e:
             logger.error(f"Database error: {str(e)}")
             return []
-            
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching pets: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error fetching pets: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching pets: {str(e)}")
+
+
+@router.get("/pets/live")
+async def get_live_pets(
+    request: Request,
+    county: Optional[str] = Query(None, description="Filtru pentru judet"),
+    city: Optional[str] = Query(None, description="Filtru pentru oras"),
+    category: Optional[str] = Query(None, description="Filtru pentru categoria principala (caini, pisici, adoptii)"),
+    breed: Optional[str] = Query(None, description="Filtru pentru rasa"),
+    min_price: Optional[float] = Query(None, description="Pret minim"),
+    max_price: Optional[float] = Query(None, description="Pret maxim"),
+    updates: bool = Query(False, description="Trimite si anunturile existente actualizate, nu doar pe cele noi"),
+):
+    """
+    Server-sent events with the listings written by scrapes from now on: "listing"
+    for new ones, "update" for changed ones when requested, and "resync" when the
+    client fell behind and should reload /pets. Reconnecting with Last-Event-ID
+    replays what was missed while it is still buffered.
+    """
+    subscriber = subscribe({
+        "county": county, "city": city, "category": category, "breed": breed,
+        "min_price": min_price, "max_price": max_price,
+    }, updates=updates)
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many live feed subscribers")
+
+    last_event_id = request.headers.get("last-event-id")
+    return StreamingResponse(
+        event_stream(subscriber, request, int(last_event_id) if last_event_id and last_event_id.isdigit() else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/pets/{pet_id}/similar")
+async def get_similar_pets(
+    pet_id: str,
+    limit: int = Query(12, ge=1, le=100, description="Numarul de anunturi similare"),
+):
+    """
+    Listings whose title, description and breed are closest to this one, best
+    match first, each with its cosine similarity.
+    """
+    if not ObjectId.is_valid(pet_id):
+        raise HTTPException(status_code=404, detail="Pet not found")
+    try:
+        pets = await get_all_pet_cards_async({"_id": pet_id})
+        if not pets:
+            raise HTTPException(status_code=404, detail="Pet not found")
+
+        matches = await asyncio.to_thread(similar_links, pets[0], limit)
+        scores = dict(matches)
+        similar = await get_all_pet_cards_async({"link": {"$in": list(scores)}})
+        for pet in similar:
+            pet["similarity"] = round(scores[pet["link"]], 4)
+        similar.sort(key=lambda pet: pet["similarity"], reverse=True)
+        return similar
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching similar pets: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching similar pets: {str(e)}")
+
+
+@router.get("/thumbnails/{pet_id}")
+async def get_pet_thumbnail(
+    pet_id: str,
+    request: Request,
+    size: str = Query("small", pattern=f"^({'|'.join(THUMBNAIL_SIZES)})$", description="Marimea: " + ", ".join(THUMBNAIL_SIZES)),
+):
+    """
+    Resized copy of the listing image from the local disk cache, with a strong
+    ETag and long cache lifetime. Falls back to a redirect to the original image
+    when it cannot be fetched or decoded.
+    """
+    image_url = image_urls.get(pet_id)
+    if image_url is None:
+        if not ObjectId.is_valid(pet_id):
+            raise HTTPException(status_code=404, detail="Pet not found")
+        pets, _ = await find_pet_cards_page_async({"_id": pet_id}, projection={"image_url": 1})
+        if not pets or not pets[0].get("image_url"):
+            raise HTTPException(status_code=404, detail="Pet image not found")
+        image_url = pets[0]["image_url"]
+        image_urls.set(pet_id, image_url)
+
+    try:
+        data = await get_thumbnail(image_url, size)
+    except Exception as e:
+        logger.warning(f"Thumbnail for {pet_id} unavailable, redirecting to source: {str(e)}")
+        return RedirectResponse(image_url, status_code=307)
+
+    headers = {"ETag": etag_for(data), "Cache-Control": f"public, max-age={THUMBNAIL_MAX_AGE}"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type="image/jpeg", headers=headers)
@@ -1,67 +1,502 @@
 import os
+import time
+import uuid
+import inspect
+import datetime
 import pymongo
+from pymongo import UpdateOne, InsertOne, ReturnDocument
+from pymongo.errors import ExecutionTimeout
+from bson.objectid import ObjectId
 from dotenv import load_dotenv
+from dataAccess.queries import record_query_shape, query_shape, report_query
+from dataAccess.pagination import SORTS, encode_cursor, paged_filter
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def get_db():
-    load_dotenv()
+load_dotenv()
+
+DATABASE_NAME = os.getenv("MONGODB_DATABASE", "pets")
+# How long a process trusts its last read of the dataset version before asking Mongo again
+DATASET_VERSION_TTL = float(os.getenv("DATASET_VERSION_TTL_SECONDS", "5"))
+# Server-side time limit and result cap of the finds run for API requests
+QUERY_MAX_TIME_MS = int(os.getenv("MONGODB_MAX_TIME_MS", "3000"))
+QUERY_MAX_RESULTS = int(os.getenv("MONGODB_MAX_RESULTS", "5000"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+
+_client = None
+_async_client = None
+
+
+def _client_options():
+    options = {
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+    }
+    if os.getenv("MONGODB_SOCKET_TIMEOUT_MS"):
+        options["socketTimeoutMS"] = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS"))
+    if os.getenv("MONGODB_MAX_IDLE_TIME_MS"):
+        options["maxIdleTimeMS"] = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS"))
+    return options
+
+
+def _connection_string():
     connection_string = os.getenv("MONGODB_CONNECTION_STRING")
-    
     if not connection_string:
-        logger.error("MongoDB connection string is missing! Check your .env file.")
-        try:
-            client = pymongo.MongoClient(connection_string)
-            db = client["pets"]
-            return db
-        except Exception as e:
-            logger.error(f"Cannot connect to local MongoDB either: {str(e)}")
-            return None
-    
+        logger.error("MongoDB connection string is missing! Check your .env file. Falling back to local MongoDB.")
+        return None
     logger.info(f"Connecting to MongoDB with connection string: {connection_string[:10]}...")
+    return connection_string
+
+
+def _async_client_class():
+    try:
+        from pymongo import AsyncMongoClient
+        return AsyncMongoClient
+    except ImportError:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient
+
+
+def init_client():
+    """
+    Create the process-wide MongoClient. Called from the app lifespan, and lazily
+    by get_db() for scripts that run outside the app.
+    """
+    global _client
+    if _client is None:
+        _client = pymongo.MongoClient(_connection_string(), **_client_options())
+    return _client
+
+
+def init_async_client():
+    global _async_client
+    if _async_client is None:
+        _async_client = _async_client_class()(_connection_string(), **_client_options())
+    return _async_client
+
+
+async def close_clients():
+    global _client, _async_client
+    if _client is not None:
+        _client.close()
+        _client = None
+    if _async_client is not None:
+        closed = _async_client.close()
+        if inspect.isawaitable(closed):
+            await closed
+        _async_client = None
+
+
+def get_db():
     try:
-        client = pymongo.MongoClient(connection_string)
-        db = client["pets"]
-        return db
+        return init_client()[DATABASE_NAME]
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {str(e)}")
         return None
 
 
+def get_async_db():
+    try:
+        return init_async_client()[DATABASE_NAME]
+    except Exception as e:
+        logger.error(f"Failed to create async MongoDB client: {str(e)}")
+        return None
 
-def insert_pet_cards(pet_cards_list, overwrite):
+
+def get_known_listings():
+    """
+    Map every stored listing link to its saved ETag/Last-Modified validators.
+    """
     db = get_db()
-        
+
     collection = db["animalutul"]
-    logger.info(f"Clearing existing pet cards and inserting {len(pet_cards_list)} new cards")
-    if overwrite:
-        collection.delete_many({})
-    result = collection.insert_many(pet_cards_list)
-    return result.inserted_ids
+    known = {}
+    for doc in collection.find({"link": {"$ne": None}}, {"link": 1, "http_validators": 1, "_id": 0}):
+        known[doc["link"]] = doc.get("http_validators")
+    logger.info(f"Loaded {len(known)} known listing links")
+    return known
 
 
-def get_all_pet_cards(filter_query={}):
+def get_promoted_links(run_id):
+    """
+    Links of the promoted listings already written by run_id, so a resumed crawl
+    keeps skipping the promoted cards repeated on every page.
+    """
+    db = get_db()
+    return set(db["animalutul"].distinct("link", {"last_seen_run": run_id, "promoted": True}))
+
+
+_dataset_version = {"value": None, "checked_at": 0.0}
+# Called as listener(inserted, updated) with the documents of every batch any writer flushes;
+# updated only holds the listings whose content changed
+_flush_listeners = []
+# Refreshed on every write, so they do not make a listing count as changed
+_BOOKKEEPING_FIELDS = ("source_url", "last_seen", "last_seen_run", "http_validators")
+
+
+def add_flush_listener(listener):
+    if listener not in _flush_listeners:
+        _flush_listeners.append(listener)
+
+
+def bump_dataset_version():
+    """
+    Record that the listings changed. Read endpoints key their ETags and response
+    cache on this counter, shared by every process through Mongo.
+    """
+    doc = get_db()["dataset_meta"].find_one_and_update(
+        {"_id": "animalutul"},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.datetime.now(datetime.timezone.utc)}},
+        upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    _dataset_version.update(value=doc["version"], checked_at=time.monotonic())
+    return doc["version"]
+
+
+def get_dataset_version():
+    """
+    Current dataset version read straight from Mongo, recorded by the facets and the
+    catalog snapshot built from the data it describes.
+    """
+    doc = get_db()["dataset_meta"].find_one({"_id": "animalutul"})
+    _dataset_version.update(value=doc["version"] if doc else 0, checked_at=time.monotonic())
+    return _dataset_version["value"]
+
+
+async def get_dataset_version_async():
+    if _dataset_version["value"] is not None and time.monotonic() - _dataset_version["checked_at"] < DATASET_VERSION_TTL:
+        return _dataset_version["value"]
+    doc = await get_async_db()["dataset_meta"].find_one({"_id": "animalutul"})
+    _dataset_version.update(value=doc["version"] if doc else 0, checked_at=time.monotonic())
+    return _dataset_version["value"]
+
+
+def _changed(stored, doc):
+    return any(stored.get(field) != value for field, value in doc.items() if field not in _BOOKKEEPING_FIELDS)
+
+
+class PetCardWriter:
+    """
+    Buffers scraped pet cards and flushes them as unordered bulk upserts keyed by link.
+    overwrite removes every listing not written by this run; incremental marks
+    listings of source_url that disappeared as stale. Neither empties the
+    collection while the write is in progress. A run_id from a checkpoint lets a
+    resumed crawl count the cards flushed before the interruption as seen.
+    on_flush, when given, is called with the documents of every written batch,
+    on_remove with the links finish() deleted or marked stale.
+    """
+
+    def __init__(self, overwrite=False, source_url=None, incremental=False, batch_size=500, run_id=None,
+                 on_flush=None, on_remove=None):
+        self.collection = get_db()["animalutul"]
+        self.overwrite = overwrite
+        self.source_url = source_url
+        self.incremental = incremental
+        self.batch_size = batch_size
+        self.run_id = run_id or uuid.uuid4().hex
+        self.on_flush = on_flush
+        self.on_remove = on_remove
+        self.inserted_ids = []
+        self.updated = 0
+        self.written = 0
+        self._by_link = {}
+        self._unlinked = []
+
+    def add(self, card):
+        """
+        Buffer one card, returns True when the buffer was flushed.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        doc = dict(card)
+        doc.update({"source_url": self.source_url, "last_seen": now, "last_seen_run": self.run_id, "stale": False})
+        if doc.get("link"):
+            self._by_link[doc["link"]] = doc
+        else:
+            doc["first_seen"] = now
+            self._unlinked.append(doc)
+
+        if len(self._by_link) + len(self._unlinked) >= self.batch_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        operations = [
+            UpdateOne({"link": link}, {"$set": doc, "$setOnInsert": {"first_seen": doc["last_seen"]}}, upsert=True)
+            for link, doc in self._by_link.items()
+        ]
+        operations.extend(InsertOne(doc) for doc in self._unlinked)
+        if not operations:
+            return
+
+        # every upsert refreshes last_seen, so modified_count cannot tell a changed listing
+        # from an unchanged one; compare against the stored documents instead
+        stored = {}
+        if self._by_link:
+            stored = {doc["link"]: doc for doc in self.collection.find({"link": {"$in": list(self._by_link)}})}
+
+        result = self.collection.bulk_write(operations, ordered=False)
+        self.inserted_ids.extend(result.upserted_ids.values())
+        self.inserted_ids.extend(doc["_id"] for doc in self._unlinked)
+        self.written += len(operations)
+        bump_dataset_version()
+        logger.info(f"Flushed {len(operations)} pet cards ({self.written} written this run)")
+
+        linked = list(self._by_link.values())
+        for index, _id in result.upserted_ids.items():
+            linked[index]["_id"] = _id
+        inserted = [doc for doc in linked if "_id" in doc] + self._unlinked
+        updated = [{**stored[doc["link"]], **doc} for doc in linked
+                   if "_id" not in doc and doc["link"] in stored and _changed(stored[doc["link"]], doc)]
+        self.updated += len(updated)
+
+        hooks = [lambda: self.on_flush(linked + self._unlinked)] if self.on_flush else []
+        hooks.extend(lambda listener=listener: listener(inserted, updated) for listener in _flush_listeners)
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                logger.error(f"Error in flush hook: {str(e)}")
+
+        self._by_link = {}
+        self._unlinked = []
+
+    def finish(self):
+        self.flush()
+
+        removed = 0
+        stale = 0
+        gone = None
+        if self.overwrite:
+            gone = {"last_seen_run": {"$ne": self.run_id}}
+        elif self.incremental and self.source_url:
+            gone = {"source_url": self.source_url, "last_seen_run": {"$ne": self.run_id}, "stale": {"$ne": True}}
+        gone_links = self.collection.distinct("link", gone) if gone and self.on_remove else []
+
+        if self.overwrite:
+            removed = self.collection.delete_many(gone).deleted_count
+        elif gone:
+            stale = self.collection.update_many(gone, {"$set": {"stale": True}}).modified_count
+
+        if gone_links:
+            try:
+                self.on_remove(gone_links)
+            except Exception as e:
+                logger.error(f"Error in remove hook: {str(e)}")
+
+        if removed or stale:
+            bump_dataset_version()
+
+        logger.info(f"Inserted {len(self.inserted_ids)}, updated {self.updated}, "
+                    f"removed {removed}, marked {stale} stale")
+        return {
+            "inserted_ids": self.inserted_ids,
+            "updated": self.updated,
+            "removed": removed,
+            "stale": stale,
+        }
+
+
+def insert_pet_cards(pet_cards_list, overwrite, source_url=None, incremental=False):
+    writer = PetCardWriter(
+        overwrite=overwrite, source_url=source_url, incremental=incremental,
+        batch_size=max(1, len(pet_cards_list))
+    )
+    for card in pet_cards_list:
+        writer.add(card)
+    return writer.finish()
+
+
+def get_checkpoint(source_url):
+    db = get_db()
+    return db["scrape_checkpoints"].find_one({"source_url": source_url})
+
+
+def save_checkpoint(source_url, run_id, page, link):
+    db = get_db()
+    db["scrape_checkpoints"].update_one(
+        {"source_url": source_url},
+        {"$set": {"run_id": run_id, "page": page, "link": link, "updated_at": datetime.datetime.now(datetime.timezone.utc)}},
+        upsert=True
+    )
+
+
+def clear_checkpoint(source_url):
+    db = get_db()
+    db["scrape_checkpoints"].delete_one({"source_url": source_url})
+
+
+def _prepare_filter(filter_query, include_stale):
+    if not include_stale and "stale" not in filter_query:
+        filter_query = {**filter_query, "stale": {"$ne": True}}
+
+    if '_id' in filter_query and isinstance(filter_query['_id'], str):
+        filter_query = {**filter_query, "_id": ObjectId(filter_query['_id'])}
+    record_query_shape(filter_query)
+    return filter_query
+
+
+def _report_cost(filter_query, started, returned, max_results):
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms >= SLOW_QUERY_MS:
+        report_query("slow", shape=query_shape(filter_query), duration_ms=round(duration_ms, 1), returned=returned)
+    if max_results and returned >= max_results:
+        report_query("truncated", shape=query_shape(filter_query), returned=returned)
+
+
+def _report_timeout(filter_query):
+    report_query("timeout", shape=query_shape(filter_query), max_time_ms=QUERY_MAX_TIME_MS)
+
+
+def _serialize_ids(pet_cards):
+    for pet in pet_cards:
+        if '_id' in pet:
+            pet['_id'] = str(pet['_id'])
+    return pet_cards
+
+
+def _limited_find(collection, filter_query, max_results, max_time_ms):
+    find = collection.find(filter_query)
+    if max_results:
+        find = find.limit(max_results)
+    if max_time_ms:
+        find = find.max_time_ms(max_time_ms)
+    return find
+
+
+def get_all_pet_cards(filter_query={}, include_stale=False, max_results=QUERY_MAX_RESULTS,
+                      max_time_ms=QUERY_MAX_TIME_MS):
+    """
+    Matching pet cards, at most max_results of them. Raises ExecutionTimeout when
+    Mongo gives up after max_time_ms; background full scans pass None for both.
+    """
     db = get_db()
         
     collection = db["animalutul"]
-    logger.info(f"Querying pets with filter: {filter_query}")
+    logger.debug("Querying pets with filter: %s", filter_query)
     
+    started = time.perf_counter()
     try:
-        if '_id' in filter_query and isinstance(filter_query['_id'], str):
-            from bson.objectid import ObjectId
-            filter_query['_id'] = ObjectId(filter_query['_id'])
-        
-        pet_cards = list(collection.find(filter_query))
+        find = _limited_find(collection, _prepare_filter(filter_query, include_stale), max_results, max_time_ms)
+        pet_cards = _serialize_ids(list(find))
+        logger.debug("Found %d pets matching the filter", len(pet_cards))
+        _report_cost(filter_query, started, len(pet_cards), max_results)
+        return pet_cards
+    except ExecutionTimeout:
+        _report_timeout(filter_query)
+        raise
+    except Exception as e:
+        logger.error(f"Error querying database: {str(e)}")
+        return []
+
+
+async def get_all_pet_cards_async(filter_query={}, include_stale=False, max_results=QUERY_MAX_RESULTS,
+                                  max_time_ms=QUERY_MAX_TIME_MS):
+    """
+    Same as get_all_pet_cards, on the async client so handlers do not hold a threadpool worker.
+    """
+    db = get_async_db()
 
-        for pet in pet_cards:
-            if '_id' in pet:
-                pet['_id'] = str(pet['_id'])
-                
-        logger.info(f"Found {len(pet_cards)} pets matching the filter")
+    collection = db["animalutul"]
+    logger.debug("Querying pets with filter: %s", filter_query)
+
+    started = time.perf_counter()
+    try:
+        cursor = _limited_find(collection, _prepare_filter(filter_query, include_stale), max_results, max_time_ms)
+        pet_cards = _serialize_ids(await cursor.to_list(length=None))
+        logger.debug("Found %d pets matching the filter", len(pet_cards))
+        _report_cost(filter_query, started, len(pet_cards), max_results)
         return pet_cards
+    except ExecutionTimeout:
+        _report_timeout(filter_query)
+        raise
     except Exception as e:
         logger.error(f"Error querying database: {str(e)}")
-        return []
\ No newline at end of file
+        return []
+
+
+def aggregate_pet_cards(pipeline):
+    db = get_db()
+    return list(db["animalutul"].aggregate(pipeline))
+
+
+async def aggregate_pet_cards_async(pipeline):
+    db = get_async_db()
+    cursor = db["animalutul"].aggregate(pipeline)
+    # PyMongo's async collection returns a coroutine here, motor returns the cursor directly
+    if inspect.isawaitable(cursor):
+        cursor = await cursor
+    return await cursor.to_list(length=None)
+
+
+def _paged_find(collection, filter_query, include_stale, sort, cursor, projection):
+    if projection:
+        projection = {**projection, **{field: 1 for field, _ in SORTS[sort]}}
+    query = paged_filter(_prepare_filter(filter_query, include_stale), sort, cursor)
+    return collection.find(query, projection).sort(SORTS[sort]).max_time_ms(QUERY_MAX_TIME_MS)
+
+
+async def find_pet_cards_page_async(filter_query={}, sort="default", limit=None, cursor=None,
+                                    projection=None, include_stale=False):
+    """
+    One keyset page: (pet_cards, next_cursor), next_cursor is None on the last page.
+    Raises ValueError for a cursor that does not match the sort order, and
+    ExecutionTimeout past QUERY_MAX_TIME_MS. Without a limit the page stops at
+    QUERY_MAX_RESULTS cards, with a next_cursor when more matched.
+    """
+    db = get_async_db()
+
+    collection = db["animalutul"]
+    logger.debug(f"Querying pets page with filter: {filter_query}, sort={sort}, limit={limit}")
+
+    page_size = limit or QUERY_MAX_RESULTS
+    find = _paged_find(collection, filter_query, include_stale, sort, cursor, projection)
+    find = find.limit(page_size + 1)
+    started = time.perf_counter()
+    try:
+        pet_cards = await find.to_list(length=None)
+    except ExecutionTimeout:
+        _report_timeout(filter_query)
+        raise
+    _report_cost(filter_query, started, len(pet_cards), None if limit else QUERY_MAX_RESULTS + 1)
+
+    next_cursor = None
+    if len(pet_cards) > page_size:
+        pet_cards = pet_cards[:page_size]
+        next_cursor = encode_cursor(sort, pet_cards[-1])
+    return _serialize_ids(pet_cards), next_cursor
+
+
+async def stream_pet_cards_async(filter_query={}, sort="default", limit=None, cursor=None,
+                                 projection=None, include_stale=False, batch_size=100):
+    """
+    Yield matching pet cards as the driver receives them, in small batches so the
+    first results are sent before the whole match set is read. Ends with
+    {"next_cursor": ...} if more results exist than limit, or QUERY_MAX_RESULTS
+    without one.
+    """
+    db = get_async_db()
+
+    collection = db["animalutul"]
+    page_size = limit or QUERY_MAX_RESULTS
+    find = _paged_find(collection, filter_query, include_stale, sort, cursor, projection).batch_size(batch_size)
+    find = find.limit(page_size + 1)
+
+    count = 0
+    last = None
+    try:
+        async for pet in find:
+            count += 1
+            if count > page_size:
+                yield {"next_cursor": encode_cursor(sort, last)}
+                break
+            last = dict(pet)
+            yield _serialize_ids([pet])[0]
+    except ExecutionTimeout:
+        _report_timeout(filter_query)
+        raise
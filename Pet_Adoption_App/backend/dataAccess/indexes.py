@@ -0,0 +1,113 @@
+import logging
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Compound indexes follow the equality-then-range rule: the filters from /pets and
+# the Gemini endpoints compare county/city/category/breed for equality and price as a range.
+PET_INDEXES = [
+    IndexModel([("county", ASCENDING), ("city", ASCENDING), ("price", ASCENDING)], name="county_city_price"),
+    IndexModel([("county", ASCENDING), ("category", ASCENDING), ("price", ASCENDING)], name="county_category_price"),
+    IndexModel([("category", ASCENDING), ("breed", ASCENDING), ("price", ASCENDING)], name="category_breed_price"),
+    IndexModel([("breed", ASCENDING), ("price", ASCENDING)], name="breed_price"),
+    # multikey over the enrichment tags (species:, size:, color:, age:, listing:, breed:)
+    IndexModel([("tags", ASCENDING), ("price", ASCENDING)], name="tags_price"),
+    IndexModel([("price", ASCENDING)], name="price"),
+    IndexModel([("source_url", ASCENDING), ("last_seen_run", ASCENDING)], name="source_run"),
+    IndexModel([("first_seen", DESCENDING)], name="first_seen"),
+    # Text index version 3 folds diacritics (ă, â, î, ș, ț) and the romanian
+    # stemmer reduces common inflections, so "pisică" also matches "pisica".
+    IndexModel(
+        [("title", TEXT), ("description", TEXT)],
+        name="title_description_text",
+        default_language="romanian",
+        language_override="text_language",
+        weights={"title": 3, "description": 1},
+        textIndexVersion=3,
+    ),
+]
+
+UNIQUE_LINK_INDEX = IndexModel(
+    [("link", ASCENDING)], name="link_unique", unique=True,
+    partialFilterExpression={"link": {"$type": "string"}},
+)
+LINK_INDEX = IndexModel([("link", ASCENDING)], name="link")
+
+# Typical filters built by /pets and the Gemini endpoints, always explained in the report
+SAMPLE_FILTERS = [
+    {"county": "Cluj"},
+    {"county": "Cluj", "city": "Cluj-Napoca"},
+    {"county": "Cluj", "category": "Caini", "price": {"$lte": 1000}},
+    {"category": "Pisici", "breed": "british shorthair", "price": {"$gte": 200, "$lte": 1500}},
+    {"breed": "beagle"},
+    {"price": {"$lte": 1200}},
+    {"$text": {"$search": "mic mica"}},
+    {"tags": {"$all": ["species:dog", "size:mic"]}},
+    {"tags": {"$all": ["species:cat"], "$in": ["color:alb", "color:negru"]}, "price": {"$lte": 500}},
+    {"description": {"$regex": "mic", "$options": "i"}},
+]
+
+
+def ensure_indexes(db):
+    """
+    Create the declared indexes on the animalutul collection. Existing indexes
+    with the same definition are left alone by the server.
+    """
+    collection = db["animalutul"]
+    created = collection.create_indexes(PET_INDEXES)
+
+    try:
+        created += collection.create_indexes([UNIQUE_LINK_INDEX])
+    except OperationFailure as e:
+        # older data inserted before the upsert-by-link writer may hold duplicate links
+        logger.warning(f"Cannot create unique link index, falling back to a plain one: {e}")
+        created += collection.create_indexes([LINK_INDEX])
+
+    db["scrape_checkpoints"].create_index([("source_url", ASCENDING)], unique=True)
+    logger.info(f"Ensured indexes on animalutul: {created}")
+    return created
+
+
+def _walk_plan(plan):
+    yield plan
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _walk_plan(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _walk_plan(child)
+
+
+def explain_query(db, filter_query):
+    """
+    Summarize the winning plan of one find: stages, index used and documents examined.
+    """
+    explain = db["animalutul"].find(filter_query).explain()
+    winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+    nodes = list(_walk_plan(winning))
+    stages = [node["stage"] for node in nodes if node.get("stage")]
+    stats = explain.get("executionStats", {})
+    return {
+        "filter": filter_query,
+        "stages": stages,
+        "collection_scan": "COLLSCAN" in stages,
+        "indexes": sorted({node["indexName"] for node in nodes if node.get("indexName")}),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+    }
+
+
+def explain_report(db, filters):
+    """
+    Explain every filter and list the ones that still fall back to a collection scan first.
+    """
+    report = []
+    for filter_query in filters:
+        try:
+            report.append(explain_query(db, filter_query))
+        except OperationFailure as e:
+            report.append({"filter": filter_query, "error": str(e)})
+    report.sort(key=lambda entry: not entry.get("collection_scan", False))
+    return report
@@ -0,0 +1,99 @@
+import os
+import json
+import base64
+import datetime
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+# Every sort ends on _id so the order is total and a cursor points at exactly one document.
+SORTS = {
+    "default": [("_id", ASCENDING)],
+    "price_asc": [("price", ASCENDING), ("_id", ASCENDING)],
+    "price_desc": [("price", DESCENDING), ("_id", DESCENDING)],
+    "recent": [("first_seen", DESCENDING), ("_id", DESCENDING)],
+    "promoted": [("promoted", DESCENDING), ("first_seen", DESCENDING), ("_id", DESCENDING)],
+}
+
+MAX_PAGE_SIZE = int(os.getenv("PETS_MAX_PAGE_SIZE", "500"))
+
+LIST_FIELDS = ("title", "link", "image_url", "price", "county", "city", "category", "breed", "species", "promoted")
+
+
+def projection_for(fields):
+    """
+    None keeps full documents, "list" selects the card fields shown in the grid,
+    anything else is a comma separated list of field names.
+    """
+    if not fields:
+        return None
+    names = LIST_FIELDS if fields == "list" else [name.strip() for name in fields.split(",") if name.strip()]
+    return {name: 1 for name in names}
+
+
+def _encode_value(value):
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, datetime.datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "$oid" in value:
+        return ObjectId(value["$oid"])
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.datetime.fromisoformat(value["$date"])
+    return value
+
+
+def encode_cursor(sort, document):
+    values = [_encode_value(document.get(field)) for field, _ in SORTS[sort]]
+    raw = json.dumps({"sort": sort, "values": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(sort, cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise ValueError("Malformed cursor")
+    if data.get("sort") != sort or len(data.get("values", [])) != len(SORTS[sort]):
+        raise ValueError("Cursor does not belong to this sort order")
+    return [_decode_value(value) for value in data["values"]]
+
+
+def _after(field, direction, value):
+    """
+    Condition for "strictly after value" on one sort key. Mongo sorts null/missing
+    lowest and never matches them with $gt/$lt, so they are handled explicitly.
+    """
+    if direction == ASCENDING:
+        return {field: {"$ne": None}} if value is None else {field: {"$gt": value}}
+    if value is None:
+        return None
+    return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+
+def keyset_filter(sort, values):
+    """
+    (k1 after v1) or (k1 == v1 and k2 after v2) or ... for the sort keys of a cursor.
+    """
+    clauses = []
+    equal = {}
+    for (field, direction), value in zip(SORTS[sort], values):
+        after = _after(field, direction, value)
+        if after is not None:
+            clauses.append({**equal, **after})
+        equal = {**equal, field: value}
+    return {"$or": clauses} if clauses else {"_id": {"$exists": False}}
+
+
+def paged_filter(filter_query, sort, cursor):
+    if not cursor:
+        return filter_query
+    keyset = keyset_filter(sort, decode_cursor(sort, cursor))
+    if set(keyset) & set(filter_query):
+        return {"$and": [filter_query, keyset]}
+    # kept at top level when possible so a $text clause in filter_query stays top level
+    return {**filter_query, **keyset}
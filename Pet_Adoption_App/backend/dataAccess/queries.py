@@ -0,0 +1,222 @@
+import os
+import re
+import time
+import logging
+from collections import OrderedDict, deque
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+USE_TEXT_SEARCH = os.getenv("MONGODB_TEXT_SEARCH", "1") == "1"
+
+# Limits on the user and Gemini supplied patterns that reach Mongo $regex
+MAX_PATTERN_LENGTH = int(os.getenv("REGEX_MAX_LENGTH", "200"))
+MAX_ALTERNATIVES = int(os.getenv("REGEX_MAX_ALTERNATIVES", "30"))
+MAX_REPEAT_BOUND = 100
+
+_REPEATS = ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+_UNSUPPORTED = {
+    "GROUPREF": "backreferences",
+    "GROUPREF_EXISTS": "conditional groups",
+    "ASSERT": "lookarounds",
+    "ASSERT_NOT": "lookarounds",
+}
+
+# A plain word: letters (diacritics included) and digits. Anything else in a
+# description pattern, hyphens included since $text reads "-word" as negation,
+# is treated as a real regex and kept as $regex.
+_PLAIN_WORD = re.compile(r"^[^\W_]+$")
+
+_MAX_RECORDED_SHAPES = 100
+_recorded_shapes = OrderedDict()
+_query_reports = deque(maxlen=200)
+_report_counts = {}
+
+
+class RejectedPattern(ValueError):
+    pass
+
+
+def plain_alternatives(pattern):
+    """
+    Split "(mic|mica|jucaus)" / "alb|negru" into its words, or None when the
+    pattern uses anything beyond a flat alternation of plain words.
+    """
+    stripped = pattern.strip()
+    while stripped.startswith("(") and stripped.endswith(")"):
+        stripped = stripped[1:-1].strip()
+    words = [word.strip() for word in stripped.split("|")]
+    if not words or not all(_PLAIN_WORD.match(word) for word in words):
+        return None
+    return words
+
+
+def _check_pattern(subpattern, repeated=False):
+    """
+    Number of alternatives in a parsed pattern. Raises RejectedPattern for the
+    constructs that make the regex engine backtrack badly: backreferences,
+    lookarounds, huge counted repeats, and a quantifier or alternation inside
+    an unbounded repeat, e.g. (a+)+ or (mic|mica)*.
+    """
+    alternatives = 0
+    for op, av in subpattern:
+        name = str(op)
+        if name in _UNSUPPORTED:
+            raise RejectedPattern(f"Pattern uses {_UNSUPPORTED[name]}")
+        if name in _REPEATS:
+            low, high, item = av
+            unbounded = high == sre_parse.MAXREPEAT
+            if not unbounded and high > MAX_REPEAT_BOUND:
+                raise RejectedPattern(f"Repeat count above {MAX_REPEAT_BOUND}")
+            if repeated and (unbounded or high > 1):
+                raise RejectedPattern("Nested quantifiers")
+            alternatives += _check_pattern(item, repeated or unbounded)
+        elif name == "BRANCH":
+            if repeated:
+                raise RejectedPattern("Alternation inside a repeat")
+            alternatives += len(av[1]) + sum(_check_pattern(branch, repeated) for branch in av[1])
+        elif name == "SUBPATTERN":
+            alternatives += _check_pattern(av[-1], repeated)
+        elif name == "ATOMIC_GROUP":
+            alternatives += _check_pattern(av, repeated)
+    return alternatives
+
+
+def _strip_wildcards(pattern):
+    """
+    Drop leading and trailing .* which match nothing extra in an unanchored search
+    but make every attempt scan to the end of the description.
+    """
+    while pattern.startswith(".*"):
+        pattern = pattern[2:]
+    while pattern.endswith(".*") and not pattern.endswith("\\.*"):
+        pattern = pattern[:-2]
+    return pattern
+
+
+def safe_regex(pattern, field="description"):
+    """
+    pattern rewritten for a Mongo $regex: trimmed, leading/trailing .* dropped, and
+    escaped into a literal when it is not a valid regex (e.g. "(caine"). Raises
+    RejectedPattern, after reporting it, when it is too long or too complex.
+    """
+    rewritten = _strip_wildcards(pattern.strip())
+    try:
+        if len(rewritten) > MAX_PATTERN_LENGTH:
+            raise RejectedPattern(f"Pattern longer than {MAX_PATTERN_LENGTH} characters")
+        try:
+            parsed = sre_parse.parse(rewritten)
+        except re.error:
+            return re.escape(rewritten)
+        if _check_pattern(parsed) > MAX_ALTERNATIVES:
+            raise RejectedPattern(f"Pattern has more than {MAX_ALTERNATIVES} alternatives")
+    except RejectedPattern as e:
+        report_query("rejected", field=field, pattern=pattern[:MAX_PATTERN_LENGTH], reason=str(e))
+        raise
+    return rewritten
+
+
+def apply_description_filter(mongo_filter, pattern):
+    """
+    Add the description condition for pattern to mongo_filter, using the
+    title/description text index when the pattern is a plain word alternation
+    and a guarded case-insensitive $regex otherwise.
+    """
+    words = plain_alternatives(pattern) if USE_TEXT_SEARCH else None
+    if words and len(words) <= MAX_ALTERNATIVES and len(pattern) <= MAX_PATTERN_LENGTH:
+        mongo_filter["$text"] = {"$search": " ".join(dict.fromkeys(word.lower() for word in words))}
+    else:
+        mongo_filter["description"] = {"$regex": safe_regex(pattern), "$options": "i"}
+    return mongo_filter
+
+
+def build_pet_filter(filters, drop_rejected=False):
+    """
+    Mongo filter for a PetFilter-shaped dict (county, city, category, breed,
+    min_price, max_price, description_regex, plus the enrichment tags a listing
+    must all have and any_tags it needs one of); empty fields are left out.
+    A description_regex the guard rejects raises RejectedPattern, or is left
+    out with drop_rejected, for patterns written by the model rather than the user.
+    """
+    mongo_filter = {}
+
+    for field in ("county", "city", "category", "breed"):
+        if filters.get(field):
+            mongo_filter[field] = filters[field]
+
+    tag_condition = {}
+    if filters.get("tags"):
+        tag_condition["$all"] = list(filters["tags"])
+    if filters.get("any_tags"):
+        tag_condition["$in"] = list(filters["any_tags"])
+    if tag_condition:
+        mongo_filter["tags"] = tag_condition
+
+    if filters.get("description_regex"):
+        try:
+            apply_description_filter(mongo_filter, filters["description_regex"])
+        except RejectedPattern:
+            if not drop_rejected:
+                raise
+
+    min_p = filters.get("min_price")
+    max_p = filters.get("max_price")
+    if min_p is not None or max_p is not None:
+        price_q = {}
+        if min_p is not None:
+            price_q["$gte"] = min_p
+        if max_p is not None:
+            price_q["$lte"] = max_p
+        mongo_filter["price"] = price_q
+
+    return mongo_filter
+
+
+def query_shape(filter_query):
+    """
+    Fields and operators of a filter with the values dropped, e.g. county=eq,price=$gte+$lte.
+    """
+    parts = []
+    for key in sorted(filter_query):
+        value = filter_query[key]
+        if isinstance(value, dict):
+            parts.append(f"{key}={'+'.join(sorted(value))}")
+        else:
+            parts.append(f"{key}=eq")
+    return ",".join(parts)
+
+
+def record_query_shape(filter_query):
+    shape = query_shape(filter_query)
+    _recorded_shapes[shape] = filter_query
+    _recorded_shapes.move_to_end(shape)
+    while len(_recorded_shapes) > _MAX_RECORDED_SHAPES:
+        _recorded_shapes.popitem(last=False)
+
+
+def recorded_filters():
+    """
+    One sample filter per distinct query shape seen since startup.
+    """
+    return list(_recorded_shapes.values())
+
+
+def report_query(kind, **details):
+    """
+    Record a rejected, slow, timed out or truncated query for /admin/query-guard.
+    """
+    _report_counts[kind] = _report_counts.get(kind, 0) + 1
+    _query_reports.append({"kind": kind, "at": time.time(), **details})
+    logger.warning(f"Query {kind}: {details}")
+
+
+def query_reports(limit=50):
+    return {
+        "counts": dict(_report_counts),
+        "recent": list(_query_reports)[-limit:][::-1],
+    }
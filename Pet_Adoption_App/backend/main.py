@@ -1,12 +1,57 @@
+import asyncio
 import uvicorn
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from controllers.PetController import router as data_router
 from controllers.GeminiPets import router as gemini_router
+from controllers.AdminController import router as admin_router
+from dataAccess.db import init_client, init_async_client, close_clients, get_db, add_flush_listener
+from dataAccess.indexes import ensure_indexes
+from services.cache import load_caches, save_caches
+from services.catalog import rebuild_catalog
+from services.enrichment import backfill_enrichment
+from services.similarity import rebuild_similarity_index
+from services.jobs import cancel_all_jobs
+from services.thumbnails import close_thumbnail_client
+from services.live_feed import publish_listings
+from services.metrics import register_mongo_listener, start_trace, detach_trace, finish_trace, server_timing
 
 import logging
 
-app = FastAPI(title="Pet Scraper API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    register_mongo_listener()
+    add_flush_listener(publish_listings)
+    init_client()
+    init_async_client()
+    try:
+        ensure_indexes(get_db())
+    except Exception as e:
+        logger.error(f"Could not ensure MongoDB indexes: {str(e)}")
+    load_caches()
+    try:
+        await asyncio.to_thread(backfill_enrichment)
+    except Exception as e:
+        logger.error(f"Could not enrich stored listings: {str(e)}")
+    try:
+        await asyncio.to_thread(rebuild_catalog)
+    except Exception as e:
+        logger.error(f"Could not build catalog snapshot: {str(e)}")
+    try:
+        await asyncio.to_thread(rebuild_similarity_index)
+    except Exception as e:
+        logger.error(f"Could not build similarity index: {str(e)}")
+    yield
+    cancel_all_jobs()
+    save_caches()
+    await close_thumbnail_client()
+    await close_clients()
+
+
+app = FastAPI(title="Pet Scraper API", lifespan=lifespan)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,10 +62,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Truncated", "ETag", "Server-Timing"],
 )
+# Compresses the responses not already encoded by the cached read endpoints, e.g. NDJSON streams
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Per-route latency and status counts, plus a trace of the request whose spans
+    are also returned in the Server-Timing header. The trace ends with the last
+    chunk of the body, so NDJSON and audio streams are timed in full.
+    """
+    trace, token = start_trace(request.method, request.url.path, request.scope)
+    try:
+        response = await call_next(request)
+    except Exception:
+        finish_trace(trace, 500)
+        raise
+    finally:
+        detach_trace(token)
+    response.headers["Server-Timing"] = server_timing(trace)
+    body = response.body_iterator
+
+    async def timed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish_trace(trace, response.status_code)
+
+    response.body_iterator = timed_body()
+    return response
 
 app.include_router(data_router)
 app.include_router(gemini_router)
+app.include_router(admin_router)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
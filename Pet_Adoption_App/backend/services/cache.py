@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Every cache registers itself here so stats and persistence can be handled in one place
+CACHES = {}
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ttl seconds.
+    Values must be JSON serializable when a persistence path is given.
+    """
+
+    def __init__(self, name, max_size=1024, ttl=3600, path=None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        CACHES[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.time() + (ttl or self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def items(self):
+        """
+        Snapshot of the live (key, value) pairs, oldest first. Does not touch recency or stats.
+        """
+        now = time.time()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at >= now]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot load {self.name} cache from {self.path}: {e}")
+            return 0
+
+        now = time.time()
+        with self._lock:
+            for key, expires_at, value in entries:
+                if expires_at >= now:
+                    self._entries[key] = (expires_at, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            loaded = len(self._entries)
+        logger.info(f"Loaded {loaded} {self.name} cache entries from {self.path}")
+        return loaded
+
+    def save(self):
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [[key, expires_at, value] for key, (expires_at, value) in self._entries.items()
+                       if expires_at >= now]
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            logger.info(f"Saved {len(entries)} {self.name} cache entries to {self.path}")
+        except OSError as e:
+            logger.warning(f"Cannot save {self.name} cache to {self.path}: {e}")
+
+
+def load_caches():
+    for cache in CACHES.values():
+        cache.load()
+
+
+def save_caches():
+    for cache in CACHES.values():
+        cache.save()
+
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in CACHES.items()}
@@ -0,0 +1,246 @@
+import os
+import re
+import time
+import logging
+import threading
+
+import numpy as np
+
+from dataAccess.db import get_all_pet_cards, get_dataset_version, QUERY_MAX_RESULTS
+from services.metrics import span
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "0") == "1"
+# A snapshot older than the dataset version a caller read is rebuilt in the background
+# and skipped meanwhile; this only bounds its age on top of that.
+CATALOG_TTL = float(os.getenv("CATALOG_TTL_SECONDS", "3600"))
+
+DICTIONARY_FIELDS = ("county", "city", "category", "breed")
+
+
+class Unsupported(Exception):
+    pass
+
+
+class CatalogSnapshot:
+    """
+    Column-wise copy of the live listings: prices in a float array (NaN where
+    missing), county/city/category/breed dictionary encoded with one packed
+    bitmap per distinct value, one bitmap per enrichment tag, and the documents
+    themselves in _id order. version is the dataset version they were read at.
+    """
+
+    def __init__(self, documents, version=None):
+        self.version = version
+        started = time.perf_counter()
+        self.documents = sorted(documents, key=lambda doc: str(doc.get("_id", "")))
+        self.size = len(self.documents)
+        self.price = np.array([_number(doc.get("price")) for doc in self.documents], dtype=np.float64)
+        self.bitmaps = {}
+        for field in DICTIONARY_FIELDS:
+            codes = {}
+            column = np.fromiter(
+                (codes.setdefault(doc.get(field), len(codes)) for doc in self.documents),
+                dtype=np.int32, count=self.size,
+            )
+            order = np.argsort(column, kind="stable")
+            bounds = np.searchsorted(column[order], np.arange(len(codes) + 1))
+            self.bitmaps[field] = {}
+            for value, code in codes.items():
+                mask = np.zeros(self.size, dtype=bool)
+                mask[order[bounds[code]:bounds[code + 1]]] = True
+                self.bitmaps[field][value] = np.packbits(mask)
+        tag_rows = {}
+        for row, doc in enumerate(self.documents):
+            for tag in doc.get("tags") or []:
+                tag_rows.setdefault(tag, []).append(row)
+        self.tags = {}
+        for tag, rows in tag_rows.items():
+            mask = np.zeros(self.size, dtype=bool)
+            mask[rows] = True
+            self.tags[tag] = np.packbits(mask)
+        self.descriptions = [doc.get("description") for doc in self.documents]
+        self.built_at = time.time()
+        self.build_seconds = time.perf_counter() - started
+
+    def _empty(self):
+        return np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _dictionary(self, field, condition):
+        bitmaps = self.bitmaps[field]
+        if not isinstance(condition, dict):
+            try:
+                return bitmaps.get(condition, self._empty())
+            except TypeError:
+                # a list or other unhashable value, which Mongo matches against arrays
+                raise Unsupported(str(condition))
+        pattern = _regex(condition)
+        result = self._empty()
+        for value, bitmap in bitmaps.items():
+            if isinstance(value, str) and pattern.search(value):
+                result |= bitmap
+        return result
+
+    def _price(self, condition):
+        if not isinstance(condition, dict):
+            return np.packbits(self.price == _number(condition))
+        mask = ~np.isnan(self.price)
+        for operator, bound in condition.items():
+            bound = _number(bound)
+            if operator == "$gte":
+                mask &= self.price >= bound
+            elif operator == "$lte":
+                mask &= self.price <= bound
+            elif operator == "$gt":
+                mask &= self.price > bound
+            elif operator == "$lt":
+                mask &= self.price < bound
+            else:
+                raise Unsupported(operator)
+        return np.packbits(mask)
+
+    def _tags(self, condition):
+        if not isinstance(condition, dict) or set(condition) - {"$all", "$in"}:
+            raise Unsupported(str(condition))
+        result = np.packbits(np.ones(self.size, dtype=bool))
+        for tag in condition.get("$all", []):
+            result &= self.tags.get(tag, self._empty())
+        if "$in" in condition:
+            either = self._empty()
+            for tag in condition["$in"]:
+                either |= self.tags.get(tag, self._empty())
+            result &= either
+        return result
+
+    def _scan(self, rows, condition):
+        """
+        Row-wise check of a description regex, run only on the rows the bitmap
+        conditions left.
+        """
+        pattern = _regex(condition)
+        return [row for row in rows
+                if isinstance(self.descriptions[row], str) and pattern.search(self.descriptions[row])]
+
+    def query(self, filter_query, projection=None):
+        """
+        Documents matching filter_query, or raises Unsupported for a filter this
+        snapshot cannot answer exactly like Mongo would.
+        """
+        bitmap = np.packbits(np.ones(self.size, dtype=bool))
+        scans = []
+        for key, condition in filter_query.items():
+            if key in DICTIONARY_FIELDS:
+                bitmap &= self._dictionary(key, condition)
+            elif key == "price":
+                bitmap &= self._price(condition)
+            elif key == "tags":
+                bitmap &= self._tags(condition)
+            elif key == "stale" and condition == {"$ne": True}:
+                continue
+            elif key == "description" and isinstance(condition, dict):
+                scans.append(condition)
+            else:
+                # $text included: the Romanian stemmer of the text index cannot be reproduced here
+                raise Unsupported(key)
+
+        rows = np.flatnonzero(np.unpackbits(bitmap, count=self.size)).tolist()
+        for condition in scans:
+            rows = self._scan(rows, condition)
+
+        if projection:
+            fields = set(projection) | {"_id"}
+            return [{k: v for k, v in self.documents[row].items() if k in fields} for row in rows]
+        return [dict(self.documents[row]) for row in rows]
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+def _regex(condition):
+    if set(condition) - {"$regex", "$options"} or not isinstance(condition.get("$regex"), str):
+        raise Unsupported(str(condition))
+    if set(condition.get("$options", "")) - {"i"}:
+        raise Unsupported(condition["$options"])
+    try:
+        return re.compile(condition["$regex"], re.IGNORECASE if "i" in condition.get("$options", "") else 0)
+    except re.error:
+        raise Unsupported(condition["$regex"])
+
+
+_state = {"snapshot": None, "queries": 0, "fallbacks": 0}
+_rebuild_lock = threading.Lock()
+# Held by the one background rebuild thread, so concurrent stale reads start a single rebuild
+_background_lock = threading.Lock()
+
+
+def rebuild_catalog():
+    """
+    Build a fresh snapshot from Mongo and swap it in; readers keep using the old
+    one until the swap.
+    """
+    if not CATALOG_SNAPSHOT:
+        return None
+    with _rebuild_lock:
+        version = get_dataset_version()
+        snapshot = CatalogSnapshot(get_all_pet_cards({}, max_results=None, max_time_ms=None), version)
+        _state["snapshot"] = snapshot
+    logger.info(f"Catalog snapshot built: {snapshot.size} listings in {snapshot.build_seconds:.3f}s")
+    return snapshot
+
+
+def _rebuild_in_background():
+    if not _background_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            rebuild_catalog()
+        except Exception as e:
+            logger.error(f"Error rebuilding catalog snapshot: {str(e)}")
+        finally:
+            _background_lock.release()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def query_catalog(filter_query, projection=None, version=None, max_results=QUERY_MAX_RESULTS):
+    """
+    Matching listings from the in-process snapshot, or None when the snapshot is
+    disabled, not built, expired, older than the dataset version the caller read
+    or cannot answer this filter, in which case the caller queries Mongo.
+    """
+    snapshot = _state["snapshot"]
+    if not CATALOG_SNAPSHOT:
+        return None
+    if (snapshot is None or time.time() - snapshot.built_at > CATALOG_TTL
+            or (version is not None and snapshot.version != version)):
+        _rebuild_in_background()
+        return None
+    try:
+        with span("catalog"):
+            pets = snapshot.query(filter_query, projection)
+    except Unsupported as e:
+        _state["fallbacks"] += 1
+        logger.debug(f"Catalog snapshot cannot answer {filter_query}: {e}")
+        return None
+    _state["queries"] += 1
+    # same cap as the Mongo finds, which return the first matches in _id order too
+    return pets[:max_results]
+
+
+def catalog_stats():
+    snapshot = _state["snapshot"]
+    return {
+        "enabled": CATALOG_SNAPSHOT,
+        "listings": snapshot.size if snapshot else None,
+        "built_at": snapshot.built_at if snapshot else None,
+        "version": snapshot.version if snapshot else None,
+        "build_seconds": round(snapshot.build_seconds, 4) if snapshot else None,
+        "queries": _state["queries"],
+        "fallbacks": _state["fallbacks"],
+    }
@@ -0,0 +1,262 @@
+import os
+import random
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+import httpx
+
+from services.parsers import parse_listing_page, parse_detail_fields
+from services.scraper import (
+    HEADERS, PageFetchError, detail_request_headers, mark_unchanged, record_validators, cards_after,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "8"))
+DEFAULT_RATE = float(os.getenv("SCRAPER_RATE", "4"))
+DEFAULT_MAX_RATE = float(os.getenv("SCRAPER_MAX_RATE", "16"))
+DEFAULT_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", "5"))
+DEFAULT_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "30"))
+DEFAULT_PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "0"))
+
+
+class TokenBucket:
+    """
+    Adaptive token bucket: the refill rate is halved on every 429 and
+    grows back additively after successful responses (AIMD).
+    """
+
+    def __init__(self, rate, max_rate=None, min_rate=0.2, burst=None):
+        self.rate = rate
+        self.max_rate = max_rate or rate
+        self.min_rate = min_rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_throttle = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + 0.1)
+
+    def on_throttle(self, retry_after=None):
+        now = time.monotonic()
+        # a burst of 429s from requests that were already in flight counts as one signal
+        if now - self.last_throttle >= 1.0:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.last_throttle = now
+        self.tokens = 0
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class AsyncCrawler:
+    """
+    Fetches listing pages in order and their detail pages concurrently,
+    bounded per host and paced by a shared adaptive token bucket.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                 max_rate=DEFAULT_MAX_RATE, max_retries=DEFAULT_MAX_RETRIES,
+                 timeout=DEFAULT_TIMEOUT, known=None, revalidate=False,
+                 parse_workers=DEFAULT_PARSE_WORKERS):
+        self.parse_workers = parse_workers
+        self._parse_pool = None
+        self.known = known
+        self.revalidate = revalidate
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, max_rate=max(rate, max_rate))
+        self._host_limits = {}
+        self.stats = {"requests": 0, "throttled": 0, "failed": 0, "skipped": 0}
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.concurrency)
+        return self._host_limits[host]
+
+    async def fetch(self, client, url, **kwargs):
+        """
+        GET url with exponential backoff on 429, 5xx and network errors.
+        Returns the last response, or None if every attempt raised.
+        """
+        response = None
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                async with self._host_limit(url):
+                    response = await client.get(url, **kwargs)
+                self.stats["requests"] += 1
+            except httpx.HTTPError as e:
+                logger.warning(f"Request to {url} failed: {e}")
+                response = None
+            else:
+                if response.status_code == 429:
+                    self.stats["throttled"] += 1
+                    self.bucket.on_throttle(_retry_after(response))
+                elif response.status_code < 500:
+                    self.bucket.on_success()
+                    return response
+
+            if attempt == self.max_retries:
+                break
+            delay = min(60, 0.5 * 2 ** attempt) * (0.5 + random.random())
+            logger.info(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+        self.stats["failed"] += 1
+        return response
+
+    async def _parse(self, func, html):
+        """
+        Run a parser inline, or in the worker process pool when parse_workers > 0
+        so the event loop keeps fetching while pages are parsed.
+        """
+        if self._parse_pool is None:
+            return func(html)
+        return await asyncio.get_running_loop().run_in_executor(self._parse_pool, func, html)
+
+    async def _scrape_detail(self, client, pet_data):
+        headers = detail_request_headers(pet_data["link"], self.known, self.revalidate)
+        if headers is None:
+            self.stats["skipped"] += 1
+            return mark_unchanged(pet_data)
+
+        response = await self.fetch(client, pet_data["link"], headers=headers)
+        if response is not None and response.status_code == 200:
+            pet_data.update(await self._parse(parse_detail_fields, response.text))
+            record_validators(pet_data, response.headers)
+            return pet_data
+        if response is not None and response.status_code == 304:
+            self.stats["skipped"] += 1
+        # unchanged, or not fetched: keep the stored detail fields
+        return mark_unchanged(pet_data)
+
+    async def iter_cards(self, base_url, start_page=1, resume_after=None, promoted_links=None):
+        """
+        Async generator of (page_num, pet_data), one listing page at a time.
+        Raises PageFetchError when a listing page fails after every retry.
+        """
+        promoted_links = set(promoted_links or ())
+        if self.parse_workers > 0:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+
+        try:
+            async for item in self._iter_pages(base_url, start_page, resume_after, promoted_links):
+                yield item
+        finally:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown(wait=False, cancel_futures=True)
+                self._parse_pool = None
+
+    async def _iter_pages(self, base_url, start_page, resume_after, promoted_links):
+        async with httpx.AsyncClient(headers=HEADERS, timeout=self.timeout, follow_redirects=True) as client:
+            page_num = start_page
+            while True:
+                url = f"{base_url}?pag={page_num}"
+                response = await self.fetch(client, url)
+
+                if response is None or response.status_code != 200:
+                    status = response.status_code if response is not None else "no response"
+                    raise PageFetchError(f"Failed to retrieve page {page_num}: {status}")
+                if str(response.url).rstrip('/') == base_url.rstrip('/'):
+                    logger.info(f"Reached the last page: {url}")
+                    break
+
+                pet_cards = await self._parse(parse_listing_page, response.text)
+                if not pet_cards:
+                    break
+                if resume_after and page_num == start_page:
+                    pet_cards = cards_after(pet_cards, resume_after)
+
+                page_cards = []
+                for pet_data in pet_cards:
+                    if pet_data["promoted"]:
+                        if pet_data["link"] in promoted_links:
+                            continue
+                        promoted_links.add(pet_data["link"])
+                    page_cards.append(pet_data)
+
+                await asyncio.gather(*(
+                    self._scrape_detail(client, pet_data) for pet_data in page_cards if pet_data["link"]
+                ))
+
+                logger.info(
+                    f"Scraped page {page_num}: {len(page_cards)} cards, "
+                    f"rate={self.bucket.rate:.2f} req/s, stats={self.stats}"
+                )
+                for pet_data in page_cards:
+                    yield page_num, pet_data
+                page_num += 1
+
+    async def crawl(self, base_url):
+        return [pet_data async for _, pet_data in self.iter_cards(base_url)]
+
+
+def iter_pet_cards_async(base_url: str, start_page=1, resume_after=None, stats=None, promoted_links=None,
+                         **crawler_options):
+    """
+    Synchronous generator over AsyncCrawler.iter_cards, so the async crawl can feed
+    the same blocking writer stage as iter_pet_cards. The crawler counters are
+    kept in stats when given.
+    """
+    crawler = AsyncCrawler(**crawler_options)
+    if stats is not None:
+        stats.update(crawler.stats)
+        crawler.stats = stats
+    loop = asyncio.new_event_loop()
+    cards = crawler.iter_cards(base_url, start_page=start_page, resume_after=resume_after,
+                               promoted_links=promoted_links)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(cards.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(cards.aclose())
+        loop.close()
+
+
+def scrape_pet_cards_async(base_url: str, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                           max_rate=DEFAULT_MAX_RATE, max_retries=DEFAULT_MAX_RETRIES,
+                           known=None, revalidate=False, parse_workers=DEFAULT_PARSE_WORKERS):
+    """
+    Blocking entry point for the async crawl, returns the same list as scrape_pet_cards.
+    """
+    crawler = AsyncCrawler(concurrency=concurrency, rate=rate, max_rate=max_rate, max_retries=max_retries,
+                           known=known, revalidate=revalidate, parse_workers=parse_workers)
+    return asyncio.run(crawler.crawl(base_url))
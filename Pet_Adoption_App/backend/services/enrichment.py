@@ -0,0 +1,262 @@
+import re
+import logging
+
+from pymongo import UpdateOne
+
+from dataAccess.db import get_db, bump_dataset_version
+from dataAccess.queries import plain_alternatives
+from services.text import normalize_text
+from services.vocabulary import CAT_BREEDS, DOG_BREEDS
+from services.query_parser import DOG_WORDS, CAT_WORDS, ADOPTION_WORDS, PHRASES, MAX_PHRASE_TOKENS
+from services.normalization import VocabularyIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the rules below change, so the backfill re-tags older listings
+ENRICHMENT_VERSION = 2
+
+SIZE_WORDS = {
+    "mic": {"mic", "mica", "mici", "mititel", "mititica", "pitic", "pitica", "pitici", "mini", "toy"},
+    "mediu": {"mediu", "medie", "medii"},
+    "mare": {"mare", "mari", "urias", "uriasa", "uriasi"},
+}
+# "mare" and "mediu" are only read right after one of these, so "Satu Mare" is not a size
+SIZE_CUES = {"talie", "talia", "marime", "marimea", "format", "rasa", "dimensiune", "dimensiuni"}
+ANY_POSITION_SIZES = {"mic"}
+
+COLOR_WORDS = {
+    "alb": {"alb", "alba", "albi", "albe"},
+    "negru": {"negru", "neagra", "negri", "negre"},
+    "gri": {"gri", "cenusiu", "cenusie"},
+    "maro": {"maro", "ciocolatiu", "ciocolatie"},
+    "bej": {"bej"},
+    "auriu": {"auriu", "aurie", "aurii"},
+    "roscat": {"roscat", "roscata", "roscati", "roscate"},
+    "crem": {"crem"},
+    "argintiu": {"argintiu", "argintie", "argintii"},
+    "portocaliu": {"portocaliu", "portocalie", "portocalii"},
+    "tricolor": {"tricolor", "tricolora", "tricolori"},
+    "pestrit": {"pestrit", "pestrita", "pestriti"},
+    "tabby": {"tabby"},
+    "punctat": {"punctat", "punctata", "punctati"},
+}
+
+AGE_WORDS = {
+    "pui": {"pui", "puiut", "puiuti", "catelus", "catelusi", "catelusa", "pisoi", "pisoias", "pisicuta", "pisicute"},
+    "junior": {"junior", "tanar", "tanara", "tineri"},
+    "adult": {"adult", "adulta", "adulti"},
+    "senior": {"senior", "batran", "batrana", "batrani"},
+}
+_AGE_AMOUNT = re.compile(r"\b(\d{1,2})\s*(saptamani|saptamana|luni|luna|ani|an)\b")
+
+SALE_FREE_WORDS = {"gratuit", "gratis", "donez", "doneaza", "donatie"} | ADOPTION_WORDS
+
+_breeds = VocabularyIndex([(breed, 0) for breed in CAT_BREEDS + DOG_BREEDS])
+_CAT_BREED_SET = set(CAT_BREEDS) - set(DOG_BREEDS)
+_DOG_BREED_SET = set(DOG_BREEDS) - set(CAT_BREEDS)
+
+
+def _index(groups):
+    return {word: tag for tag, words in groups.items() for word in words}
+
+
+_SIZE_INDEX = _index(SIZE_WORDS)
+_COLOR_INDEX = _index(COLOR_WORDS)
+_AGE_INDEX = _index(AGE_WORDS)
+
+# Words a description_regex alternation may be made of to be answered from the tags;
+# a word of several groups stands for the first one, so "catelus" means a dog, not a puppy.
+QUERY_WORDS = {}
+for _word in DOG_WORDS:
+    QUERY_WORDS.setdefault(_word, "species:dog")
+for _word in CAT_WORDS:
+    QUERY_WORDS.setdefault(_word, "species:cat")
+for _prefix, _words in (("size", _SIZE_INDEX), ("color", _COLOR_INDEX), ("age", _AGE_INDEX)):
+    for _word, _tag in _words.items():
+        QUERY_WORDS.setdefault(_word, f"{_prefix}:{_tag}")
+
+
+def _species(card, tokens, breed):
+    category = (card.get("category") or "").lower()
+    if category.startswith("caini"):
+        return "dog"
+    if category.startswith("pisici"):
+        return "cat"
+    if breed in _DOG_BREED_SET:
+        return "dog"
+    if breed in _CAT_BREED_SET:
+        return "cat"
+    dogs = sum(token in DOG_WORDS for token in tokens)
+    cats = sum(token in CAT_WORDS for token in tokens)
+    if dogs != cats:
+        return "dog" if dogs > cats else "cat"
+    return None
+
+
+def _breed(card, title_tokens):
+    if card.get("breed"):
+        breed, _ = _breeds.match(card["breed"])
+        if breed:
+            return breed
+    for i in range(len(title_tokens)):
+        for size in range(min(MAX_PHRASE_TOKENS, len(title_tokens) - i), 0, -1):
+            match = PHRASES.get(tuple(title_tokens[i:i + size]))
+            if match and match[0] == "breed":
+                return match[1]
+    return None
+
+
+def _sizes(tokens):
+    sizes = set()
+    for i, token in enumerate(tokens):
+        size = _SIZE_INDEX.get(token)
+        if size and (size in ANY_POSITION_SIZES or (i and tokens[i - 1] in SIZE_CUES)):
+            sizes.add(size)
+    return sizes
+
+
+def _ages(text, tokens):
+    ages = {_AGE_INDEX[token] for token in tokens if token in _AGE_INDEX}
+    for amount, unit in _AGE_AMOUNT.findall(text):
+        amount = int(amount)
+        if unit.startswith("saptaman") or (unit.startswith("lun") and amount <= 6):
+            ages.add("pui")
+        elif unit.startswith("lun") or amount < 2:
+            ages.add("junior")
+        else:
+            ages.add("adult" if amount < 9 else "senior")
+    return ages
+
+
+def _listing(card, tokens):
+    """
+    The category, then the price, decide; the words of the text only for an
+    unpriced card, since "nu ofer spre adoptie gratuita" in a priced ad is still a sale.
+    """
+    if (card.get("category") or "").lower().startswith("adopt"):
+        return "adoptie"
+    price = card.get("price")
+    if isinstance(price, (int, float)) and not isinstance(price, bool) and price > 0:
+        return "vanzare"
+    if any(token in SALE_FREE_WORDS for token in tokens):
+        return "adoptie"
+    return None
+
+
+def derive_tags(card):
+    """
+    (species, tags) for a listing from its category breadcrumb, breed, title and
+    description: species:/size:/color:/age:/listing:/breed: tags, normalized and
+    without diacritics, e.g. ["species:dog", "size:mic", "color:alb", "listing:vanzare"].
+    """
+    title = normalize_text(card.get("title") or "")
+    text = f"{title} {normalize_text(card.get('description') or '')}"
+    tokens = text.split()
+    breed = _breed(card, title.split())
+    species = _species(card, tokens, breed)
+
+    tags = []
+    if species:
+        tags.append(f"species:{species}")
+    tags.extend(f"size:{size}" for size in sorted(_sizes(tokens)))
+    tags.extend(f"color:{color}" for color in sorted({_COLOR_INDEX[token] for token in tokens if token in _COLOR_INDEX}))
+    tags.extend(f"age:{age}" for age in sorted(_ages(text, tokens)))
+    listing = _listing(card, tokens)
+    if listing:
+        tags.append(f"listing:{listing}")
+    if breed:
+        tags.append(f"breed:{breed}")
+    return species, tags
+
+
+def enrich_card(card):
+    """
+    card with species, tags and enrichment_version set, ready for the writer.
+    """
+    species, tags = derive_tags(card)
+    card["species"] = species
+    card["tags"] = tags
+    card["enrichment_version"] = ENRICHMENT_VERSION
+    return card
+
+
+def tags_for_pattern(pattern):
+    """
+    Tags standing for a description_regex that is a plain alternation of tag words,
+    e.g. "(mic|mica)" -> ["size:mic"], or None when any word is not a tag word.
+    """
+    words = plain_alternatives(pattern)
+    if not words:
+        return None
+    tags = [QUERY_WORDS.get(normalize_text(word)) for word in words]
+    if not all(tags):
+        return None
+    return list(dict.fromkeys(tags))
+
+
+def _values(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [normalize_text(item) for item in value if item and normalize_text(item)]
+
+
+def with_tags(filters):
+    """
+    PetFilter-shaped dict with the tag fields (species, size, colors, age, listing)
+    turned into "tags" for build_pet_filter, and a description_regex made only of
+    tag words turned into "any_tags", so neither scans the description.
+    """
+    filters = dict(filters)
+    tags = []
+    for field, prefix in (("species", "species"), ("size", "size"), ("colors", "color"), ("age", "age"),
+                          ("listing", "listing")):
+        tags.extend(f"{prefix}:{value}" for value in _values(filters.pop(field, None)))
+    if tags:
+        filters["tags"] = list(dict.fromkeys(tags))
+
+    pattern = filters.get("description_regex")
+    any_tags = tags_for_pattern(pattern) if pattern else None
+    if any_tags:
+        filters["any_tags"] = any_tags
+        filters["description_regex"] = None
+    return filters
+
+
+def backfill_enrichment(batch_size=500):
+    """
+    Tag every stored listing enriched by an older version of the rules, or never.
+    Returns the number of listings updated.
+    """
+    collection = get_db()["animalutul"]
+    pending = collection.find(
+        {"enrichment_version": {"$ne": ENRICHMENT_VERSION}},
+        {"title": 1, "description": 1, "category": 1, "breed": 1, "price": 1},
+    )
+    updated = 0
+    operations = []
+    for doc in pending:
+        species, tags = derive_tags(doc)
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"species": species, "tags": tags, "enrichment_version": ENRICHMENT_VERSION}},
+        ))
+        if len(operations) >= batch_size:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+    if updated:
+        bump_dataset_version()
+        logger.info(f"Enriched {updated} listings to version {ENRICHMENT_VERSION}")
+    return updated
+
+
+def enrichment_stats():
+    collection = get_db()["animalutul"]
+    return {
+        "version": ENRICHMENT_VERSION,
+        "pending": collection.count_documents({"enrichment_version": {"$ne": ENRICHMENT_VERSION}}),
+    }
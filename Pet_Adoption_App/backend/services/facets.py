@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import logging
+
+from dataAccess.db import (
+    aggregate_pet_cards, aggregate_pet_cards_async, get_dataset_version, get_dataset_version_async,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The facets are recomputed whenever the dataset version moves past the one they were
+# computed for, which also reaches worker processes that did not run the ingest; this
+# only bounds their age on top of that.
+FACETS_TTL = float(os.getenv("FACETS_TTL_SECONDS", "3600"))
+
+FACETS_PIPELINE = [
+    {"$match": {"stale": {"$ne": True}}},
+    {"$facet": {
+        "county": [
+            {"$match": {"county": {"$nin": [None, ""]}}},
+            {"$group": {"_id": "$county", "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}},
+        ],
+        "category": [
+            {"$match": {"category": {"$nin": [None, ""]}}},
+            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}},
+        ],
+        "breed": [
+            {"$match": {"breed": {"$nin": [None, ""]}}},
+            {"$group": {"_id": "$breed", "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}},
+        ],
+        "city": [
+            {"$match": {"county": {"$nin": [None, ""]}, "city": {"$nin": [None, ""]}}},
+            {"$group": {"_id": {"county": "$county", "city": "$city"}, "count": {"$sum": 1}}},
+            {"$sort": {"_id.county": 1, "_id.city": 1}},
+        ],
+    }},
+]
+
+_cache = {"facets": None, "computed_at": 0.0, "version": None}
+_refresh_lock = asyncio.Lock()
+
+
+def _shape(result):
+    """
+    Turn the $facet output into the /filters payload: the value lists the frontend
+    already reads plus per-value counts and the cities of every county.
+    """
+    def values(bucket):
+        return [{"value": row["_id"], "count": row["count"]} for row in bucket]
+
+    cities_by_county = {}
+    for row in result.get("city", []):
+        cities_by_county.setdefault(row["_id"]["county"], []).append(
+            {"value": row["_id"]["city"], "count": row["count"]}
+        )
+
+    return {
+        "counties": [row["_id"] for row in result.get("county", [])],
+        "categories": [row["_id"] for row in result.get("category", [])],
+        "breeds": [row["_id"] for row in result.get("breed", [])],
+        "counts": {
+            "counties": values(result.get("county", [])),
+            "categories": values(result.get("category", [])),
+            "breeds": values(result.get("breed", [])),
+        },
+        "cities": cities_by_county,
+    }
+
+
+def _store(facets, version):
+    _cache["facets"] = facets
+    _cache["computed_at"] = time.monotonic()
+    _cache["version"] = version
+    logger.info(f"Facets cached: {len(facets['counties'])} counties, {len(facets['categories'])} categories, "
+                f"{len(facets['breeds'])} breeds")
+    return facets
+
+
+def _fresh(version):
+    return (_cache["facets"] is not None and _cache["version"] == version
+            and time.monotonic() - _cache["computed_at"] < FACETS_TTL)
+
+
+def invalidate_facets():
+    _cache["facets"] = None
+
+
+def refresh_facets():
+    """
+    Recompute the facets synchronously, called from the ingest path after writes.
+    """
+    # read before aggregating, so a write landing meanwhile makes them stale rather than mislabelled
+    version = get_dataset_version()
+    result = aggregate_pet_cards(FACETS_PIPELINE)
+    return _store(_shape(result[0] if result else {}), version)
+
+
+async def get_facets(version=None):
+    """
+    Cached facets, computed by a server-side aggregation on a miss or once the
+    dataset version changed. Concurrent misses share one aggregation. Callers that
+    key a response on the version pass the one they read, so the body always
+    matches its key.
+    """
+    if version is None:
+        version = await get_dataset_version_async()
+    if _fresh(version):
+        return _cache["facets"]
+
+    async with _refresh_lock:
+        if _fresh(version):
+            return _cache["facets"]
+        result = await aggregate_pet_cards_async(FACETS_PIPELINE)
+        return _store(_shape(result[0] if result else {}), version)
@@ -0,0 +1,96 @@
+import os
+import time
+import asyncio
+import logging
+from dotenv import load_dotenv
+from google import genai
+from google.genai import types
+
+from services.singleflight import SingleFlight
+from services.metrics import observe, increment, span, current_route
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+# Points the client at another Gemini-compatible endpoint, e.g. the fake server of benchmarks/load_test.py
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+client = genai.Client(
+    api_key=os.getenv("GEMINI_API_KEY"),
+    http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None,
+)
+
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+
+_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+
+class GeminiTimeout(Exception):
+    pass
+
+
+_flights = SingleFlight()
+_calls = {"waiting": 0, "in_flight": 0}
+
+
+async def generate_content(model, contents, config=None, key=None, timeout=GEMINI_TIMEOUT):
+    """
+    Non-blocking generate_content on the async client, bounded by the global
+    concurrency limit and a per-call timeout. The timeout covers the wait for a
+    free slot too. Calls sharing a key while one is in flight reuse its response.
+    """
+    endpoint = current_route()
+
+    async def limited():
+        _calls["waiting"] += 1
+        try:
+            await _semaphore.acquire()
+        finally:
+            _calls["waiting"] -= 1
+        _calls["in_flight"] += 1
+        try:
+            return await client.aio.models.generate_content(model=model, contents=contents, config=config)
+        finally:
+            _calls["in_flight"] -= 1
+            _semaphore.release()
+
+    async def call():
+        started = time.perf_counter()
+        try:
+            with span("gemini"):
+                response = await asyncio.wait_for(limited(), timeout=timeout)
+        except asyncio.TimeoutError:
+            increment("gemini", endpoint, "timeouts")
+            logger.warning(f"Gemini call to {model} timed out after {timeout}s")
+            raise GeminiTimeout(f"Gemini did not answer within {timeout} seconds")
+        except Exception:
+            increment("gemini", endpoint, "errors")
+            raise
+        finally:
+            observe("gemini", endpoint, (time.perf_counter() - started) * 1000)
+        _record_usage(endpoint, response)
+        return response
+
+    if key is None:
+        return await call()
+    return await _flights.do(key, call)
+
+
+def _record_usage(endpoint, response):
+    increment("gemini", endpoint, "calls")
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for field in ("prompt_token_count", "candidates_token_count", "total_token_count"):
+        increment("gemini", endpoint, field, getattr(usage, field, None) or 0)
+
+
+def gemini_stats():
+    return {
+        "max_concurrency": GEMINI_MAX_CONCURRENCY,
+        "in_flight": _calls["in_flight"],
+        "waiting": _calls["waiting"],
+        "coalesced": _flights.coalesced,
+        "timeout_seconds": GEMINI_TIMEOUT,
+    }
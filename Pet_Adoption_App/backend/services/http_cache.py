@@ -0,0 +1,108 @@
+import os
+import gzip
+import json
+import hashlib
+import datetime
+import logging
+
+from fastapi import Request, Response
+
+from services.cache import TTLCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+# Browsers may reuse a response this long, then revalidate with If-None-Match
+RESPONSE_MAX_AGE = int(os.getenv("RESPONSE_MAX_AGE_SECONDS", "30"))
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+# Serialized and compressed bodies per dataset version, path and query
+response_cache = TTLCache(
+    "responses",
+    max_size=int(os.getenv("RESPONSE_CACHE_SIZE", "256")),
+    ttl=RESPONSE_CACHE_TTL,
+)
+
+
+def _default(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(value):
+    """
+    JSON bytes, through orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _normalized_query(request):
+    return "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()) if value != "")
+
+
+def _accepted_encoding(request):
+    accepted = request.headers.get("accept-encoding", "")
+    encodings = {part.split(";")[0].strip() for part in accepted.split(",")}
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+async def cached_json_response(request: Request, version, produce):
+    """
+    JSON response for a read endpoint whose output only changes with the dataset
+    version. The ETag covers version, path and normalized query, so revalidation
+    is answered with 304 without touching the data. Otherwise the body comes from
+    the response cache or from produce(), which returns (payload, extra headers),
+    and is compressed once per encoding.
+    """
+    key = f"{version}:{request.url.path}?{_normalized_query(request)}"
+    etag = f'W/"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={RESPONSE_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag in request.headers.get("if-none-match", ""):
+        entry = response_cache.get(key)
+        return Response(status_code=304, headers={**headers, **(entry["headers"] if entry else {})})
+
+    entry = response_cache.get(key)
+    if entry is None:
+        payload, extra_headers = await produce()
+        entry = {"body": dumps(payload), "headers": extra_headers, "encoded": {}}
+        response_cache.set(key, entry)
+
+    body = entry["body"]
+    encoding = _accepted_encoding(request) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding:
+        if encoding not in entry["encoded"]:
+            entry["encoded"][encoding] = _compress(body, encoding)
+        body = entry["encoded"][encoding]
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers={**headers, **entry["headers"]})
@@ -0,0 +1,103 @@
+import io
+import os
+import hashlib
+import logging
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from services.cache import TTLCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UPLOAD_MAX_SIDE = int(os.getenv("IMAGE_UPLOAD_MAX_SIDE", "768"))
+UPLOAD_JPEG_QUALITY = int(os.getenv("IMAGE_UPLOAD_JPEG_QUALITY", "85"))
+# Hamming distance between 64-bit dHashes still treated as the same photo
+NEAR_DUPLICATE_DISTANCE = int(os.getenv("IMAGE_NEAR_DUPLICATE_DISTANCE", "6"))
+
+trait_cache = TTLCache(
+    "image_traits",
+    max_size=int(os.getenv("IMAGE_TRAIT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("IMAGE_TRAIT_CACHE_TTL_SECONDS", "604800")),
+    path=os.getenv("IMAGE_TRAIT_CACHE_PATH"),
+)
+_near_hits = {"count": 0}
+
+
+def dhash(image, size=8):
+    """
+    64-bit difference hash: survives re-compression, resizing and small colour
+    shifts, so copies of the same photo land within a few bits of each other.
+    """
+    small = image.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def prepare_upload(image_bytes, content_type):
+    """
+    (image_key, upload_bytes, upload_mime). The image is downscaled to
+    UPLOAD_MAX_SIDE and re-encoded as JPEG; images Pillow cannot read are sent
+    as they are and keyed by their SHA-256 instead of a perceptual hash.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning(f"Cannot decode uploaded image, sending it unchanged: {e}")
+        return f"sha256:{hashlib.sha256(image_bytes).hexdigest()}", image_bytes, content_type
+
+    key = f"dhash:{dhash(image):016x}"
+    if max(image.size) > UPLOAD_MAX_SIDE:
+        image.thumbnail((UPLOAD_MAX_SIDE, UPLOAD_MAX_SIDE), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="JPEG", quality=UPLOAD_JPEG_QUALITY, optimize=True)
+    upload = buffer.getvalue()
+    if len(upload) >= len(image_bytes):
+        return key, image_bytes, content_type
+    logger.info(f"Downscaled image upload from {len(image_bytes)} to {len(upload)} bytes")
+    return key, upload, "image/jpeg"
+
+
+def _distance(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def cached_traits(image_key):
+    """
+    Trait string cached for this image or, for perceptual keys, for the closest
+    near-duplicate within NEAR_DUPLICATE_DISTANCE bits.
+    """
+    traits = trait_cache.get(image_key)
+    if traits is not None or not image_key.startswith("dhash:"):
+        return traits
+
+    target = image_key.split(":", 1)[1]
+    best_key, best_distance = None, NEAR_DUPLICATE_DISTANCE + 1
+    for key, _ in trait_cache.items():
+        if key.startswith("dhash:"):
+            distance = _distance(target, key.split(":", 1)[1])
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+
+    if best_key is None:
+        return None
+    traits = trait_cache.get(best_key)
+    if traits is not None:
+        _near_hits["count"] += 1
+    return traits
+
+
+def store_traits(image_key, traits):
+    trait_cache.set(image_key, traits)
+
+
+def image_cache_stats():
+    return {**trait_cache.stats(), "near_duplicate_hits": _near_hits["count"]}
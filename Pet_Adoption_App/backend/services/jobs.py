@@ -0,0 +1,159 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from services.pipeline import run_scrape_pipeline, ScrapeCancelled
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCRAPE_JOB_WORKERS = int(os.getenv("SCRAPE_JOB_WORKERS", "2"))
+# Finished jobs kept for GET /jobs
+MAX_FINISHED_JOBS = int(os.getenv("SCRAPE_JOB_HISTORY", "50"))
+
+ACTIVE_STATUSES = ("queued", "running", "cancelling")
+
+
+class JobConflict(Exception):
+    def __init__(self, job):
+        super().__init__(f"A scrape of {job.url} is already {job.status} as job {job.id}")
+        self.job = job
+
+
+class ScrapeJob:
+    def __init__(self, url, options):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.options = options
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.cancel = threading.Event()
+
+    def to_dict(self):
+        progress = dict(self.progress)
+        if self.started_at:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            progress["elapsed_seconds"] = round(elapsed, 1)
+            if elapsed > 0:
+                progress["requests_per_sec"] = round(progress.get("requests", 0) / elapsed, 2)
+        return {
+            "job_id": self.id,
+            "url": self.url,
+            "status": self.status,
+            "options": self.options,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": progress,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+_jobs = OrderedDict()
+_active_by_url = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=SCRAPE_JOB_WORKERS, thread_name_prefix="scrape-job")
+
+
+def _url_key(url):
+    return url.strip().rstrip("/")
+
+
+def _finish(job, status):
+    with _lock:
+        job.status = status
+        job.finished_at = time.time()
+        if _active_by_url.get(_url_key(job.url)) is job:
+            del _active_by_url[_url_key(job.url)]
+        finished = [j for j in _jobs.values() if j.status not in ACTIVE_STATUSES]
+        for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[old.id]
+
+
+def _run(job, on_success):
+    with _lock:
+        cancelled = job.cancel.is_set()
+        if not cancelled:
+            job.status = "running"
+            job.started_at = time.time()
+    if cancelled:
+        _finish(job, "cancelled")
+        return
+    try:
+        result = run_scrape_pipeline(job.url, cancel=job.cancel, progress=job.progress, **job.options)
+        if result is None:
+            raise RuntimeError("No data scraped")
+        if on_success:
+            on_success()
+        job.result = {
+            "inserted_ids": [str(_id) for _id in result["inserted_ids"]],
+            "updated": result["updated"],
+            "removed": result["removed"],
+            "stale": result["stale"],
+        }
+        _finish(job, "succeeded")
+    except ScrapeCancelled as e:
+        job.error = str(e)
+        _finish(job, "cancelled")
+    except Exception as e:
+        logger.error(f"Scrape job {job.id} for {job.url} failed: {str(e)}")
+        job.error = str(e)
+        _finish(job, "failed")
+
+
+def submit_scrape(url, on_success=None, **options):
+    """
+    Queue a scrape of url and return its job right away. Raises JobConflict
+    while another job for the same URL is queued or running. on_success runs in
+    the job thread after a successful ingest.
+    """
+    with _lock:
+        active = _active_by_url.get(_url_key(url))
+        if active is not None:
+            raise JobConflict(active)
+        job = ScrapeJob(url, options)
+        _jobs[job.id] = job
+        _active_by_url[_url_key(url)] = job
+    _executor.submit(_run, job, on_success)
+    logger.info(f"Queued scrape job {job.id} for {url}")
+    return job
+
+
+def get_job(job_id):
+    return _jobs.get(job_id)
+
+
+def list_jobs():
+    return [job.to_dict() for job in reversed(_jobs.values())]
+
+
+def cancel_job(job_id):
+    """
+    Ask a job to stop; a running crawl stops after its current card. Returns the
+    job, or None if there is no such job.
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        return None
+    with _lock:
+        if job.status in ("queued", "running"):
+            job.cancel.set()
+            job.status = "cancelling"
+    return job
+
+
+def cancel_all_jobs():
+    for job in list(_jobs.values()):
+        if job.status in ACTIVE_STATUSES:
+            cancel_job(job.id)
+    _executor.shutdown(wait=False, cancel_futures=False)
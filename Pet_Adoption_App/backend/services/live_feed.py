@@ -0,0 +1,189 @@
+import os
+import asyncio
+import logging
+import threading
+from collections import deque
+
+from dataAccess.pagination import LIST_FIELDS
+from services.http_cache import dumps
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber; a client that falls this far behind gets a resync event instead
+LIVE_FEED_BUFFER = int(os.getenv("LIVE_FEED_BUFFER", "256"))
+LIVE_FEED_MAX_SUBSCRIBERS = int(os.getenv("LIVE_FEED_MAX_SUBSCRIBERS", "500"))
+# Recent events kept for clients reconnecting with Last-Event-ID
+LIVE_FEED_REPLAY = int(os.getenv("LIVE_FEED_REPLAY", "1000"))
+LIVE_FEED_HEARTBEAT = float(os.getenv("LIVE_FEED_HEARTBEAT_SECONDS", "15"))
+
+EVENT_FIELDS = LIST_FIELDS + ("_id", "first_seen", "last_seen")
+FILTER_FIELDS = ("county", "city", "category", "breed")
+
+RESYNC = "resync"
+
+
+class Subscriber:
+    """
+    One connected client: its filters and a bounded queue owned by the event
+    loop serving it. Writers in other threads hand events over through
+    call_soon_threadsafe and never wait on a slow client.
+    """
+
+    def __init__(self, filters, updates):
+        self.filters = filters
+        self.updates = updates
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=LIVE_FEED_BUFFER)
+        self.lagging = False
+
+    def matches(self, event):
+        listing = event["listing"]
+        if event["type"] == "update" and not self.updates:
+            return False
+        for field in FILTER_FIELDS:
+            if self.filters.get(field) and listing.get(field) != self.filters[field]:
+                return False
+        if self.filters.get("min_price") is not None or self.filters.get("max_price") is not None:
+            price = listing.get("price")
+            if isinstance(price, bool) or not isinstance(price, (int, float)):
+                return False
+            if self.filters.get("min_price") is not None and price < self.filters["min_price"]:
+                return False
+            if self.filters.get("max_price") is not None and price > self.filters["max_price"]:
+                return False
+        return True
+
+    def offer(self, event):
+        """
+        Runs on the subscriber's loop. A full buffer is discarded and replaced by a
+        single resync marker; until the client reads it, newer events are dropped
+        too, since the client refetches /pets on resync anyway.
+        """
+        if self.lagging:
+            _state["dropped"] += 1
+            return
+        if self.queue.full():
+            _state["dropped"] += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.lagging = True
+            return
+        self.queue.put_nowait(event)
+
+
+_lock = threading.Lock()
+_subscribers = set()
+_recent = deque(maxlen=LIVE_FEED_REPLAY)
+_state = {"sequence": 0, "published": 0, "dropped": 0, "resyncs": 0}
+
+
+def subscribe(filters, updates=False):
+    """
+    Register a subscriber on the running loop, or None when the feed is full.
+    """
+    subscriber = Subscriber(filters, updates)
+    with _lock:
+        if len(_subscribers) >= LIVE_FEED_MAX_SUBSCRIBERS:
+            return None
+        _subscribers.add(subscriber)
+    return subscriber
+
+
+def unsubscribe(subscriber):
+    with _lock:
+        _subscribers.discard(subscriber)
+
+
+def _event(kind, doc):
+    _state["sequence"] += 1
+    listing = {field: doc[field] for field in EVENT_FIELDS if field in doc}
+    if "_id" in listing:
+        listing["_id"] = str(listing["_id"])
+    return {"id": _state["sequence"], "type": kind, "listing": listing}
+
+
+def publish_listings(inserted, updated):
+    """
+    Flush listener of PetCardWriter: hand the written listings to every
+    subscriber whose filters match. Called from the writer's thread.
+    """
+    with _lock:
+        events = [_event("listing", doc) for doc in inserted] + [_event("update", doc) for doc in updated]
+        _recent.extend(events)
+        _state["published"] += len(events)
+        subscribers = list(_subscribers)
+
+    for subscriber in subscribers:
+        matching = [event for event in events if subscriber.matches(event)]
+        if not matching:
+            continue
+        try:
+            for event in matching:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+        except RuntimeError:
+            # the subscriber's loop is closed
+            unsubscribe(subscriber)
+
+
+def replay_since(subscriber, last_event_id):
+    """
+    Events after last_event_id still held in the replay buffer, for a reconnecting client.
+    """
+    with _lock:
+        if last_event_id > _state["sequence"]:
+            return []
+        return [event for event in _recent if event["id"] > last_event_id and subscriber.matches(event)]
+
+
+def format_event(event):
+    if event == RESYNC:
+        _state["resyncs"] += 1
+        return b"event: resync\ndata: {}\n\n"
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event["id"], event["type"].encode(), dumps(event["listing"]))
+
+
+async def event_stream(subscriber, request, last_event_id=None):
+    """
+    SSE bytes for one subscriber: replayed events first, then live ones, with a
+    comment line every LIVE_FEED_HEARTBEAT seconds so proxies keep the connection.
+    """
+    sent = last_event_id or 0
+    try:
+        # sent right away so the client sees the stream open before the first listing
+        yield b": connected\n\n"
+        if last_event_id is not None:
+            for event in replay_since(subscriber, last_event_id):
+                sent = event["id"]
+                yield format_event(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=LIVE_FEED_HEARTBEAT)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": keepalive\n\n"
+                continue
+            if event == RESYNC:
+                subscriber.lagging = False
+            elif event["id"] <= sent:
+                # already replayed
+                continue
+            yield format_event(event)
+    finally:
+        unsubscribe(subscriber)
+
+
+def live_feed_stats():
+    with _lock:
+        return {
+            "subscribers": len(_subscribers),
+            "max_subscribers": LIVE_FEED_MAX_SUBSCRIBERS,
+            "buffer": LIVE_FEED_BUFFER,
+            "queued": sum(subscriber.queue.qsize() for subscriber in _subscribers),
+            "dropped": _state["dropped"],
+            "published": _state["published"],
+            "resyncs": _state["resyncs"],
+            "last_event_id": _state["sequence"],
+        }
@@ -0,0 +1,235 @@
+import os
+import time
+import uuid
+import logging
+import threading
+import contextlib
+import contextvars
+from collections import deque
+
+from pymongo import monitoring
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+TRACE_BUFFER = int(os.getenv("METRICS_TRACE_BUFFER", "200"))
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        index = len(BUCKETS_MS)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, fraction):
+        """
+        Upper bound of the bucket holding the given fraction of observations.
+        """
+        target = fraction * self.count
+        seen = 0
+        for i, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target and bucket:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return None
+
+    def snapshot(self):
+        labels = [f"le_{bound}" for bound in BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+
+def observe(group, key, ms):
+    with _lock:
+        histogram = _histograms.setdefault((group, key), Histogram())
+        histogram.observe(ms)
+
+
+def increment(group, key, counter, amount=1):
+    with _lock:
+        counters = _counters.setdefault((group, key), {})
+        counters[counter] = counters.get(counter, 0) + amount
+
+
+def metrics_snapshot():
+    """
+    {group: {key: {"latency": histogram, **counters}}} for everything recorded
+    since startup.
+    """
+    with _lock:
+        keys = set(_histograms) | set(_counters)
+        snapshot = {}
+        for group, key in sorted(keys):
+            entry = dict(_counters.get((group, key), {}))
+            if (group, key) in _histograms:
+                entry["latency"] = _histograms[(group, key)].snapshot()
+            snapshot.setdefault(group, {})[key] = entry
+    return snapshot
+
+
+class Trace:
+    """
+    Timeline of one request: (name, start offset, duration) spans in milliseconds.
+    scope is the ASGI scope of the request, where routing stores the matched route.
+    """
+
+    def __init__(self, method, path, scope=None):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.scope = scope if scope is not None else {}
+        self.route = None
+        self.status = None
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.spans = []
+
+    def add_span(self, name, started, duration):
+        self.spans.append((name, round((started - self.started) * 1000, 3), round(duration * 1000, 3)))
+
+    def to_dict(self):
+        return {
+            "trace_id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "spans": [{"name": name, "start_ms": start, "duration_ms": duration}
+                      for name, start, duration in self.spans],
+        }
+
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_traces = deque(maxlen=TRACE_BUFFER)
+
+
+def route_template(scope):
+    """
+    Path template of the route that matched, e.g. /pets/{pet_id}/similar, so metrics
+    get one series per endpoint rather than one per listing id.
+    """
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+def start_trace(method, path, scope=None):
+    trace = Trace(method, path, scope)
+    return trace, _current_trace.set(trace)
+
+
+def detach_trace(token):
+    _current_trace.reset(token)
+
+
+def finish_trace(trace, status):
+    """
+    Record the latency and status of trace under its route. Called once the
+    response body was sent, so streamed responses are timed to their last chunk.
+    """
+    trace.route = route_template(trace.scope)
+    trace.status = status
+    trace.duration_ms = round((time.perf_counter() - trace.started) * 1000, 3)
+    observe("routes", f"{trace.method} {trace.route}", trace.duration_ms)
+    increment("routes", f"{trace.method} {trace.route}", f"status_{status}")
+    _traces.append(trace)
+    return trace
+
+
+def current_route():
+    """
+    Route template of the request being served, used to label upstream calls by endpoint.
+    """
+    trace = _current_trace.get()
+    return route_template(trace.scope) if trace else "background"
+
+
+@contextlib.contextmanager
+def span(name):
+    trace = _current_trace.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.add_span(name, started, time.perf_counter() - started)
+
+
+def server_timing(trace):
+    """
+    Server-Timing header value, so browser dev tools show the spans of a response.
+    """
+    totals = {}
+    for name, _, duration in trace.spans:
+        totals[name] = totals.get(name, 0) + duration
+    entries = [f"{name.replace(' ', '_')};dur={duration:.1f}" for name, duration in totals.items()]
+    entries.append(f"total;dur={(time.perf_counter() - trace.started) * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def recent_traces(limit=50, min_ms=0):
+    traces = [trace for trace in list(_traces) if (trace.duration_ms or 0) >= min_ms]
+    return [trace.to_dict() for trace in reversed(traces[-limit:])]
+
+
+def _documents_returned(reply):
+    cursor = reply.get("cursor") if isinstance(reply, dict) else None
+    if not cursor:
+        return 0
+    return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Times every command sent by any client, with the documents it returned, and
+    adds it as a span to the trace of the request that issued it.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        duration = event.duration_micros / 1e6
+        observe("mongo", event.command_name, duration * 1000)
+        increment("mongo", event.command_name, "documents_returned", _documents_returned(event.reply))
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(f"mongo.{event.command_name}", time.perf_counter() - duration, duration)
+
+    def failed(self, event):
+        observe("mongo", event.command_name, event.duration_micros / 1000)
+        increment("mongo", event.command_name, "errors")
+
+
+def register_mongo_listener():
+    """
+    Must run before the Mongo clients are created.
+    """
+    monitoring.register(MongoCommandMetrics())
@@ -0,0 +1,260 @@
+import re
+import logging
+import threading
+
+from services.text import normalize_text
+from services.facets import get_facets
+from services.vocabulary import CITIES, COUNTIES, COUNTY_SEATS, CAT_BREEDS, DOG_BREEDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Romanian and English plural/article endings, longest first
+_SUFFIXES = ("urile", "ilor", "uri", "ele", "ies", "ii", "es", "s", "i", "e", "a")
+_MAX_CACHED_MATCHES = 4096
+# Shorter words of a value must match a whole word of a canonical value, longer ones may be a prefix
+_MIN_PREFIX = 3
+
+
+def _stem(token):
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def stem_key(value):
+    """
+    "Ciobănești Germani" -> "ciobanest german": folded, lowercased, every word without its plural ending.
+    """
+    return " ".join(_stem(token) for token in normalize_text(value).split())
+
+
+def _max_distance(key):
+    if len(key) <= 4:
+        return 0
+    return 1 if len(key) <= 8 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Levenshtein distance of a and b, or limit + 1 once it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _word_match(words, candidate_words):
+    """
+    True when every word is a word of the candidate, or the start of one.
+    """
+    return all(
+        any(candidate == word or (len(word) >= _MIN_PREFIX and candidate.startswith(word))
+            for candidate in candidate_words)
+        for word in words
+    )
+
+
+class VocabularyIndex:
+    """
+    Canonical values of one field, found by exact normalized form, then by
+    plural-stripped form, then by the stripped words ("labrador" -> "labrador
+    retriever"), then by edit distance on the stripped form. Among equal matches
+    the value with the most listings wins.
+    """
+
+    def __init__(self, entries):
+        self.normalized = {}
+        self.stemmed = {}
+        for value, count in sorted(entries, key=lambda entry: -entry[1]):
+            if not isinstance(value, str) or not value.strip():
+                continue
+            self.normalized.setdefault(normalize_text(value), value)
+            self.stemmed.setdefault(stem_key(value), (value, count))
+        self.size = len(self.stemmed)
+        self._matches = {}
+
+    def match(self, value):
+        """
+        (canonical value, how it matched) or (None, "unmatched"); of several values
+        matched by their words, the one with the most listings.
+        """
+        matches, how = self.match_all(value)
+        return (matches[0] if matches else None), how
+
+    def match_all(self, value):
+        """
+        ([canonical values], how they matched), most listings first. Only a word
+        match returns more than one value, e.g. "ciobanesc".
+        """
+        if value not in self._matches:
+            if len(self._matches) >= _MAX_CACHED_MATCHES:
+                self._matches.clear()
+            self._matches[value] = self._match(value)
+        return self._matches[value]
+
+    def _match(self, value):
+        normalized = normalize_text(value)
+        if normalized in self.normalized:
+            return [self.normalized[normalized]], "exact"
+        key = stem_key(value)
+        if key in self.stemmed:
+            return [self.stemmed[key][0]], "plural"
+        words = key.split()
+        if words:
+            # self.stemmed keeps the most listed values first
+            matches = [canonical for candidate, (canonical, _) in self.stemmed.items()
+                       if _word_match(words, candidate.split())]
+            if matches:
+                return matches, "words"
+        limit = _max_distance(key)
+        best = None
+        for candidate, (canonical, count) in self.stemmed.items():
+            distance = edit_distance(key, candidate, limit)
+            if distance <= limit and (best is None or (distance, -count) < best[:2]):
+                best = (distance, -count, canonical)
+        if best is not None:
+            return [best[2]], "fuzzy"
+        return [], "unmatched"
+
+
+def _counted(rows):
+    return [(row["value"], row["count"]) for row in rows]
+
+
+def build_indexes(facets):
+    """
+    Indexes over the values present in the collection, or over the static
+    vocabulary while the facets are empty. County seats missing from the facets
+    still resolve to their county.
+    """
+    counts = (facets or {}).get("counts", {})
+    cities = (facets or {}).get("cities", {})
+    counties = _counted(counts.get("counties", [])) or [(county, 0) for county in COUNTIES]
+    breeds = _counted(counts.get("breeds", [])) or [(breed, 0) for breed in CAT_BREEDS + DOG_BREEDS]
+    all_cities = [entry for rows in cities.values() for entry in _counted(rows)] or [(city, 0) for city in CITIES]
+    all_cities += [(city, 0) for city in COUNTY_SEATS]
+    # the county holding the most listings of each city, for a city returned as the county
+    county_of_city = {}
+    for county, rows in cities.items():
+        for row in rows:
+            if row["count"] > county_of_city.get(row["value"], (None, -1))[1]:
+                county_of_city[row["value"]] = (county, row["count"])
+    for city, county in COUNTY_SEATS.items():
+        county_of_city.setdefault(city, (county, 0))
+    return {
+        "county": VocabularyIndex(counties),
+        "breed": VocabularyIndex(breeds),
+        "city": VocabularyIndex(all_cities),
+        "cities_by_county": {county: _counted(rows) for county, rows in cities.items()},
+        "county_cities": {},
+        "county_of_city": {city: county for city, (county, _) in county_of_city.items()},
+    }
+
+
+_state = {"facets": None, "indexes": None}
+_lock = threading.Lock()
+_stats = {}
+
+
+def _indexes_for(facets):
+    with _lock:
+        if _state["indexes"] is None or _state["facets"] is not facets:
+            _state["indexes"] = build_indexes(facets)
+            _state["facets"] = facets
+        return _state["indexes"]
+
+
+def _city_index(indexes, county):
+    if county not in indexes["cities_by_county"]:
+        return indexes["city"]
+    with _lock:
+        if county not in indexes["county_cities"]:
+            indexes["county_cities"][county] = VocabularyIndex(indexes["cities_by_county"][county])
+        return indexes["county_cities"][county]
+
+
+def _count(field, how):
+    key = f"{field}_{how}"
+    _stats[key] = _stats.get(key, 0) + 1
+
+
+def _resolve_all(field, value, *indexes):
+    """
+    Matches of value in the first index that has any, or [value] when none matches.
+    """
+    for index in indexes:
+        matches, how = index.match_all(value)
+        if matches:
+            _count(field, how)
+            return matches
+    _count(field, "unmatched")
+    logger.debug("No %s matches %r", field, value)
+    return [value]
+
+
+def _resolve(field, value, *indexes):
+    """
+    Best match of value in indexes, or value itself when none matches.
+    """
+    return _resolve_all(field, value, *indexes)[0]
+
+
+def normalize_filters(filters, facets):
+    """
+    PetFilter with county, city and breed as the model wrote them mapped onto the
+    values stored in the collection; unknown values are kept as written. A breed
+    alternation "labradori|golden" is mapped term by term, and a term matching
+    several breeds by its words ("ciobanesc") becomes an alternation of all of them.
+    """
+    indexes = _indexes_for(facets)
+    filters = dict(filters)
+    if filters.get("county"):
+        county, how = indexes["county"].match(filters["county"])
+        if county is None:
+            # "Cluj-Napoca" as the county: take the county that city belongs to
+            city, how = indexes["city"].match(filters["county"])
+            county = indexes["county_of_city"].get(city)
+        _count("county", how if county else "unmatched")
+        filters["county"] = county or filters["county"]
+    if filters.get("city"):
+        # the cities of the county first, so a near miss is not matched to a namesake elsewhere
+        city_index = _city_index(indexes, filters.get("county"))
+        fallback = [indexes["city"]] if city_index is not indexes["city"] else []
+        filters["city"] = _resolve("city", filters["city"], city_index, *fallback)
+    breed = filters.get("breed")
+    if breed:
+        terms = [term for term in (part.strip() for part in breed.strip("()").split("|")) if term]
+        resolved = list(dict.fromkeys(
+            match for term in terms for match in _resolve_all("breed", term, indexes["breed"])
+        ))
+        filters["breed"] = resolved[0] if len(resolved) == 1 else "|".join(re.escape(term) for term in resolved)
+    return filters
+
+
+async def normalize_filters_async(filters):
+    try:
+        facets = await get_facets()
+    except Exception as e:
+        logger.error(f"Could not load facets for normalization: {str(e)}")
+        facets = None
+    return normalize_filters(filters, facets)
+
+
+def normalization_stats():
+    indexes = _state["indexes"]
+    return {
+        "counties": indexes["county"].size if indexes else None,
+        "cities": indexes["city"].size if indexes else None,
+        "breeds": indexes["breed"].size if indexes else None,
+        "matches": dict(_stats),
+    }
@@ -0,0 +1,180 @@
+import os
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+def _default_parser():
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+HTML_PARSER = os.getenv("SCRAPER_HTML_PARSER") or _default_parser()
+
+DETAIL_ITEMPROPS = {"itemListElement", "description", "name"}
+
+
+def _classes(attrs):
+    value = attrs.get("class") or ""
+    return value.split() if isinstance(value, str) else value
+
+
+def _is_detail_subtree(name, attrs):
+    attrs = attrs or {}
+    if attrs.get("itemprop") in DETAIL_ITEMPROPS:
+        return True
+    return name == "div" and "attribute-item" in _classes(attrs)
+
+
+class DetailStrainer(SoupStrainer):
+    """
+    Keeps only the subtrees parse_detail_fields reads: attribute items, breadcrumbs,
+    the description and the location paragraph. Top-level only, so nested
+    elements of a kept subtree are always preserved.
+    """
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return _is_detail_subtree(name, attrs)
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        # beautifulsoup4 < 4.13 strains through search_tag instead of allow_tag_creation
+        return _is_detail_subtree(markup_name, markup_attrs)
+
+
+def _is_listing_card(name, attrs):
+    return name == "div" and "article-item" in _classes(attrs or {})
+
+
+class ListingStrainer(SoupStrainer):
+    """
+    Keeps only the article-item cards. Matched on the split class list: a
+    class_="article-item" strainer sees the raw attribute while the tree is
+    built and would drop cards such as "article-item article-item-promoted".
+    """
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return _is_listing_card(name, attrs)
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return _is_listing_card(markup_name, markup_attrs)
+
+
+LISTING_STRAINER = ListingStrainer()
+
+
+def parse_price(price_str):
+    if not price_str:
+        return None
+    cleaned = re.sub(r'[^\d\.]', '', price_str)
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def parse_listing_page(html):
+    """
+    Extract the pet cards of a listing page, without the fields that live on the detail page.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=LISTING_STRAINER)
+    cards = []
+
+    for card in soup.find_all('div', class_='article-item'):
+        title_element = card.find('h2', class_='article-title')
+        title_text = title_element.find('a').get_text(strip=True) if title_element and title_element.find('a') else None
+
+        link = title_element.find('a')['href'] if title_element and title_element.find('a') else None
+
+        promoted_tag = card.find('div', class_='art-promoted')
+        is_promoted = promoted_tag is not None
+
+        img_element = card.find('img')
+        image_url = img_element['src'] if img_element and img_element.has_attr('src') else None
+
+        price_container = card.find('span', class_='article-price')
+        price_value = None
+
+        if price_container:
+            new_price_elem = price_container.find('span', class_='new-price')
+            if new_price_elem:
+                new_price_text = new_price_elem.get_text(strip=True)
+                price_value = parse_price(new_price_text)
+            else:
+                price_text = price_container.get_text(strip=True)
+                price_value = parse_price(price_text)
+
+        cards.append({
+            "title": title_text,
+            "link": link,
+            "description": None,
+            "county": None,
+            "city": None,
+            "image_url": image_url,
+            "price": price_value,
+            "category": None,
+            "breed": None,
+            "promoted": is_promoted
+        })
+
+    return cards
+
+
+def parse_detail_fields(html):
+    """
+    Extract breed, category, description, county and city from a detail page.
+    Pure function of the HTML so it can run in a worker process.
+    """
+    detail_soup = BeautifulSoup(html, HTML_PARSER, parse_only=DetailStrainer())
+    fields = {"description": None}
+    attribute_items = detail_soup.find_all("div", class_="attribute-item")
+
+    breed = None
+    for item in attribute_items:
+        label_div = item.find("div", class_="attribute-label")
+
+        if label_div and "Rase" in label_div.get_text():
+            value_div = item.find("div", class_="attribute-value")
+            if value_div:
+                breed = value_div.get_text(strip=True)
+                break
+
+    fields["breed"] = breed
+
+    category = None
+    li_elements = detail_soup.find_all("li", {"itemprop": "itemListElement"})
+    for li in li_elements:
+        pos_meta = li.find("meta", {"itemprop": "position"})
+        if pos_meta and pos_meta.get("content", "") == "4":
+            span_elem = li.find("span", {"itemprop": "name"})
+            if span_elem:
+                category = span_elem.get_text(strip=True)
+    fields["category"] = category
+
+    desc_div = detail_soup.find("div", class_="article-description", itemprop="description")
+    if desc_div:
+        for span in desc_div.find_all("span", style=lambda s: s and "opacity:0" in s):
+            span.decompose()
+        fields["description"] = desc_div.get_text(separator="\n", strip=True)
+
+    location_elem = detail_soup.find("p", itemprop="name")
+    county = None
+    city = None
+    if location_elem:
+        links = location_elem.find_all("a", itemprop="url")
+        if len(links) >= 2:
+            county = links[0].get_text(strip=True)
+            city = links[1].get_text(strip=True)
+
+    fields["county"] = county
+    fields["city"] = city
+    return fields
+
+
+def parse_detail_page(html, pet_data):
+    """
+    Fill breed, category, description, county and city of pet_data from its detail page.
+    """
+    pet_data.update(parse_detail_fields(html))
+    return pet_data
@@ -0,0 +1,100 @@
+import logging
+
+from services.scraper import iter_pet_cards, has_detail_fields, PageFetchError
+from services.crawler import iter_pet_cards_async
+from services.similarity import index_pet_cards, unindex_links
+from services.enrichment import enrich_card
+from dataAccess.db import (
+    PetCardWriter, get_known_listings, get_promoted_links, get_checkpoint, save_checkpoint, clear_checkpoint,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ScrapeCancelled(Exception):
+    pass
+
+
+def run_scrape_pipeline(url, overwrite=False, incremental=False, revalidate=False, concurrent=False,
+                        batch_size=500, resume=True, cancel=None, progress=None, **crawler_options):
+    """
+    Stream scraped cards straight into batched bulk writes, checkpointing the
+    page and link of the last flushed card so an interrupted crawl resumes there.
+    Returns the writer summary, or None if nothing was scraped.
+
+    progress, when given, is kept up to date with pages/cards done and the
+    request counters. Setting the cancel event stops the crawl after the current
+    card, flushes what was scraped and leaves the checkpoint for a later resume.
+    A listing page that cannot be fetched does the same and raises PageFetchError:
+    the crawl is incomplete, so nothing is deleted or marked stale.
+    """
+    progress = progress if progress is not None else {}
+    progress.update({"page": None, "pages": 0, "cards": 0, "written": 0})
+
+    checkpoint = get_checkpoint(url) if resume else None
+    if checkpoint:
+        logger.info(f"Resuming {url} after page {checkpoint['page']}, link {checkpoint['link']}")
+        start_page, resume_after, run_id = checkpoint["page"], checkpoint["link"], checkpoint["run_id"]
+        promoted_links = get_promoted_links(run_id)
+    else:
+        start_page, resume_after, run_id = 1, None, None
+        promoted_links = None
+
+    known = get_known_listings() if incremental else None
+    writer = PetCardWriter(
+        overwrite=overwrite, source_url=url, incremental=incremental, batch_size=batch_size, run_id=run_id,
+        on_flush=index_pet_cards, on_remove=unindex_links,
+    )
+
+    if concurrent:
+        cards = iter_pet_cards_async(
+            url, start_page=start_page, resume_after=resume_after, stats=progress,
+            promoted_links=promoted_links, known=known, revalidate=revalidate, **crawler_options
+        )
+    else:
+        cards = iter_pet_cards(
+            url, known=known, revalidate=revalidate, start_page=start_page, resume_after=resume_after,
+            stats=progress, promoted_links=promoted_links
+        )
+
+    count = 0
+    last = None
+    try:
+        for page_num, pet_data in cards:
+            count += 1
+            last = (page_num, pet_data["link"])
+            if page_num != progress["page"]:
+                progress["page"] = page_num
+                progress["pages"] += 1
+            progress["cards"] = count
+            # a card stripped to its listing fields would get weaker tags than the stored ones
+            if has_detail_fields(pet_data):
+                enrich_card(pet_data)
+            if writer.add(pet_data):
+                save_checkpoint(url, writer.run_id, page_num, pet_data["link"])
+            progress["written"] = writer.written
+
+            if cancel is not None and cancel.is_set():
+                writer.flush()
+                progress["written"] = writer.written
+                save_checkpoint(url, writer.run_id, page_num, pet_data["link"])
+                logger.info(f"Scrape of {url} cancelled after {count} cards on page {page_num}")
+                raise ScrapeCancelled(f"Cancelled after {count} cards, resumable from page {page_num}")
+    except PageFetchError as e:
+        writer.flush()
+        progress["written"] = writer.written
+        if last:
+            save_checkpoint(url, writer.run_id, *last)
+        logger.error(f"Scrape of {url} stopped after {count} cards: {e}")
+        raise
+    finally:
+        cards.close()
+
+    if not count and not checkpoint:
+        return None
+
+    result = writer.finish()
+    progress["written"] = writer.written
+    clear_checkpoint(url)
+    return result
@@ -0,0 +1,161 @@
+import re
+import threading
+
+from services.text import normalize_text
+from services.vocabulary import CITIES, COUNTIES, CAT_BREEDS, DOG_BREEDS
+
+DOG_WORDS = {"caine", "caini", "cainele", "catel", "catei", "catelus", "catelusi", "catelusa",
+             "dog", "dogs", "puppy", "puppies"}
+CAT_WORDS = {"pisica", "pisici", "pisicuta", "pisicute", "pisoi", "pisoias", "motan", "motani",
+             "cat", "cats", "kitten", "kittens"}
+ADOPTION_WORDS = {"adoptie", "adoptii", "adopt", "adopta", "adoptat", "adoptare", "adoption"}
+
+# Same description terms Gemini is asked to look for when an adoption search names the species
+DOG_DESCRIPTION = "(caine|catel|catelus)"
+CAT_DESCRIPTION = "(pisica|pisicuta|pisoi|motan)"
+
+# A county or city is only read after one of these, so "pisica alba" is not the county Alba
+LOCATION_CUES = {"in", "din", "la", "langa", "judetul", "jud", "orasul", "localitatea", "comuna",
+                 "satul", "municipiul", "near", "from"}
+
+FILLER_WORDS = {
+    "vreau", "caut", "cautam", "as", "vrea", "doresc", "imi", "mi", "ma", "trebuie", "am", "nevoie",
+    "un", "o", "niste", "de", "cu", "si", "pentru", "pe", "spre", "care", "este", "e", "sa", "fie", "unui", "unei",
+    "lei", "ron", "pret", "pretul", "rasa", "animal", "animalut", "companie", "pet",
+    "the", "a", "an", "i", "want", "looking", "for", "with", "and", "breed",
+} | LOCATION_CUES
+
+_NUMBER = r"(\d+(?:[.,]\d+)*)\s*(k|mii)?"
+_RANGE = re.compile(rf"\b(?:intre|between|de la)\s+{_NUMBER}\s*(?:lei|ron)?\s+(?:si|and|pana la|la)\s+{_NUMBER}")
+_MAX = re.compile(rf"\b(?:sub|pana la|maxim|max|maximum|cel mult|mai ieftin de|mai putin de|"
+                  rf"under|below|up to|at most|less than)\s+{_NUMBER}")
+_MIN = re.compile(rf"\b(?:peste|minim|min|minimum|cel putin|mai mult de|mai scump de|de la|"
+                  rf"over|above|more than|at least)\s+{_NUMBER}")
+
+
+def _number(digits, multiplier):
+    if re.fullmatch(r"\d{1,3}(?:[.,]\d{3})+", digits):
+        value = float(re.sub(r"[.,]", "", digits))
+    else:
+        value = float(digits.replace(",", "."))
+    if multiplier:
+        value *= 1000
+    return int(value) if value.is_integer() else value
+
+
+def _build_phrases():
+    """
+    Normalized token tuple -> (field, canonical value). Counties win over the
+    cities of the same name, since filtering on the county is the broader match.
+    """
+    phrases = {}
+    for breed in CAT_BREEDS + DOG_BREEDS:
+        phrases[tuple(normalize_text(breed).split())] = ("breed", breed)
+    for city in CITIES:
+        phrases.setdefault(tuple(normalize_text(city).split()), ("city", city))
+    for county in COUNTIES:
+        phrases[tuple(normalize_text(county).split())] = ("county", county)
+    return phrases
+
+
+PHRASES = _build_phrases()
+MAX_PHRASE_TOKENS = max(len(tokens) for tokens in PHRASES)
+
+_stats = {"attempts": 0, "hits": 0}
+_stats_lock = threading.Lock()
+
+
+def _extract_prices(text, filters):
+    """
+    Fill min_price/max_price from price expressions and blank them out of text.
+    Returns None when two expressions disagree.
+    """
+    for pattern, fields in ((_RANGE, ("min_price", "max_price")), (_MAX, ("max_price",)), (_MIN, ("min_price",))):
+        for match in pattern.finditer(text):
+            groups = match.groups()
+            values = [_number(groups[i], groups[i + 1]) for i in range(0, len(groups), 2)]
+            for field, value in zip(fields, values):
+                if filters[field] is not None and filters[field] != value:
+                    return None
+                filters[field] = value
+            text = text[:match.start()] + " " * (match.end() - match.start()) + text[match.end():]
+    return text
+
+
+def _set(filters, field, value):
+    if filters[field] is not None and filters[field] != value:
+        return False
+    filters[field] = value
+    return True
+
+
+def parse_query(prompt):
+    """
+    PetFilter-shaped dict for prompts made only of vocabulary terms, species,
+    adoption and price expressions, or None when any word is not understood and
+    the prompt has to go to Gemini.
+    """
+    filters = {field: None for field in
+               ("county", "city", "category", "breed", "min_price", "max_price", "description_regex")}
+    text = _extract_prices(normalize_text(prompt), filters)
+    if text is None:
+        return None
+
+    tokens = text.split()
+    species = None
+    adoption = False
+    location_cue = False
+    i = 0
+    while i < len(tokens):
+        for size in range(min(MAX_PHRASE_TOKENS, len(tokens) - i), 0, -1):
+            match = PHRASES.get(tuple(tokens[i:i + size]))
+            if match and (match[0] == "breed" or location_cue):
+                if not _set(filters, *match):
+                    return None
+                location_cue = False
+                i += size
+                break
+        else:
+            token = tokens[i]
+            if token in DOG_WORDS or token in CAT_WORDS:
+                found = "Caini" if token in DOG_WORDS else "Pisici"
+                if species and species != found:
+                    return None
+                species = found
+            elif token in ADOPTION_WORDS:
+                adoption = True
+            elif token not in FILLER_WORDS:
+                return None
+            location_cue = token in LOCATION_CUES or (location_cue and token in FILLER_WORDS)
+            i += 1
+
+    if adoption:
+        if filters["breed"]:
+            return None
+        filters["category"] = "Adoptii"
+        if species:
+            filters["description_regex"] = DOG_DESCRIPTION if species == "Caini" else CAT_DESCRIPTION
+    elif species:
+        filters["category"] = species
+
+    if all(value is None for value in filters.values()):
+        return None
+    return filters
+
+
+def parse_query_tracked(prompt):
+    """
+    parse_query that also counts how often the local fast path answered.
+    """
+    filters = parse_query(prompt)
+    with _stats_lock:
+        _stats["attempts"] += 1
+        if filters is not None:
+            _stats["hits"] += 1
+    return filters
+
+
+def fast_path_stats():
+    with _stats_lock:
+        attempts, hits = _stats["attempts"], _stats["hits"]
+    return {"attempts": attempts, "hits": hits, "hit_rate": round(hits / attempts, 4) if attempts else None}
@@ -1,172 +1,166 @@
-import re
 import requests
 import time
-from bs4 import BeautifulSoup
+from services.parsers import parse_price, parse_listing_page, parse_detail_page
 
 session = requests.Session()
 
-def parse_price(price_str):
-    if not price_str:
-        return None
-    cleaned = re.sub(r'[^\d\.]', '', price_str)
-    try:
-        return float(cleaned)
-    except ValueError:
+HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/135.0.0.0 Safari/537.36'
+    )
+}
+
+DETAIL_FIELDS = ("description", "county", "city", "category", "breed")
+
+
+class PageFetchError(Exception):
+    """
+    A listing page could not be fetched, so the crawl ended before the last page.
+    """
+
+
+def detail_request_headers(link, known=None, revalidate=False):
+    """
+    Headers for fetching a detail page, or None when an incremental run should skip it.
+    known maps already stored links to their saved ETag/Last-Modified validators.
+    """
+    if not known or link not in known:
+        return HEADERS
+    if not revalidate:
         return None
 
-def scrape_pet_cards(base_url: str):
-    
-    headers = {
-        'User-Agent': (
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) '
-            'Chrome/135.0.0.0 Safari/537.36'
-        )
-    }
-    page_num = 1
-    pet_cards_list = []
+    headers = dict(HEADERS)
+    validators = known[link] or {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def mark_unchanged(pet_data):
+    """
+    Drop the detail fields so an upsert only refreshes what the listing page shows.
+    Used for unchanged detail pages and for ones that could not be fetched, whose
+    empty fields would otherwise overwrite the stored ones.
+    """
+    for field in DETAIL_FIELDS:
+        pet_data.pop(field, None)
+    return pet_data
+
+
+def has_detail_fields(pet_data):
+    """
+    False for a card whose detail fields were dropped by mark_unchanged, which
+    only carries what the listing page shows.
+    """
+    return any(field in pet_data for field in DETAIL_FIELDS)
+
+
+def record_validators(pet_data, response_headers):
+    validators = {}
+    if response_headers.get("ETag"):
+        validators["etag"] = response_headers["ETag"]
+    if response_headers.get("Last-Modified"):
+        validators["last_modified"] = response_headers["Last-Modified"]
+    if validators:
+        pet_data["http_validators"] = validators
+    return pet_data
+
+
+def cards_after(pet_cards, last_link):
+    """
+    Drop the cards up to and including last_link, used when resuming inside a page.
+    """
+    links = [pet_data["link"] for pet_data in pet_cards]
+    if last_link not in links:
+        return pet_cards
+    return pet_cards[links.index(last_link) + 1:]
+
+
+def _get(url, headers, stats):
+    response = session.get(url, headers=headers)
+    stats["requests"] = stats.get("requests", 0) + 1
+    if response.status_code == 429:
+        stats["throttled"] = stats.get("throttled", 0) + 1
+    return response
+
+
+def iter_pet_cards(base_url: str, known=None, revalidate=False, start_page=1, resume_after=None, stats=None,
+                   promoted_links=None):
+    """
+    Yield (page_num, pet_data) as soon as each card is scraped. Request and 429
+    counts are kept in stats when given. Raises PageFetchError when a listing
+    page still fails after the retry.
+    """
+    stats = stats if stats is not None else {}
+    page_num = start_page
+    promoted_links = set(promoted_links or ())
 
     while True:
         url = f"{base_url}?pag={page_num}"
-        response = session.get(url, headers=headers)
+        response = _get(url, HEADERS, stats)
         time.sleep(2)
 
-        delay = 0.5
         count = 0
 
         if response.status_code == 429:
-            print(f"429 received at page {page_num}. Waiting for {delay} seconds before retrying...")
+            print(f"429 received at page {page_num}. Waiting for 2 seconds before retrying...")
             time.sleep(2)
-            response = session.get(url, headers=headers)
+            response = _get(url, HEADERS, stats)
 
         if response.status_code != 200:
-            print(f"Failed to retrieve page {page_num}: {response.status_code}")
-            break
+            raise PageFetchError(f"Failed to retrieve page {page_num}: {response.status_code}")
         if response.url.rstrip('/') == base_url.rstrip('/'):
             print(f"Reached the last page: {url}")
             break
 
-        # if page_num == 10:
-        #     break
-            
         print(f"Scraping page {page_num}: {url}")
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        pet_cards = soup.find_all('div', class_='article-item')
+        pet_cards = parse_listing_page(response.text)
         if not pet_cards:
             break
-        
-
+        if resume_after and page_num == start_page:
+            pet_cards = cards_after(pet_cards, resume_after)
 
-        for card in pet_cards:
-            title_element = card.find('h2', class_='article-title')
-            title_text = title_element.find('a').get_text(strip=True) if title_element and title_element.find('a') else None
+        for pet_data in pet_cards:
+            link = pet_data["link"]
 
-            link = title_element.find('a')['href'] if title_element and title_element.find('a') else None
-
-            promoted_tag = card.find('div', class_='art-promoted')
-            is_promoted = promoted_tag is not None
-
-            if is_promoted:
-                if any(pet.get("link") == link and pet.get("promoted") for pet in pet_cards_list):
+            if pet_data["promoted"]:
+                if link in promoted_links:
                     continue
+                promoted_links.add(link)
 
-            img_element = card.find('img')
-            image_url = img_element['src'] if img_element and img_element.has_attr('src') else None
-
-            price_container = card.find('span', class_='article-price')
-            price_value = None
-
-            if price_container:
-                new_price_elem = price_container.find('span', class_='new-price')
-                if new_price_elem:
-                    new_price_text = new_price_elem.get_text(strip=True)
-                    price_value = parse_price(new_price_text)
-                else:
-                    price_text = price_container.get_text(strip=True)
-                    price_value = parse_price(price_text)
-
-            
-
-            pet_data = {
-                "title": title_text,
-                "link": link,
-                "description": None,
-                "county": None,
-                "city": None,
-                "image_url": image_url,
-                "price": price_value,
-                "category": None,
-                "breed": None,
-                "promoted": is_promoted
-            }
-            
-            if link:
+            detail_headers = detail_request_headers(link, known, revalidate) if link else None
+            if link and detail_headers is None:
+                mark_unchanged(pet_data)
+            elif link:
                 time.sleep(0.5)
-                detail_response = session.get(link, headers=headers)
+                detail_response = _get(link, detail_headers, stats)
                 count = count + 1
 
                 if detail_response.status_code == 429:
                     print('429 error on individual pet page ' + str(count) + ' on page ' + str(page_num))
                     time.sleep(0.5)
-                    detail_response = session.get(link, headers=headers)
-                
-                if detail_response.status_code == 200:
+                    detail_response = _get(link, detail_headers, stats)
+
+                if detail_response.status_code == 304:
+                    mark_unchanged(pet_data)
+                elif detail_response.status_code == 200:
                     print(link)
-                    detail_soup = BeautifulSoup(detail_response.text, 'html.parser')
                     print('Scraping individual pet page ' + str(count) + ' on page ' + str(page_num))
-                    attribute_items = detail_soup.find_all("div", class_="attribute-item")
-
-                    breed = None
-                    for item in attribute_items:
-                        label_div = item.find("div", class_="attribute-label")
-
-                        if label_div and "Rase" in label_div.get_text():
-                            value_div = item.find("div", class_="attribute-value")
-                            if value_div:
-                                breed = value_div.get_text(strip=True)
-                                break
-  
-                    pet_data["breed"] = breed
-
-                    category = None
-                    li_elements = detail_soup.find_all("li", {"itemprop": "itemListElement"})
-                    for li in li_elements:
-                        pos_meta = li.find("meta", {"itemprop": "position"})
-                        if pos_meta:
-                            position = pos_meta.get("content", "")
-                            if position == "4":
-                                span_elem = li.find("span", {"itemprop": "name"})
-                                if span_elem:
-                                    category = span_elem.get_text(strip=True)
-                            elif position == "5":
-                                span_elem = li.find("span", {"itemprop": "name"})
-                    pet_data["category"] = category
-
-
-            desc_div = detail_soup.find("div", class_="article-description", itemprop="description")
-            if desc_div:
-                for span in desc_div.find_all("span", style=lambda s: s and "opacity:0" in s):
-                    span.decompose()
-                full_description = desc_div.get_text(separator="\n", strip=True)
-                pet_data["description"] = full_description
-            
-            location_elem = detail_soup.find("p", itemprop="name")
-            county = None
-            city = None
-            if location_elem:
-                links = location_elem.find_all("a", itemprop="url")
-                if len(links) >= 2:
-                    county = links[0].get_text(strip=True)
-                    city = links[1].get_text(strip=True)
-
-            pet_data["county"] = county
-            pet_data["city"] = city
-
-
-            pet_cards_list.append(pet_data)
+                    parse_detail_page(detail_response.text, pet_data)
+                    record_validators(pet_data, detail_response.headers)
+                else:
+                    print(f"Failed to retrieve {link}: {detail_response.status_code}")
+                    mark_unchanged(pet_data)
 
+            yield page_num, pet_data
 
         page_num += 1
 
-    return pet_cards_list
+
+def scrape_pet_cards(base_url: str, known=None, revalidate=False):
+    return [pet_data for _, pet_data in iter_pet_cards(base_url, known=known, revalidate=revalidate)]
@@ -0,0 +1,250 @@
+import os
+import time
+import zlib
+import logging
+import threading
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from dataAccess.db import get_all_pet_cards
+from services.text import normalize_text
+from services.scraper import has_detail_fields
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SIMILAR_PETS = os.getenv("SIMILAR_PETS", "1") == "1"
+# Hashed feature space, wide enough that the few hundred features of a listing rarely collide
+VECTOR_DIM = int(os.getenv("SIMILAR_VECTOR_DIM", str(2 ** 18)))
+# Rows scored per matrix product, bounds the temporary score buffer
+SEARCH_CHUNK = 8192
+BREED_WEIGHT = 3
+
+
+def _features(card):
+    """
+    Word unigrams and character trigrams of title + description, plus the breed
+    as a single heavily weighted feature.
+    """
+    text = normalize_text(f"{card.get('title') or ''} {card.get('description') or ''}")
+    features = []
+    for word in text.split():
+        features.append(f"w:{word}")
+        padded = f" {word} "
+        features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    if card.get("breed"):
+        features.extend([f"b:{normalize_text(card['breed'])}"] * BREED_WEIGHT)
+    return features
+
+
+def term_vector(card):
+    """
+    Signed hashed term frequencies (1 + log tf) before IDF weighting, as sorted
+    (columns, values) arrays. crc32 rather than hash() so vectors are stable
+    across processes.
+    """
+    counts = Counter(_features(card))
+    hashes = np.fromiter((zlib.crc32(feature.encode()) for feature in counts), dtype=np.uint32, count=len(counts))
+    weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    signs = np.where(hashes & 0x80000000, 1.0, -1.0).astype(np.float32)
+    columns, positions = np.unique((hashes % VECTOR_DIM).astype(np.int32), return_inverse=True)
+    values = np.zeros(len(columns), dtype=np.float32)
+    np.add.at(values, positions, signs * weights)
+    nonzero = values != 0
+    return columns[nonzero], values[nonzero]
+
+
+def _csr(vectors):
+    """
+    CSR matrix with one row per (columns, values) term vector.
+    """
+    indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+    np.cumsum([len(columns) for columns, _ in vectors], out=indptr[1:])
+    columns = np.concatenate([columns for columns, _ in vectors] or [np.zeros(0, dtype=np.int32)])
+    values = np.concatenate([values for _, values in vectors] or [np.zeros(0, dtype=np.float32)])
+    return sparse.csr_matrix((values, columns, indptr), shape=(len(vectors), VECTOR_DIM))
+
+
+def _normalized(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags((1 / norms).astype(np.float32)) @ matrix
+
+
+class SimilarityIndex:
+    """
+    L2-normalised TF-IDF rows of every indexed listing in a sparse CSR matrix,
+    keyed by link. Raw term vectors are kept so document frequencies and the
+    weighted matrix can be refreshed as new cards come in without re-reading the
+    collection. Readers take (matrix, links) from one published tuple, so a
+    search never maps rows of one matrix through the links of another.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.links = []
+        self.rows = {}
+        self.raw = []
+        self.doc_freq = np.zeros(VECTOR_DIM, dtype=np.float64)
+        self.idf = np.ones(VECTOR_DIM, dtype=np.float32)
+        self.published = (sparse.csr_matrix((0, VECTOR_DIM), dtype=np.float32), [])
+        self.size = 0
+        self.updated_at = None
+
+    def _reweight(self):
+        self.idf = (np.log((1 + self.size) / (1 + self.doc_freq)) + 1).astype(np.float32)
+        matrix = _normalized(_csr(self.raw) @ sparse.diags(self.idf))
+        self.published = (matrix.tocsr(), list(self.links))
+
+    def add(self, cards):
+        """
+        Index or re-index cards by link, then refresh IDF and the weighted matrix.
+        """
+        cards = [card for card in cards if card.get("link")]
+        if not cards:
+            return 0
+        vectors = [term_vector(card) for card in cards]
+        with self._lock:
+            for card, vector in zip(cards, vectors):
+                row = self.rows.get(card["link"])
+                if row is None:
+                    self.rows[card["link"]] = self.size
+                    self.links.append(card["link"])
+                    self.raw.append(vector)
+                    self.size += 1
+                else:
+                    self.doc_freq[self.raw[row][0]] -= 1
+                    self.raw[row] = vector
+                self.doc_freq[vector[0]] += 1
+            self._reweight()
+            self.updated_at = time.time()
+        return len(cards)
+
+    def remove(self, links):
+        """
+        Drop the rows of links, moving the last rows into the freed slots, then
+        refresh IDF and the weighted matrix.
+        """
+        removed = 0
+        with self._lock:
+            for link in links:
+                row = self.rows.pop(link, None)
+                if row is None:
+                    continue
+                self.doc_freq[self.raw[row][0]] -= 1
+                last = self.size - 1
+                if row != last:
+                    self.raw[row] = self.raw[last]
+                    self.links[row] = self.links[last]
+                    self.rows[self.links[row]] = row
+                self.raw.pop()
+                self.links.pop()
+                self.size -= 1
+                removed += 1
+            if removed:
+                self._reweight()
+                self.updated_at = time.time()
+        return removed
+
+    def vector_for(self, card):
+        """
+        Weighted 1 x VECTOR_DIM row of card: its indexed row, or a fresh vector for
+        a listing not in the index.
+        """
+        with self._lock:
+            matrix = self.published[0]
+            row = self.rows.get(card.get("link"))
+        if row is not None:
+            return matrix[row]
+        columns, values = term_vector(card)
+        vector = sparse.csr_matrix(
+            (values * self.idf[columns], columns, [0, len(columns)]), shape=(1, VECTOR_DIM)
+        )
+        return _normalized(vector).tocsr()
+
+    def top_k(self, queries, k):
+        """
+        Batched cosine search: for each row of the sparse queries, the k best
+        (link, score) pairs, scoring SEARCH_CHUNK listings at a time.
+        """
+        matrix, links = self.published
+        queries = sparse.csr_matrix(queries)
+        best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+        best_rows = np.empty((queries.shape[0], 0), dtype=np.int64)
+        for start in range(0, matrix.shape[0], SEARCH_CHUNK):
+            chunk = (queries @ matrix[start:start + SEARCH_CHUNK].T).toarray()
+            rows = np.broadcast_to(np.arange(start, start + chunk.shape[1]), chunk.shape)
+            scores = np.concatenate([best_scores, chunk], axis=1)
+            rows = np.concatenate([best_rows, rows], axis=1)
+            keep = min(k, scores.shape[1])
+            top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_rows = np.take_along_axis(rows, top, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return [
+            [(links[row], float(score)) for row, score in zip(row_ids, row_scores)]
+            for row_ids, row_scores in zip(best_rows, best_scores)
+        ]
+
+
+_index = {"current": SimilarityIndex()}
+
+
+def rebuild_similarity_index():
+    """
+    Vectorize every live listing into a fresh index and swap it in.
+    """
+    if not SIMILAR_PETS:
+        return None
+    started = time.perf_counter()
+    index = SimilarityIndex()
+    index.add(get_all_pet_cards({}, max_results=None, max_time_ms=None))
+    _index["current"] = index
+    logger.info(f"Similarity index built: {index.size} listings in {time.perf_counter() - started:.3f}s")
+    return index
+
+
+def index_pet_cards(cards):
+    """
+    Ingest hook for PetCardWriter: vectorize the cards of one flushed batch.
+    Cards of unchanged or unfetched detail pages only carry the title, so their
+    stored vector is kept.
+    """
+    if SIMILAR_PETS:
+        _index["current"].add([card for card in cards if has_detail_fields(card)])
+
+
+def unindex_links(links):
+    """
+    Removal hook for PetCardWriter: drop listings deleted or marked stale.
+    """
+    if SIMILAR_PETS:
+        _index["current"].remove(links)
+
+
+def similar_links(card, k):
+    """
+    (link, cosine similarity) of the k listings closest to card, itself and
+    listings sharing nothing with it excluded.
+    """
+    index = _index["current"]
+    if not index.size:
+        return []
+    matches = index.top_k(index.vector_for(card), k + 1)[0]
+    return [(link, score) for link, score in matches if link != card.get("link") and score > 0][:k]
+
+
+def similarity_stats():
+    index = _index["current"]
+    return {
+        "enabled": SIMILAR_PETS,
+        "listings": index.size,
+        "dimensions": VECTOR_DIM,
+        "nonzero_terms": index.published[0].nnz,
+        "updated_at": index.updated_at,
+    }
@@ -0,0 +1,22 @@
+import re
+import unicodedata
+
+# ş/ţ with cedilla are the legacy encodings of ș/ț, both fold to s/t through NFKD
+# punctuation is dropped except a . or , between digits, so "1.200 lei" keeps its amount
+_NON_WORD = re.compile(r"[^\w\s.,]|(?<!\d)[.,]|[.,](?!\d)")
+_SPACES = re.compile(r"\s+")
+
+
+def fold_diacritics(text):
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_text(text):
+    """
+    Lowercase, fold diacritics, drop punctuation and collapse whitespace:
+    "Câine  sub 500 lei, în Cluj!" -> "caine sub 500 lei in cluj".
+    """
+    text = fold_diacritics(text.lower())
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
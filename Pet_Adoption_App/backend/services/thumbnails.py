@@ -0,0 +1,192 @@
+import io
+import os
+import time
+import hashlib
+import logging
+import asyncio
+import threading
+from collections import OrderedDict
+
+import httpx
+from PIL import Image, ImageOps
+
+from services.cache import TTLCache
+from services.singleflight import SingleFlight
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels for each thumbnail size
+THUMBNAIL_SIZES = {"small": 320, "medium": 640}
+THUMBNAIL_DIR = os.getenv("THUMBNAIL_CACHE_DIR", os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "animalutul", "thumbnails",
+))
+THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv("THUMBNAIL_CACHE_MAX_MB", "512")) * 1024 * 1024
+THUMBNAIL_MAX_AGE = int(os.getenv("THUMBNAIL_MAX_AGE_SECONDS", "604800"))
+THUMBNAIL_FETCH_TIMEOUT = float(os.getenv("THUMBNAIL_FETCH_TIMEOUT_SECONDS", "10"))
+# Source images above this size are not downloaded
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+
+
+class DiskLRUCache:
+    """
+    Files under directory, evicted least recently served first once their total
+    size passes max_bytes. Recency survives restarts through file mtimes. The
+    directory is only created by the first write.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        files = []
+        for name in os.listdir(directory) if os.path.isdir(directory) else []:
+            path = os.path.join(directory, name)
+            if name.endswith(".tmp"):
+                os.remove(path)
+            elif os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._bytes += size
+
+    def get(self, key):
+        path = os.path.join(self.directory, key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+            return None
+        return data
+
+    def set(self, key, data):
+        path = os.path.join(self.directory, key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+                try:
+                    os.remove(os.path.join(self.directory, old_key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "files": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+# Listing id -> image_url, so a cached thumbnail is served without a Mongo lookup
+image_urls = TTLCache("thumbnail_image_urls", max_size=20000, ttl=3600)
+
+_cache = {"disk": None}
+_flights = SingleFlight()
+_client = {"http": None}
+
+
+def _disk():
+    if _cache["disk"] is None:
+        _cache["disk"] = DiskLRUCache(THUMBNAIL_DIR, THUMBNAIL_CACHE_MAX_BYTES)
+    return _cache["disk"]
+
+
+def _key(image_url, size):
+    return f"{hashlib.sha256(image_url.encode()).hexdigest()}-{size}.jpg"
+
+
+def etag_for(data):
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+
+def render_thumbnails(image_bytes):
+    """
+    JPEG bytes for every THUMBNAIL_SIZES entry, never upscaling the source.
+    """
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_bytes))).convert("RGB")
+    thumbnails = {}
+    for size, max_side in sorted(THUMBNAIL_SIZES.items(), key=lambda item: -item[1]):
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=80, optimize=True, progressive=True)
+        thumbnails[size] = buffer.getvalue()
+    return thumbnails
+
+
+async def _download(image_url):
+    if _client["http"] is None:
+        _client["http"] = httpx.AsyncClient(timeout=THUMBNAIL_FETCH_TIMEOUT, follow_redirects=True)
+    async with _client["http"].stream("GET", image_url) as response:
+        response.raise_for_status()
+        chunks = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            if received > MAX_SOURCE_BYTES:
+                raise ValueError(f"Source image larger than {MAX_SOURCE_BYTES} bytes")
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def get_thumbnail(image_url, size):
+    """
+    Thumbnail bytes of image_url from the disk cache, downloading the source and
+    rendering every size on a miss. Concurrent misses for one image share a download.
+    """
+    disk = _disk()
+    data = await asyncio.to_thread(disk.get, _key(image_url, size))
+    if data is not None:
+        return data
+
+    async def fetch_and_render():
+        started = time.perf_counter()
+        source = await _download(image_url)
+        thumbnails = await asyncio.to_thread(render_thumbnails, source)
+        for name, thumbnail in thumbnails.items():
+            await asyncio.to_thread(disk.set, _key(image_url, name), thumbnail)
+        logger.info(f"Rendered thumbnails for {image_url} ({len(source)} bytes) "
+                    f"in {time.perf_counter() - started:.2f}s")
+        return thumbnails
+
+    thumbnails = await _flights.do(image_url, fetch_and_render)
+    return thumbnails[size]
+
+
+async def close_thumbnail_client():
+    if _client["http"] is not None:
+        await _client["http"].aclose()
+        _client["http"] = None
+
+
+def thumbnail_stats():
+    return {**_disk().stats(), "sizes": THUMBNAIL_SIZES}
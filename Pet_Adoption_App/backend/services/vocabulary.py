@@ -0,0 +1,198 @@
+# Closed vocabularies of the animalutul catalog. The local query parser matches user
+# prompts against them, and the normalization index falls back to them while the
+# collection is empty.
+
+CITIES = [
+    "1 Decembrie", "101. Veresti", "23 August", "APOSTOLACHE", "ARICESTII - RAHTIVANI", "Abram",
+    "Abrud", "Abucea", "Aciuta", "Adam", "Adanca", "Adea", "Adjud", "Adunati", "Adunatii-Copaceni",
+    "Afumati", "Agigea", "Aita Mare", "Aita Seaca", "Aiud", "Aiudul de Sus", "Alba Iulia",
+    "Albesti-Paleologu", "Albina", "Albota", "Alesd", "Alexandria", "Alexandru cel Bun", "Almaj",
+    "Almas", "Alunis", "Amara", "Amarastii de Jos", "Aninoasa", "Antofiloaia", "Apahida", "Apateu",
+    "Araci", "Arad", "Araneag", "Arbore", "Ardeoani", "Ardud", "Argeselu", "Argetoaia", "Arieseni",
+    "Armenis", "Avram Iancu", "Avrig", "Axente Sever", "BERCENI", "BOLDESTI GRADISTEA",
+    "Baba Novac", "Babadag", "Babiceni", "Bacau", "Baciu", "Baia", "Baia Mare", "Baia Sprie",
+    "Baia de Arama", "Baia de Fier", "Baicoi", "Baiculesti", "Baile Govora", "Baile Herculane",
+    "Baita", "Bajesti", "Bala", "Balaceanca", "Balaia", "Balanesti", "Balc", "Balcani", "Balcauti",
+    "Balcesti", "Balesti", "Balilesti", "Balosesti", "Balotesti", "Bals", "Balta Alba",
+    "Balta Ratei", "Baltatesti", "Balteni", "Balvanesti", "Banesti", "Banita", "Barastii Hategului",
+    "Barca", "Barcea", "Bardesti", "Barlad", "Barsesti", "Barsestii de Jos", "Barzava", "Bascov",
+    "Batiz", "Batos", "Beciu", "Beclean", "Beica de Jos", "Beius", "Belciug", "Belciugatele",
+    "Belin", "Beliu", "Belobresca", "Bentu", "Berceni", "Berechiu", "Beregsau Mare", "Berghin",
+    "Berinta", "Bertestii de Sus", "Bicaz-Chei", "Biertan", "Bilbor", "Bilca", "Bistra Muresului",
+    "Bistrita", "Bistrita Bargaului", "Bistrita Bargaului Fabrici", "Blagesti", "Blaj", "Blandiana",
+    "Blejesti", "Bobicesti", "Bocsig", "Bogata", "Boiu", "Boldesti-Scaeni", "Boldu",
+    "Bolintin-Deal", "Bolintin-Vale", "Bolotesti", "Bolovani", "Bolvasnita", "Bontesti", "Bontida",
+    "Borla", "Borlesti", "Boroaia", "Borsa", "Botiza", "Botoroaga", "Botosani", "Brad", "Bradeni",
+    "Bradesti", "Bradu", "Bragadiru", "Brahasesti", "Braiesti", "Braila", "Braisoru", "Branesti",
+    "Branet", "Brasov", "Bratila", "Brazii", "Breasta", "Brebu Megiesesc", "Brusturi",
+    "Buceava-Soimus", "Bucecea", "Buchilasi", "Buda", "Budacu de Jos", "Budesti", "Buftea",
+    "Buhani", "Buhusi", "Bumbesti-Jiu", "Burla", "Buteni", "Buzau", "Buzias", "Buznea", "Buzoesti",
+    "Cacica", "Caianu-Vama", "Calafat", "Calan", "Calarasi", "Caldarasti", "Calea Mare",
+    "Calinesti (Darmanesti)", "Calmatuiu", "Campeni", "Campia Turzii", "Campina", "Campulung",
+    "Campulung Moldovenesc", "Campulung la Tisa", "Campulung-Muscel", "Campuri",
+    "Capatanenii Pamanteni", "Cara", "Caracal", "Caransebes", "Carbunesti", "Carei", "Carpinis",
+    "Cartisoara", "Casimcea", "Castau", "Catanele", "Catcau", "Catunu (Cornesti)", "Cazaci",
+    "Cazanesti", "Cazanesti (Ramnicu Valcea)", "Cefa", "Cehu Silvaniei", "Celaru", "Cenad",
+    "Cenade", "Cernavoda", "Cerneteaz", "Certeze", "Cheriu", "Chetani", "Cheud", "Chiajna", "Chier",
+    "Chileni", "Chilii", "Chiojdeanca", "Chircesti", "Chiriacu", "Chiribis", "Chirnogi (Ulmu)",
+    "Chiscani", "Chisineu Cris", "Chisirid", "Chislaca", "Chislaz", "Chisoda", "Chitila", "Chiuza",
+    "Ciacova", "Cib", "Cihei", "Cinta", "Ciolt", "Cioranii de Jos", "Ciorogarla", "Cisnadie",
+    "Ciucea", "Ciuchici", "Ciudanovita", "Ciuguzel", "Ciuslea", "Clapa", "Clinceni", "Cluj-Napoca",
+    "Cocorastii - Mislii", "Codlea", "Cogealac", "Coltau", "Coltirea", "Comanesti", "Comarnic",
+    "Comsesti", "Condoiesti", "Constanta", "Copalnic-Manastur", "Corabia", "Corbeanca", "Corbeni",
+    "Corbii Mari", "Corbu", "Corcova", "Cordun", "Cornesti (Craciunesti)", "Corni", "Corunca",
+    "Cosoba", "Costeiu", "Costesti", "Costisa", "Cotofenii din Dos", "Cotofenii din Fata",
+    "Covasint", "Covasna", "Craciunelu de Jos", "Craciunesti", "Craiova", "Creaca", "Cremenari",
+    "Cretuleasca", "Criscior", "Cristian", "Crucea", "Cruset", "Cucerdea", "Cuculeasa", "Cudalbi",
+    "Cugir", "Culcea", "Culciu", "Cumpana", "Cunta", "Curtea de Arges", "Curteni", "Curtici",
+    "Curtisoara (Dobretu)", "Cusma", "Cut", "Cuvin", "Cuzdrioara", "Dabuleni", "Dambovicioara",
+    "Dambu", "Damuc", "Danesti", "Darabani", "Darmanesti", "Davidesti", "Deag", "Decebal", "Deda",
+    "Dej", "Derna", "Dernisoara", "Dersca", "Deta", "Deva", "Divici", "Doanca", "Dobroteasa",
+    "Dobrotesti", "Dofteana", "Domnesti", "Dor Marunt", "Dorohoi", "Draganesti de Vede",
+    "Draganesti-Olt", "Draganu", "Dragasani", "Dragodana", "Dragoeni", "Dragoesti",
+    "Dragomiresti-Deal", "Dragomiresti-Vale", "Dragutesti", "Drajna de Jos",
+    "Drobeta-Turnu Severin", "Dud", "Dumbrava", "Dumbrava Rosie", "Dumbraveni", "Dumbravita",
+    "Dumitra", "Eforie", "Eforie Nord", "Enachesti", "Fagaras", "Faget", "Falticeni", "Fancica",
+    "Fantanele", "Fantanele (Hemeius)", "Farcasa", "Fartatesti", "Fasca", "Feldru", "Feliceni",
+    "Fenis", "Ferendia", "Ferice", "Fetesti", "Fetesti-Gara", "Fieni", "Filiasi", "Finis",
+    "Firminis", "Fitionesti", "Flamanzi", "Flondora", "Floresti", "Florica", "Florinta", "Focsani",
+    "Frasin", "Frasinet", "Frecatei", "Frumosu", "Fughiu", "Fulga de Sus", "Fundulea", "GORNET",
+    "Gaesti", "Galati", "Galbeni (Filipesti)", "Galgau", "Galicea Mare", "Galsa", "Gara Bobocu",
+    "Garcina", "Garda de Sus", "Gelmar", "Geoagiu", "Gepiu", "Gheghie", "Gheorghe Lazar",
+    "Gheorgheni", "Gheraseni", "Gherla", "Ghermanesti", "Ghimbav", "Ghimes-Faget", "Ghinesti",
+    "Ghirdoveni", "Ghiroda", "Giarmata", "Gilau", "Giorocuta", "Giroc", "Girov", "Giurgita",
+    "Giurgiu", "Glambocelu", "Glavile", "Gligoresti", "Glodeanu Sarat", "Godinesti", "Goiesti",
+    "Gorgota", "Gornesti", "Gostavatu", "Gradistea", "Gramesti", "Granicerii", "Grebanu",
+    "Grebenisu de Campie", "Grozesti", "Gruiu", "Gura Barbuletului", "Gura Humorului",
+    "Gura Ocnitei", "Gura Raului", "Gura Sutii", "Gura Vitioarei", "Guranda", "Gurbediu", "Gurghiu",
+    "Guruslau", "Habud", "Halceni", "Halmagiu", "Hamba", "Hapria", "Haret", "Hartesti", "Hateg",
+    "Herasti", "Hida", "Hidiselu de Jos", "Hirisesti", "Homesti", "Hoparta", "Horezu",
+    "Horoatu Crasnei", "Horpaz", "Hotarele", "Huedin", "Hunedoara", "Hunedoara Timisana",
+    "Husasau de Cris", "Huseni", "Husi", "Ianca", "Ianosda", "Ianova", "Iasi", "Iecea Mica",
+    "Iernut", "Ighiu", "Ignesti", "Igris", "Ilia", "Ilisesti", "Ilisua", "Ilva Mica", "Inand",
+    "Ineu", "Ion Roata", "Ionesti", "Iratosu", "Isalnita", "Izvin", "Jiana Mare", "Jibou", "Jilava",
+    "Jiliste", "Jimbolia", "Joita", "Josani (Cabesti)", "Joseni", "Josenii Bargaului", "LIPANESTI",
+    "Leleasca", "Lelesti", "Lenauheim", "Leordeni", "Leorint", "Letca Veche", "Libertatea",
+    "Lilieci", "Lipova", "Liteni", "Liteni (Moara)", "Livada", "Livada de Bihor", "Livezeni",
+    "Livezile", "Loamnes", "Lopadea Noua", "Lovrin", "Ludesti", "Ludus", "Lugasu de Jos", "Lugoj",
+    "Lumina", "Luna de Sus", "Lunca", "Luncasprie", "Luncoiu de Jos", "Lupsa", "Macin", "Maeriste",
+    "Magazia", "Magiresti", "Magurele", "Magureni", "Maguri", "Maierus", "Malancrav", "Malin",
+    "Malini", "Malu Mare", "Malureni", "Mamaia", "Mamaia-Sat", "Manasia", "Manastirea Doamnei",
+    "Manesti", "Mangalia", "Manoleasa", "Marca", "Mares", "Marghita", "Margina", "Mariselu",
+    "Maritei", "Marna Noua", "Marsa", "Marsani", "Maruntei", "Masca", "Matau", "Matca", "Mavrodin",
+    "Medgidia", "Medias", "Mediesu Aurit", "Mereteu", "Mescreac", "Mica", "Micasasa", "Micesti",
+    "Micula", "Miercurea-Ciuc", "Mihaesti", "Mihail Kogalniceanu", "Mihaileni", "Mihailesti",
+    "Mihalt", "Milova", "Mioarele", "Mioveni", "Miron Costin", "Miroslava", "Misca", "Mizil",
+    "Moara", "Mocod", "Mogos", "Mogosoaia", "Moinesti", "Moisei", "Moldova Noua", "Moldova Veche",
+    "Moldova-Sulita", "Moldovita", "Morlaca", "Morteni", "Morunglav", "Mosia Mica", "Mosnita Noua",
+    "Mosnita Veche", "Motru", "Movila (Salcioara)", "Movilita", "Muntele Rece", "Munteni",
+    "Munteni-Buzau", "Mureni", "Mureseni", "Murighiol", "Musetesti", "Mânastirea", "Nadab",
+    "Nadlac", "Nasaud", "Nasturelu", "Navodari", "Navodari Tabara", "Nazna", "Nedelea", "Negresti",
+    "Negresti-Oas", "Negrilesti", "Nermed", "Nimigea de Jos", "Nires", "Novaci", "Ocna Mures",
+    "Ocna Sibiului", "Ocna de Fier", "Odoreu", "Odorheiu Secuiesc", "Ogra", "Ohaba Lunga",
+    "Ohaba-Ponor", "Oiejdea", "Oituz", "Olari", "Oltenita", "Onesti", "Oniceni", "Oradea",
+    "Orastie", "Oravita", "Oreavul", "Orevita Mare", "Orlesti", "Orsova", "Otelu Rosu", "Otomani",
+    "Otopeni", "Ovidiu", "PODENII NOI", "PROVITA DE JOS", "PUCHENII MARI", "Palazu Mare", "Panciu",
+    "Pancota", "Pantelimon", "Paraul Rece", "Parta", "Pascani", "Paulestii Noi", "Paulis", "Pecica",
+    "Peciu Nou", "Peicani", "Peregu Mare", "Peregu Mic", "Peretu", "Periam", "Perii Brosteni",
+    "Peris", "Petrachioaia", "Petresti", "Petrosani", "Petrova", "Pianu de Jos", "Piatra",
+    "Piatra Neamt", "Piatra Soimului", "Picior de Munte", "Picleu", "Pielesti",
+    "Pietrari (Pausesti-Maglasi)", "Pietris", "Pietrosani", "Pioresti", "Pipera", "Piscani",
+    "Pischia", "Pitesti", "Plaiesti", "Ploiesti", "Plopeni", "Plosca", "Podari", "Poderei",
+    "Podu Iloaiei", "Pogoanele", "Poiana", "Poiana Ilvei", "Poiana Mare", "Poienarii Burchii",
+    "Poieni", "Poienile Zagrei", "Poienile de sub Munte", "Popesti-Leordeni", "Portita", "Posmus",
+    "Postarnacu", "Prejmer", "Prigoreni", "Protopopesti", "Prundu Bargaului", "Pucioasa", "Pui",
+    "Purcareni", "Pustinis", "Racari", "Rachitele", "Racsa", "Radauti", "Radauti-Prut",
+    "Radomiresti", "Ramnicu Sarat", "Ramnicu Valcea", "Rasca", "Rascruci", "Rasnov",
+    "Rasnov Romacril", "Rasuceni", "Razboieni-Cetate", "Recas", "Redea", "Reghin", "Resita",
+    "Resita Mica", "Reteag", "Rod", "Rodna", "Roman", "Romos", "Romuli", "Rosia", "Rosia Montana",
+    "Rosiori de Vede", "Rovinari", "Rubla", "Rucar", "Runc", "Runcu", "Sacalaz", "Sacueni",
+    "Sadova", "Sadu", "Saelele", "Sai", "Salatiu", "Salcia", "Salcuta", "Salistea de Sus",
+    "Salonta", "Salsig", "Sambata", "Sambata de Sus", "Sanandrei", "Sancraiu de Mures",
+    "Sangeorgiu de Mures", "Sangeorz-Bai", "Sangeru de Padure", "Sanmartin", "Sanmihaiu Roman",
+    "Sannicoara", "Sannicolau Mare", "Sannicolau Roman", "Sannicolau de Beius", "Sanpetru", "Sant",
+    "Santana", "Santana de Mures", "Santioana", "Sapanta", "Sarata (Nicolae Balcescu)", "Sarbova",
+    "Sard", "Sarmasel", "Saru Dornei", "Sascut", "Sat-Sugatag", "Satmarel", "Satu Mare", "Saud",
+    "Savarsin", "Savastreni", "Saveni", "Schela Cladovei", "Schitu Golesti", "Sebes", "Sebis",
+    "Sector 1", "Sector 2", "Sector 3", "Sector 4", "Sector 5", "Sector 6", "Secuieni",
+    "Seica Mare", "Seleus", "Selimbar", "Serbanesti", "Seulia de Mures", "Sfantu Gheorghe", "Sibiu",
+    "Sibot", "Sicula", "Sighetu Marmatiei", "Sighisoara", "Silistea", "Silistea Gumesti",
+    "Silvasu de Sus", "Simand", "Simeria", "Simleu Silvaniei", "Simnicu de Sus", "Sinaia",
+    "Sindresti", "Sipet", "Siret", "Siria", "Sisesti", "Sititelec", "Slatina", "Slatioara",
+    "Slimnic", "Slobozia", "Snagov", "Socodor", "Sofronea", "Soimus", "Somcuta Mare",
+    "Somes-Odorhei", "Sopot", "Soveja", "Spini", "Sprancenata", "Stalpeni", "Stancesti",
+    "Stefan cel Mare", "Stefanesti", "Stei", "Stejaru", "Stiubieni", "Stoenesti", "Strehaia",
+    "Stretea", "Stroesti", "Stupini", "Suceava", "Sucevita", "Suhaia", "Suharau", "Supur",
+    "Supuru de Jos", "Sura Mica", "Suseni", "Tacuta", "Talmaciu", "Talpos", "Tamadau Mare",
+    "Tamaseu", "Tantareni", "Tapu", "Tarcea", "Targoviste", "Targu Frumos", "Targu Jiu",
+    "Targu Mures", "Targu Neamt", "Targu Ocna", "Targu Secuiesc", "Tarlisua", "Tarnaveni",
+    "Tarnova", "Tasca", "Tatarlaua", "Taut", "Teaca", "Tecuci", "Teius", "Telciu", "Teleorman",
+    "Teliucu Inferior", "Tepu", "Tia Mare", "Ticleni", "Tiganesti", "Tigmandru", "Tiha Bargaului",
+    "Timisoara", "Tinca", "Tismana", "Titu", "Toderita", "Todireni", "Tomesti", "Toplet", "Toplita",
+    "Topolovatu Mare", "Topoloveni", "Traian", "Trip", "Tritenii de Jos", "Tritenii-Hotar",
+    "Tulcea", "Tulucesti", "Tunari", "Turda", "Turia", "Turnu Magurele", "Turnu Rosu", "Tuzla",
+    "Ucea de Sus", "Ulma", "Ungheni", "Unirea", "Urechesti", "Uricani", "Uriu", "Urlati", "Ursad",
+    "Ursoaia", "Urziceni", "Uzunu", "VALEA CALUGAREASCA", "Vadastrita", "Valcau de Jos",
+    "Valea Bistrei", "Valea Draganului", "Valea Iasului", "Valea Izvoarelor", "Valea Larga",
+    "Valea Lupului", "Valea Macrisului", "Valea Plopilor", "Valea Voievozilor", "Valea lui Mihai",
+    "Valeni", "Valenii de Munte", "Valiug", "Valu lui Traian", "Vanatori", "Vanatorii Mici",
+    "Varadia de Mures", "Varfuri", "Varfurile", "Varsand", "Varsolt", "Varvoru de Jos", "Vaslui",
+    "Vatra Dornei", "Vedea", "Venetia de Sus", "Vidolm", "Vidrasau", "Viile", "Viisoara", "Vinerea",
+    "Vinetesti", "Vinga", "Vintileanca", "Vintu de Jos", "Visan", "Viseu de Jos", "Visina",
+    "Vizuresti", "Vladaia", "Vladesti", "Vladimirescu", "Vladuleni", "Vlaiculesti", "Voiniceni",
+    "Voislova", "Voiteg", "Voluntari", "Vorovesti", "Vulcan", "Vulcana-Pandele", "Vulturu", "Zalau",
+    "Zalha", "Zanesti", "Zarnesti", "Zatreni", "Zavoiu", "Zebil", "Zimandcuz", "Zimnicea", "Zlatna",
+    "insuratei", "intorsura Buzaului", "serboeni",
+]
+
+COUNTIES = [
+    "Alba", "Arad", "Arges", "Bacau", "Bihor", "Bistrita-Nasaud", "Botosani", "Braila", "Brasov",
+    "Bucuresti", "Buzau", "Calarasi", "Caras-Severin", "Cluj", "Constanta", "Covasna", "Dambovita",
+    "Dolj", "Galati", "Giurgiu", "Gorj", "Harghita", "Hunedoara", "Ialomita", "Iasi", "Ilfov",
+    "Maramures", "Mehedinti", "Mures", "Neamt", "Olt", "Prahova", "Salaj", "Satu Mare", "Sibiu",
+    "Suceava", "Teleorman", "Timis", "Tulcea", "Valcea", "Vaslui", "Vrancea",
+]
+
+# The seat of every county, for a city named where the county was expected ("Cluj-Napoca")
+COUNTY_SEATS = {
+    "Alba Iulia": "Alba", "Arad": "Arad", "Pitesti": "Arges", "Bacau": "Bacau", "Oradea": "Bihor",
+    "Bistrita": "Bistrita-Nasaud", "Botosani": "Botosani", "Braila": "Braila", "Brasov": "Brasov",
+    "Buzau": "Buzau", "Calarasi": "Calarasi", "Resita": "Caras-Severin", "Cluj-Napoca": "Cluj",
+    "Constanta": "Constanta", "Sfantu Gheorghe": "Covasna", "Targoviste": "Dambovita", "Craiova": "Dolj",
+    "Galati": "Galati", "Giurgiu": "Giurgiu", "Targu Jiu": "Gorj", "Miercurea-Ciuc": "Harghita",
+    "Deva": "Hunedoara", "Slobozia": "Ialomita", "Iasi": "Iasi", "Buftea": "Ilfov", "Baia Mare": "Maramures",
+    "Drobeta-Turnu Severin": "Mehedinti", "Targu Mures": "Mures", "Piatra Neamt": "Neamt", "Slatina": "Olt",
+    "Ploiesti": "Prahova", "Zalau": "Salaj", "Satu Mare": "Satu Mare", "Sibiu": "Sibiu", "Suceava": "Suceava",
+    "Alexandria": "Teleorman", "Timisoara": "Timis", "Tulcea": "Tulcea", "Ramnicu Valcea": "Valcea",
+    "Vaslui": "Vaslui", "Focsani": "Vrancea",
+}
+
+CATEGORIES = ["Caini", "Pisici", "Adoptii"]
+
+CAT_BREEDS = [
+    "abisiniana", "albastra de rusia", "american curl", "american shorthair", "angora turceasca",
+    "balineza", "bengaleza", "birmaneza", "braziliana cu par scurt", "british shorthair",
+    "cornish rex", "devon rex", "japanese bobtail", "maine coon", "monta", "norvegiana de padure",
+    "ocicat", "persana", "ragamuffin", "ragdoll", "rasa comuna", "scottish fold", "sfinx",
+    "siameza",
+]
+
+DOG_BREEDS = [
+    "affenpinscher", "airdale terrier", "airedale terrier", "akita inu", "american bully",
+    "amstaff", "basset hound", "beagle", "bichon bolognese", "bichon frise", "bichon havanez",
+    "bichon maltez", "bloodhound", "bobtail", "border collie", "boxer", "brac", "brac german",
+    "bull terrier", "bulldog american", "bulldog englez", "bulldog francez", "bullmastiff",
+    "cane corso", "cavalier king charles", "cavalier king charles spaniel", "chihuahua",
+    "chow chow", "ciobanesc alb elvetian", "ciobanesc australian", "ciobanesc belgian",
+    "ciobanesc belgian malinois", "ciobanesc carpatin", "ciobanesc caucazian",
+    "ciobanesc de asia centrala", "ciobanesc de berna", "ciobanesc german", "ciobanesc mioritic",
+    "ciobanesc romanesc", "cocker spaniel", "copoi ardelenesc", "dalmatian", "doberman pinscher",
+    "dog argentinian", "dog de bordeaux", "dog german", "dogo presa canario", "epagneul breton",
+    "eurasier", "fox terrier", "golden retriever", "husky siberian", "jack russell terrier",
+    "jagdterrier", "kangal", "komodor", "labrador retriever", "lagotto romagnolo", "lup cehoslovac",
+    "malamut de alaska", "mastiff tibetan", "mastino napoletano", "monta", "ogar", "pechinez",
+    "pinscher pitic", "pomeranian", "pudel", "pug-mops", "puli", "rhodesian ridgeback",
+    "rottweiler", "saint bernard", "samoyed", "schnauzer", "scottish terrier", "shar-pei",
+    "shiba inu", "shih tzu", "teckel", "terrier", "tosa inu", "viszla", "vizsla", "weimaraner",
+    "westie", "yorkshire terrier",
+]
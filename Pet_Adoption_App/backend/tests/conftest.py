@@ -0,0 +1,65 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from load_test import _AsyncClient, _bulk_write_one_by_one  # noqa: E402
+from run_benchmarks import _fixture  # noqa: E402
+
+BASE_URL = "https://www.example-anunturi.ro/animale"
+LISTING_PAGES = 3
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """
+    dataAccess.db backed by a fresh mongomock client, sync and async side.
+    """
+    from mongomock.collection import Collection
+    from dataAccess import db
+    from services import similarity
+
+    monkeypatch.setattr(Collection, "bulk_write",
+                        lambda self, requests, ordered=True, **kwargs: _bulk_write_one_by_one(self, requests))
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(db, "_client", client)
+    monkeypatch.setattr(db, "_async_client", _AsyncClient(client))
+    monkeypatch.setattr(db, "_dataset_version", {"value": None, "checked_at": 0.0})
+    monkeypatch.setitem(similarity._index, "current", similarity.SimilarityIndex())
+    return db.get_db()
+
+
+@pytest.fixture
+def listing_site(monkeypatch):
+    """
+    The scraper's session answering from the benchmark fixtures: LISTING_PAGES
+    listing pages of distinct cards, then an empty page. Listing pages in
+    site.failing answer 503.
+    """
+    from services import scraper
+
+    listing, detail = _fixture("listing_page.html"), _fixture("detail_page.html")
+    site = SimpleNamespace(failing=set(), requests=[])
+
+    def get(url, headers=None, **kwargs):
+        site.requests.append(url)
+        if "?pag=" in url:
+            page = int(url.rsplit("=", 1)[1])
+            if page in site.failing:
+                return SimpleNamespace(status_code=503, url=url, text="", headers={})
+            if page > LISTING_PAGES:
+                return SimpleNamespace(status_code=200, url=BASE_URL, text="", headers={})
+            text = listing.replace("anunt-1000", f"anunt-{page}000")
+            return SimpleNamespace(status_code=200, url=url, text=text, headers={})
+        return SimpleNamespace(status_code=200, url=url, text=detail, headers={})
+
+    monkeypatch.setattr(scraper.session, "get", get)
+    monkeypatch.setattr(scraper.time, "sleep", lambda seconds: None)
+    return site
@@ -0,0 +1,88 @@
+import time
+import threading
+
+import mongomock
+import pytest
+
+from dataAccess import queries
+from dataAccess.queries import build_pet_filter
+from run_benchmarks import SAMPLE_FILTERS, _synthetic_listings
+from services import catalog
+from services.catalog import CatalogSnapshot, Unsupported
+
+
+@pytest.fixture(scope="module")
+def listings():
+    collection = mongomock.MongoClient()["pets"]["animalutul"]
+    collection.insert_many(_synthetic_listings(400))
+    collection.update_many({"county": "Iasi"}, {"$set": {"stale": True}})
+    return collection
+
+
+@pytest.mark.parametrize("name", list(SAMPLE_FILTERS))
+def test_snapshot_answers_like_mongo(monkeypatch, listings, name):
+    # the snapshot refuses $text, so compare the regex form of description filters
+    monkeypatch.setattr(queries, "USE_TEXT_SEARCH", False)
+    filter_query = {**build_pet_filter(SAMPLE_FILTERS[name]), "stale": {"$ne": True}}
+    # built like rebuild_catalog, from the live listings only
+    snapshot = CatalogSnapshot(listings.find({"stale": {"$ne": True}}))
+
+    expected = sorted(str(doc["_id"]) for doc in listings.find(filter_query))
+
+    assert sorted(str(doc["_id"]) for doc in snapshot.query(filter_query)) == expected
+    assert expected or name == "empty"
+
+
+def test_snapshot_projection_keeps_the_id(listings):
+    snapshot = CatalogSnapshot(listings.find({}))
+
+    rows = snapshot.query({"county": "Cluj"}, {"title": 1, "price": 1})
+
+    assert rows and all(set(row) <= {"_id", "title", "price"} and "_id" in row for row in rows)
+
+
+@pytest.mark.parametrize("filter_query", [
+    {"$text": {"$search": "mic"}},
+    {"county": ["Cluj", "Iasi"]},
+    {"price": {"$ne": 100}},
+    {"description": {"$regex": "mic", "$options": "x"}},
+    {"link": "https://www.example-anunturi.ro/animale/anunt-1.html"},
+])
+def test_snapshot_refuses_what_it_cannot_answer_exactly(listings, filter_query):
+    with pytest.raises(Unsupported):
+        CatalogSnapshot(listings.find({})).query(filter_query)
+
+
+def test_concurrent_stale_reads_start_one_rebuild(monkeypatch):
+    rebuilds = []
+    done = threading.Event()
+
+    def slow_rebuild():
+        rebuilds.append(threading.get_ident())
+        time.sleep(0.2)
+        done.set()
+
+    monkeypatch.setattr(catalog, "rebuild_catalog", slow_rebuild)
+    start = threading.Barrier(20)
+
+    def stale_read():
+        start.wait()
+        catalog._rebuild_in_background()
+
+    readers = [threading.Thread(target=stale_read) for _ in range(20)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+
+    assert done.wait(5)
+    assert len(rebuilds) == 1
+    # the next stale read after the rebuild may start another one
+    deadline = time.monotonic() + 5
+    while catalog._background_lock.locked() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    catalog._rebuild_in_background()
+    deadline = time.monotonic() + 5
+    while len(rebuilds) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(rebuilds) == 2
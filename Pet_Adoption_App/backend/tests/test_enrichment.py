@@ -0,0 +1,47 @@
+import pytest
+
+from services.enrichment import derive_tags, tags_for_pattern
+
+
+def _listing_tags(card):
+    return [tag for tag in derive_tags(card)[1] if tag.startswith("listing:")]
+
+
+@pytest.mark.parametrize("card, expected", [
+    # a priced ad is a sale whatever its text says about adoption
+    ({"title": "Vand pui", "description": "vand pui, nu ofer spre adoptie gratuita", "price": 500,
+      "category": "Caini"}, ["listing:vanzare"]),
+    ({"title": "Pisicuta", "description": "donez pisicuta", "price": None, "category": "Pisici"},
+     ["listing:adoptie"]),
+    ({"title": "Catel", "description": "catel de rasa", "price": 0, "category": "Caini"}, []),
+    ({"title": "Catel", "description": "catel de vanzare", "price": 300, "category": "Adoptii"},
+     ["listing:adoptie"]),
+    ({"title": "Catel", "description": "catel gratuit", "price": True, "category": "Caini"},
+     ["listing:adoptie"]),
+])
+def test_listing_tag_prefers_category_and_price_over_keywords(card, expected):
+    assert _listing_tags(card) == expected
+
+
+def test_derive_tags_reads_category_sizes_colors_ages_and_breed():
+    species, tags = derive_tags({
+        "title": "Bichon maltez", "description": "Mic, alb si jucaus, 2 luni", "price": 800, "category": "Caini",
+    })
+
+    assert species == "dog"
+    assert tags == ["species:dog", "size:mic", "color:alb", "age:pui", "listing:vanzare", "breed:bichon maltez"]
+
+
+def test_derive_tags_needs_a_cue_before_mare():
+    _, tags = derive_tags({"title": "Caine", "description": "caine din Satu Mare, talie mare, 10 ani"})
+
+    assert "size:mare" in tags
+    assert "age:senior" in tags
+    assert derive_tags({"title": "Caine", "description": "caine din Satu Mare"})[1] == ["species:dog"]
+
+
+def test_tags_for_pattern_only_answers_plain_tag_alternations():
+    assert tags_for_pattern("(mic|mica)") == ["size:mic"]
+    assert tags_for_pattern("(caine|catel)") == ["species:dog"]
+    assert tags_for_pattern("(mic|microcip)") is None
+    assert tags_for_pattern("vaccin.*") is None
@@ -0,0 +1,38 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+from controllers import GeminiPets
+from services import normalization
+
+FACETS = {
+    "counts": {
+        "counties": [{"value": "Cluj", "count": 40}],
+        "breeds": [{"value": "Labrador Retriever", "count": 12}, {"value": "Husky Siberian", "count": 5}],
+    },
+    "cities": {"Cluj": [{"value": "Cluj-Napoca", "count": 30}]},
+}
+
+
+def test_fast_path_and_gemini_filters_are_normalized_alike(monkeypatch):
+    async def facets():
+        return FACETS
+
+    async def model(model, contents, config=None, key=None):
+        # what the model writes for the prompt the local parser gives up on
+        return SimpleNamespace(text=json.dumps({
+            "county": "cluj", "city": None, "category": "Caini", "breed": "labrador retriever",
+            "min_price": None, "max_price": None, "description_regex": None,
+        }))
+
+    monkeypatch.setattr(normalization, "get_facets", facets)
+    monkeypatch.setattr(GeminiPets, "generate_content", model)
+    monkeypatch.setattr(GeminiPets.filter_cache, "get", lambda key: None)
+    monkeypatch.setattr(GeminiPets.filter_cache, "set", lambda key, value: None)
+
+    fast = asyncio.run(GeminiPets.extract_filters("caine labrador retriever in cluj"))
+    gemini = asyncio.run(GeminiPets.extract_filters("un caine labrador retriever cuminte in cluj"))
+
+    assert fast["breed"] == "Labrador Retriever"
+    assert fast["county"] == "Cluj"
+    assert GeminiPets.gemini_mongo_filter(fast) == GeminiPets.gemini_mongo_filter(gemini)
@@ -0,0 +1,35 @@
+import time
+
+from conftest import BASE_URL
+from services import jobs
+
+
+def _wait(job, timeout=30):
+    deadline = time.monotonic() + timeout
+    while job.status in jobs.ACTIVE_STATUSES:
+        assert time.monotonic() < deadline, f"job still {job.status}"
+        time.sleep(0.05)
+    return job.to_dict()
+
+
+def test_finished_scrape_reports_the_cards_written(mongo, listing_site):
+    # fewer cards than one batch, so everything is written by finish()
+    job = _wait(jobs.submit_scrape(BASE_URL, overwrite=True))
+
+    stored = mongo["animalutul"].count_documents({})
+    assert job["status"] == "succeeded"
+    assert stored > 0
+    assert job["progress"]["written"] == stored
+    assert job["progress"]["cards"] == stored
+    assert len(job["result"]["inserted_ids"]) == stored
+
+
+def test_failed_listing_page_keeps_the_catalog(mongo, listing_site):
+    mongo["animalutul"].insert_one({"link": "https://www.example-anunturi.ro/animale/anunt-old.html", "title": "x"})
+    listing_site.failing.add(2)
+
+    job = _wait(jobs.submit_scrape(BASE_URL, overwrite=True))
+
+    assert job["status"] == "failed"
+    assert mongo["animalutul"].count_documents({"title": "x"}) == 1
+    assert mongo["scrape_checkpoints"].count_documents({}) == 1
@@ -0,0 +1,36 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from main import record_request_metrics
+from services.metrics import current_route, metrics_snapshot
+
+
+def test_routes_are_labelled_by_template_and_timed_to_the_last_chunk():
+    app = FastAPI()
+    app.middleware("http")(record_request_metrics)
+    labels = []
+
+    @app.get("/test-items/{item_id}/stream")
+    async def stream(item_id: str):
+        labels.append(current_route())
+
+        async def body():
+            yield b"first"
+            await asyncio.sleep(0.2)
+            yield b"last"
+        return StreamingResponse(body())
+
+    client = TestClient(app)
+    for item_id in ("1", "2"):
+        assert client.get(f"/test-items/{item_id}/stream").content == b"firstlast"
+
+    routes = metrics_snapshot()["routes"]
+    assert labels == ["/test-items/{item_id}/stream"] * 2
+    assert not [key for key in routes if "/test-items/1" in key]
+    entry = routes["GET /test-items/{item_id}/stream"]
+    assert entry["status_200"] == 2
+    assert entry["latency"]["count"] == 2
+    assert entry["latency"]["mean_ms"] >= 200
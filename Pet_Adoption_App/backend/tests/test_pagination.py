@@ -0,0 +1,50 @@
+import datetime
+
+import mongomock
+import pytest
+from bson.objectid import ObjectId
+
+from dataAccess.pagination import SORTS, encode_cursor, decode_cursor, paged_filter
+
+
+def test_cursor_round_trips_object_ids_dates_and_nulls():
+    document = {"_id": ObjectId(), "first_seen": datetime.datetime(2026, 3, 1, 12, 30), "promoted": None}
+
+    values = decode_cursor("promoted", encode_cursor("promoted", document))
+
+    assert values == [None, document["first_seen"], document["_id"]]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor("recent", {"_id": ObjectId()})])
+def test_cursor_of_another_sort_or_malformed_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor("price_asc", cursor)
+
+
+@pytest.fixture
+def listings():
+    collection = mongomock.MongoClient()["pets"]["animalutul"]
+    base = datetime.datetime(2026, 1, 1)
+    prices = [None, 0, 150, 150, 300, None, 800, 150, 1200, 300, None, 50]
+    collection.insert_many([
+        {"title": f"pet {i}", "price": price, "promoted": i % 4 == 0,
+         "first_seen": base + datetime.timedelta(days=i % 5)}
+        for i, price in enumerate(prices)
+    ])
+    return collection
+
+
+@pytest.mark.parametrize("sort", list(SORTS))
+@pytest.mark.parametrize("page_size", [1, 3, 5])
+def test_keyset_pages_walk_the_whole_sort_order_once(listings, sort, page_size):
+    everything = [doc["_id"] for doc in listings.find({}).sort(SORTS[sort])]
+
+    seen, cursor = [], None
+    while True:
+        page = list(listings.find(paged_filter({}, sort, cursor)).sort(SORTS[sort]).limit(page_size + 1))
+        seen.extend(doc["_id"] for doc in page[:page_size])
+        if len(page) <= page_size:
+            break
+        cursor = encode_cursor(sort, page[page_size - 1])
+
+    assert seen == everything
@@ -0,0 +1,65 @@
+import httpx
+import pytest
+
+from conftest import BASE_URL, LISTING_PAGES, _fixture
+from services import crawler, parsers, scraper
+from services.parsers import parse_detail_fields, parse_listing_page, parse_price
+
+
+@pytest.fixture(params=["lxml", "html.parser"])
+def html_parser(request, monkeypatch):
+    monkeypatch.setattr(parsers, "HTML_PARSER", request.param)
+    return request.param
+
+
+def _without_strainer(monkeypatch):
+    beautiful_soup = parsers.BeautifulSoup
+    monkeypatch.setattr(parsers, "BeautifulSoup",
+                        lambda markup, features, parse_only=None: beautiful_soup(markup, features))
+
+
+def test_strained_listing_parse_matches_the_full_document(monkeypatch, html_parser):
+    html = _fixture("listing_page.html")
+    strained = parse_listing_page(html)
+    _without_strainer(monkeypatch)
+
+    assert strained and strained == parse_listing_page(html)
+
+
+def test_strained_detail_parse_matches_the_full_document(monkeypatch, html_parser):
+    html = _fixture("detail_page.html")
+    strained = parse_detail_fields(html)
+    _without_strainer(monkeypatch)
+
+    assert strained.get("description") and strained == parse_detail_fields(html)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("350 lei", 350),
+    ("2500", 2500),
+    ("€ 400", 400),
+    ("Negociabil", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+
+def test_async_crawl_returns_the_same_cards_as_the_sequential_scrape(monkeypatch, listing_site):
+    def answer(request):
+        # the fixture site's session, with the past-the-end redirect made a real one
+        response = scraper.session.get(str(request.url))
+        if str(response.url) != str(request.url):
+            return httpx.Response(302, headers={"Location": str(response.url)})
+        return httpx.Response(response.status_code, text=response.text, headers=response.headers)
+
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(crawler.httpx, "AsyncClient",
+                        lambda **kwargs: async_client(transport=httpx.MockTransport(answer), **kwargs))
+
+    sequential = scraper.scrape_pet_cards(BASE_URL)
+    concurrent = crawler.scrape_pet_cards_async(BASE_URL, rate=1000, max_rate=1000, parse_workers=0)
+
+    assert len({card["link"] for card in sequential}) > LISTING_PAGES
+    assert sorted(concurrent, key=lambda card: card["link"]) == sorted(sequential, key=lambda card: card["link"])
@@ -0,0 +1,39 @@
+import pytest
+
+from dataAccess import queries
+from dataAccess.queries import RejectedPattern, apply_description_filter, plain_alternatives, safe_regex
+
+
+@pytest.mark.parametrize("pattern", [
+    "(a+)+$",
+    "(mic|mica)*",
+    r"(\w+\s?)*x",
+    "(x)\\1",
+    "(?=caine)caine",
+    "a{1000}",
+    "|".join(f"cuvant{i}" for i in range(40)),
+    "a" * 300,
+])
+def test_safe_regex_rejects_patterns_that_backtrack_or_are_too_big(pattern):
+    with pytest.raises(RejectedPattern):
+        safe_regex(pattern)
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    (".*vaccinat.*", "vaccinat"),
+    ("(vaccina|pedigree)", "(vaccina|pedigree)"),
+    (r"\b(mic|mica)\b", r"\b(mic|mica)\b"),
+    ("(caine", r"\(caine"),
+    ("a{2,5}", "a{2,5}"),
+])
+def test_safe_regex_keeps_safe_patterns(pattern, expected):
+    assert safe_regex(pattern) == expected
+
+
+def test_plain_word_alternations_use_the_text_index(monkeypatch):
+    monkeypatch.setattr(queries, "USE_TEXT_SEARCH", True)
+
+    assert plain_alternatives("(Mic|mică)") == ["Mic", "mică"]
+    assert plain_alternatives("sub-rasa|mic") is None
+    assert apply_description_filter({}, "(Mic|mic|jucaus)") == {"$text": {"$search": "mic jucaus"}}
+    assert apply_description_filter({}, "vaccin.*at") == {"description": {"$regex": "vaccin.*at", "$options": "i"}}
@@ -0,0 +1,19 @@
+from services.thumbnails import DiskLRUCache
+
+
+def test_disk_cache_creates_its_directory_on_first_write(tmp_path):
+    directory = tmp_path / "thumbnails"
+    cache = DiskLRUCache(str(directory), max_bytes=10)
+
+    assert cache.stats()["files"] == 0
+    assert cache.get("a.jpg") is None
+    assert not directory.exists()
+
+    cache.set("a.jpg", b"123456")
+    cache.set("b.jpg", b"123456")
+
+    assert directory.is_dir()
+    # over max_bytes: the least recently served file goes first
+    assert cache.get("a.jpg") is None
+    assert cache.get("b.jpg") == b"123456"
+    assert DiskLRUCache(str(directory), max_bytes=10).stats()["files"] == 1
@@ -0,0 +1,25 @@
+from dataAccess import db
+
+
+def _write(cards, **options):
+    writer = db.PetCardWriter(source_url="https://www.example-anunturi.ro/animale", **options)
+    for card in cards:
+        writer.add(dict(card))
+    return writer.finish()
+
+
+def test_updated_counts_only_changed_listings(mongo, monkeypatch):
+    published = []
+    monkeypatch.setattr(db, "_flush_listeners", [lambda inserted, updated: published.append(updated)])
+    first = [
+        {"link": "a", "title": "Labrador", "price": 300, "description": "vaccinat"},
+        {"link": "b", "title": "Pisica", "price": 100, "description": "sterilizata"},
+    ]
+    assert len(_write(first)["inserted_ids"]) == 2
+
+    # a is seen again unchanged, stripped to its listing fields; b changed its price
+    result = _write([{"link": "a", "title": "Labrador", "price": 300}, {**first[1], "price": 150}])
+
+    assert result["updated"] == 1
+    assert [(doc["link"], doc["price"], doc["description"]) for doc in published[-1]] == [("b", 150, "sterilizata")]
+    assert mongo["animalutul"].find_one({"link": "a"})["description"] == "vaccinat"
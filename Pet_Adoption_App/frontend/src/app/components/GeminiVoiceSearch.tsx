@@ -1,15 +1,17 @@
 "use client";
 import { useState, useRef } from "react";
 
-interface GeminiVoiceSearchProps {
+interface GeminiVoiceSearchProps<T> {
   onTranscript: (text: string) => void;
+  onResults?: (pets: T[]) => void;
   disabled?: boolean;
 }
 
-export default function GeminiVoiceSearch({
+export default function GeminiVoiceSearch<T>({
   onTranscript,
+  onResults,
   disabled,
-}: GeminiVoiceSearchProps) {
+}: GeminiVoiceSearchProps<T>) {
   const [isRecording, setIsRecording] = useState(false);
   const [isProcessing, setIsProcessing] = useState(false);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
@@ -55,12 +57,11 @@ export default function GeminiVoiceSearch({
 
   const sendAudioToGemini = async (audioBlob: Blob) => {
     try {
-      const formData = new FormData();
-      formData.append("audio_file", audioBlob, "recording.webm");
-
-      const response = await fetch("/api/pets/voice-to-text", {
+      // One request: the backend transcribes, extracts the filters and returns the pets
+      const response = await fetch("/api/pets/gemini/voice", {
         method: "POST",
-        body: formData,
+        headers: { "Content-Type": audioBlob.type },
+        body: audioBlob,
       });
 
       if (!response.ok) {
@@ -71,6 +72,9 @@ export default function GeminiVoiceSearch({
       if (data.transcript) {
         onTranscript(data.transcript);
       }
+      if (onResults && Array.isArray(data.pets)) {
+        onResults(data.pets);
+      }
     } catch (error) {
       console.error("Error processing audio:", error);
       alert("Eroare la procesarea audio-ului");
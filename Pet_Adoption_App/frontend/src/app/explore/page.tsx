@@ -168,7 +168,7 @@ export default function ExplorePage() {
         {pets.map((p) => (
           <div key={p._id} className="border p-4 rounded">
             <img
-              src={p.image_url}
+              src={`http://localhost:8000/thumbnails/${p._id}?size=small`}
               alt={p.title}
               className="w-full h-32 object-cover mb-2"
             />
@@ -269,10 +269,15 @@ export default function PetsPage() {
                   {isSearching ? "🔍 Caut..." : "🤖 Caută cu AI"}
                 </button>
 
-                <GeminiVoiceSearch
+                <GeminiVoiceSearch<Pet>
                   onTranscript={(transcript) => {
                     setSearchQuery(transcript);
                   }}
+                  onResults={(results) => {
+                    setPets(results);
+                    setFilteredPets(results);
+                    setCurrentPage(1);
+                  }}
                   disabled={isSearching}
                 />
 